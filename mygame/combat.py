@@ -6,8 +6,19 @@ Handles turn-based combat mechanics, damage calculation, and combat events.
 
 import random
 import logging
+import uuid
 from evennia.utils.utils import inherits_from
 
+try:
+    from .loot import roll_creature_loot, grant_loot, describe_loot
+except (ImportError, ValueError):
+    from loot import roll_creature_loot, grant_loot, describe_loot
+
+try:
+    from .ledger import get_ledger
+except (ImportError, ValueError):
+    from ledger import get_ledger
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,6 +40,13 @@ class CombatHandler:
         self.defender = defender
         self.active = True
         self.turn_count = 0
+        # Identifies this fight in the ledger so its reward is paid once
+        self.combat_id = uuid.uuid4().hex
+
+        # Fold passive regeneration into stored HP before it pauses for combat
+        for combatant in (attacker, defender):
+            if hasattr(combatant, 'settle_hp'):
+                combatant.settle_hp()
 
         # Store original HP for reference
         self.attacker_start_hp = attacker.db.hp or 100
@@ -57,8 +75,8 @@ class CombatHandler:
 
         # Weapon damage
         weapon_damage = 0
-        if attacker.db.equipped_weapon:
-            weapon_damage = getattr(attacker.db.equipped_weapon.db, 'damage', 0)
+        if attacker.db.equipped_weapon and hasattr(attacker.db.equipped_weapon, 'get_field'):
+            weapon_damage = attacker.db.equipped_weapon.get_field("stats").get('damage', 0)
 
         # Randomize damage (±20%)
         total_damage = base_damage + strength_bonus + weapon_damage
@@ -137,6 +155,11 @@ class CombatHandler:
         """
         self.active = False
 
+        # Restart the regeneration clock so combat time isn't regenerated
+        for combatant in (self.attacker, self.defender):
+            if hasattr(combatant, 'settle_hp'):
+                combatant.settle_hp()
+
         self.attacker.db.in_combat = False
         self.defender.db.in_combat = False
         self.attacker.db.combat_target = None
@@ -145,17 +168,25 @@ class CombatHandler:
         if victory:
             # Award experience
             xp_reward = self.defender.db.xp_reward or 50
-            self.attacker.gain_xp(xp_reward)
+            self.attacker.gain_xp(xp_reward, announce=False)
 
             # Award currency
             currency_reward = self.defender.db.currency_reward or 25
-            self.attacker.db.currency = (self.attacker.db.currency or 0) + currency_reward
+            get_ledger().credit(self.attacker, currency_reward, "kill_reward",
+                                ref=f"kill:{self.attacker.id}:{self.combat_id}",
+                                memo=self.defender.name)
 
             self.attacker.send_text_output(f"Victory! You defeated {self.defender.name}!", 'success')
             self.attacker.send_text_output(f"You gained {xp_reward} XP and {currency_reward} shekels!", 'success')
 
-            # Update quests that require defeating this creature
+            # Roll the creature's loot table straight into the inventory
             creature_type = getattr(self.defender.db, 'creature_type', None)
+            drops = roll_creature_loot(creature_type, self.defender.db.level or 1)
+            if drops:
+                grant_loot(self.attacker, drops)
+                self.attacker.send_text_output(f"You found: {describe_loot(drops)}", 'success')
+
+            # Update quests that require defeating this creature
             if creature_type and hasattr(self.attacker, 'quest_manager'):
                 for quest in self.attacker.quest_manager.get_active_quests():
                     for obj in quest.objectives:
@@ -174,6 +205,7 @@ class CombatHandler:
                 "victory": True,
                 "xp_gained": xp_reward,
                 "currency_gained": currency_reward,
+                "loot": drops,
                 "enemy_name": self.defender.get_display_name(self.attacker)
             })
         else:
@@ -405,7 +437,7 @@ def continue_combat(character, action="attack"):
                 "type": "combat_event",
                 "event": "health_updated",
                 "attacker_health": creature.db.hp,
-                "target_health": character.db.hp,
+                "target_health": character.get_hp(),
                 "message": f"{creature.name} retaliates!"
             })
 
@@ -428,6 +460,7 @@ def continue_combat(character, action="attack"):
         flee_chance = character.db.courage or 5
         if random.random() < (flee_chance / 10.0):
             character.send_text_output(f"You successfully flee from {creature.name}!", 'success')
+            character.settle_hp()
             character.db.in_combat = False
             character.db.combat_target = None
             result["fled"] = True
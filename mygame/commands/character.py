@@ -3,6 +3,7 @@ Character management commands for Journey Through Scripture
 """
 
 from evennia import Command
+from evennia.utils.utils import inherits_from
 
 
 class CmdStats(Command):
@@ -31,10 +32,14 @@ class CmdStats(Command):
         output += "\n|w" + "=" * 60 + "|n"
 
         # Health and XP
-        hp_bar = self.make_bar(char.db.hp, char.db.max_hp, 20, "|r", "|x")
+        hp = char.get_hp()
+        hp_bar = self.make_bar(hp, char.db.max_hp, 20, "|r", "|x")
         xp_bar = self.make_bar(char.db.xp, char.db.xp_to_next_level, 20, "|y", "|x")
 
-        output += f"\n|wHealth:|n {hp_bar} {char.db.hp}/{char.db.max_hp}"
+        output += f"\n|wHealth:|n {hp_bar} {hp}/{char.db.max_hp}"
+        regen = char.get_regen_state()
+        if regen["full_in"]:
+            output += f" |g(+{regen['per_second'] * 60:g} HP/min, full in {regen['full_in']}s)|n"
         output += f"\n|wXP:|n     {xp_bar} {char.db.xp}/{char.db.xp_to_next_level}"
 
         # Stats
@@ -59,7 +64,7 @@ class CmdStats(Command):
 
         # Inventory info
         output += f"\n\n|w=== INVENTORY ===|n"
-        output += f"\n  |wCurrency:|n {char.db.currency} temple shekels"
+        output += f"\n  |wCurrency:|n {char.get_currency()} temple shekels"
         output += f"\n  |wWeight:|n   {char.db.carried_weight:.1f}/{char.db.max_carry_weight} lbs"
 
         # Progress
@@ -102,7 +107,8 @@ class CmdInventory(Command):
 
     def func(self):
         """Execute the inventory command"""
-        items = [obj for obj in self.caller.contents if obj.typename == "Item"]
+        items = [obj for obj in self.caller.contents
+                 if inherits_from(obj, "typeclasses.objects.Item")]
 
         if not items:
             self.caller.msg("You are not carrying anything.")
@@ -116,16 +122,15 @@ class CmdInventory(Command):
             if hasattr(item.db, 'equipped') and item.db.equipped:
                 equipped = " |y(equipped)|n"
 
-            output += f"  - {item.name}{equipped} ({item.db.weight} lbs)"
+            output += f"  - {item.get_display_name(self.caller)}{equipped} ({item.get_total_weight():.1f} lbs)"
 
             # Show item value
-            if hasattr(item.db, 'value'):
-                output += f" - {item.db.value} shekels"
+            output += f" - {item.get_total_value()} shekels"
 
             output += "\n"
 
         output += f"\n|wTotal weight:|n {self.caller.db.carried_weight:.1f}/{self.caller.db.max_carry_weight} lbs"
-        output += f"\n|wCurrency:|n {self.caller.db.currency} shekels\n"
+        output += f"\n|wCurrency:|n {self.caller.get_currency()} shekels\n"
 
         self.caller.msg(output)
 
@@ -168,6 +173,139 @@ class CmdUse(Command):
             self.caller.msg(f"You cannot use {item.name}.")
 
 
+def parse_amount(args):
+    """
+    Split an optional leading amount off command arguments.
+
+    Args:
+        args (str): e.g. "5 shekels" or "bread"
+
+    Returns:
+        tuple: (amount or None, rest of the arguments)
+    """
+    parts = args.strip().split(None, 1)
+    if len(parts) == 2 and parts[0].isdigit():
+        return int(parts[0]), parts[1]
+    return None, args.strip()
+
+
+def take_units(caller, item, amount):
+    """
+    Get the object to hand over: the whole item, or a split-off part of
+    its stack.
+
+    Returns:
+        The object to move, or None if the amount is invalid
+    """
+    if amount is None:
+        return item
+    quantity = item.get_quantity() if hasattr(item, 'get_quantity') else 1
+    if amount < 1 or amount > quantity:
+        caller.msg(f"You only have {quantity} of {item.name}.")
+        return None
+    if amount == quantity:
+        return item
+    part = item.split(amount)
+    if not part:
+        caller.msg(f"You can't divide {item.name}.")
+    return part
+
+
+class CmdDrop(Command):
+    """
+    Drop an item, or part of a stack.
+
+    Usage:
+        drop <item>
+        drop <amount> <item>
+
+    Drops something from your inventory onto the ground.
+    """
+
+    key = "drop"
+    locks = "cmd:all()"
+    help_category = "Character"
+
+    def func(self):
+        """Execute the drop command"""
+        caller = self.caller
+        if not self.args:
+            caller.msg("Drop what?")
+            return
+
+        amount, name = parse_amount(self.args)
+        item = caller.search(name, location=caller,
+                             nofound_string=f"You aren't carrying '{name}'.")
+        if not item or not item.at_pre_drop(caller):
+            return
+
+        item = take_units(caller, item, amount)
+        if not item:
+            return
+
+        if not item.move_to(caller.location, quiet=True, move_type="drop"):
+            caller.msg("This couldn't be dropped.")
+            if hasattr(item, 'merge_into_stack'):
+                item.merge_into_stack()
+            return
+
+        caller.msg(f"You drop {item.get_display_name(caller)}.")
+        caller.location.msg_contents(f"{caller.name} drops {item.get_display_name()}.",
+                                     exclude=[caller])
+        item.at_drop(caller)
+
+
+class CmdGive(Command):
+    """
+    Give an item, or part of a stack, to someone.
+
+    Usage:
+        give <item> to <target>
+        give <amount> <item> to <target>
+
+    Hands something from your inventory to another character.
+    """
+
+    key = "give"
+    locks = "cmd:all()"
+    help_category = "Character"
+
+    def func(self):
+        """Execute the give command"""
+        caller = self.caller
+        if " to " not in self.args and "=" not in self.args:
+            caller.msg("Usage: give [<amount>] <item> to <target>")
+            return
+
+        item_args, target_name = self.args.rsplit(" to " if " to " in self.args else "=", 1)
+        amount, name = parse_amount(item_args)
+
+        item = caller.search(name, location=caller,
+                             nofound_string=f"You aren't carrying '{name}'.")
+        target = caller.search(target_name.strip())
+        if not item or not target:
+            return
+        if target == caller:
+            caller.msg(f"You keep {item.get_display_name(caller)} to yourself.")
+            return
+        if not item.at_pre_give(caller, target):
+            return
+
+        item = take_units(caller, item, amount)
+        if not item:
+            return
+
+        if not item.move_to(target, quiet=True, move_type="give"):
+            caller.msg(f"You could not give that to {target.get_display_name(caller)}.")
+            if hasattr(item, 'merge_into_stack'):
+                item.merge_into_stack()
+            return
+
+        caller.msg(f"You give {item.get_display_name(caller)} to {target.get_display_name(caller)}.")
+        target.msg(f"{caller.get_display_name(target)} gives you {item.get_display_name(target)}.")
+        item.at_give(caller, target)
+
+
 class CmdEquip(Command):
     """
     Equip a weapon or armor.
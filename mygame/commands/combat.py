@@ -191,7 +191,7 @@ class CmdCombatStatus(CombatCommand):
         # Send combat status
         self.caller.send_text_output(f"\n|w=== Combat Status ===|n", 'system')
         self.caller.send_text_output(
-            f"|wYour Health:|n {self.caller.db.hp}/{self.caller.db.max_hp}",
+            f"|wYour Health:|n {self.caller.get_hp()}/{self.caller.db.max_hp}",
             'system'
         )
         self.caller.send_text_output(
@@ -208,7 +208,7 @@ class CmdCombatStatus(CombatCommand):
             "type": "combat_event",
             "event": "health_updated",
             "player_health": {
-                "current": self.caller.db.hp,
+                "current": self.caller.get_hp(),
                 "max": self.caller.db.max_hp
             },
             "enemy_health": {
@@ -8,18 +8,24 @@ from evennia import default_cmds
 try:
     from .dialogue import CmdTalk, CmdSay, CmdAsk, CmdRead, CmdExamine, CmdLore
     from .character import (CmdStats, CmdInventory, CmdUse, CmdEquip,
-                           CmdUnequip, CmdCalling)
+                           CmdUnequip, CmdCalling, CmdDrop, CmdGive)
     from .combat import (CmdAttack, CmdDefend, CmdHeal, CmdFlee,
                         CmdCombatStatus, CmdFight)
     from .quests import CmdQuests, CmdAccept, CmdAbandon, CmdQuestInfo
+    from .navigation import CmdTravel
+    from .shop import CmdList, CmdBuy, CmdSell
+    from .trade import CmdTrade, CmdOffer
 except (ImportError, ValueError):
     # Fallback for Evennia's module loading context
     from dialogue import CmdTalk, CmdSay, CmdAsk, CmdRead, CmdExamine, CmdLore
     from character import (CmdStats, CmdInventory, CmdUse, CmdEquip,
-                          CmdUnequip, CmdCalling)
+                          CmdUnequip, CmdCalling, CmdDrop, CmdGive)
     from combat import (CmdAttack, CmdDefend, CmdHeal, CmdFlee,
                        CmdCombatStatus, CmdFight)
     from quests import CmdQuests, CmdAccept, CmdAbandon, CmdQuestInfo
+    from navigation import CmdTravel
+    from shop import CmdList, CmdBuy, CmdSell
+    from trade import CmdTrade, CmdOffer
 
 
 class UnloggedinCmdSet(default_cmds.UnloggedinCmdSet):
@@ -43,7 +49,17 @@ class CharacterCmdSet(default_cmds.CharacterCmdSet):
         self.add(CmdUse())
         self.add(CmdEquip())
         self.add(CmdUnequip())
+        self.add(CmdDrop())
+        self.add(CmdGive())
         self.add(CmdCalling())
+        self.add(CmdTravel())
+        # Shop commands
+        self.add(CmdList())
+        self.add(CmdBuy())
+        self.add(CmdSell())
+        # Trade commands
+        self.add(CmdTrade())
+        self.add(CmdOffer())
         # Quest commands
         self.add(CmdQuests())
         self.add(CmdAccept())
@@ -4,6 +4,14 @@ Dialogue and NPC interaction commands for Journey Through Scripture
 
 from evennia import Command
 
+from world.knowledge import get_knowledge
+
+# Handle imports in both direct and Evennia contexts
+try:
+    from ..conversations import get_conversations
+except (ImportError, ValueError):
+    from conversations import get_conversations
+
 
 class CmdTalk(Command):
     """
@@ -69,7 +77,8 @@ class CmdSay(Command):
     def func(self):
         """Execute the say command"""
         # Check if in dialogue
-        if not self.caller.db.talking_to:
+        npc = get_conversations().partner(self.caller)
+        if not npc:
             # If not in dialogue and user just typed a number, ignore
             if self.cmdstring in ["1", "2", "3", "4", "5", "6", "7", "8", "9"]:
                 return
@@ -87,7 +96,6 @@ class CmdSay(Command):
             return
 
         # Pass to NPC
-        npc = self.caller.db.talking_to
         npc.respond(self.caller, choice_num)
 
 
@@ -98,7 +106,8 @@ class CmdAsk(Command):
     Usage:
         ask <npc> about <topic>
 
-    Ask an NPC about a specific topic. Some NPCs have special knowledge about certain subjects.
+    Ask an NPC about a specific topic. NPCs know what they talk about,
+    and the lore of the places around them.
     """
 
     key = "ask"
@@ -126,10 +135,16 @@ class CmdAsk(Command):
         if not npc:
             return
 
-        # Check if NPC has knowledge of topic
-        if hasattr(npc.db, 'knowledge') and self.topic.lower() in npc.db.knowledge:
-            response = npc.db.knowledge[self.topic.lower()]
-            self.caller.msg(f"{npc.name} says, \"{response}\"")
+        # Answers set on the NPC itself take precedence
+        knowledge = npc.db.knowledge or {}
+        if self.topic.lower() in knowledge:
+            self.caller.msg(f"{npc.name} says, \"{knowledge[self.topic.lower()]}\"")
+            return
+
+        npc_id = npc.tags.get(category="world_npc") or npc.db.dialogue_id
+        answer = get_knowledge().ask(npc_id, self.topic) if npc_id else None
+        if answer:
+            self.caller.msg(f"{npc.name} says, \"{answer.text}\"")
         else:
             self.caller.msg(f"{npc.name} doesn't seem to know about {self.topic}.")
 
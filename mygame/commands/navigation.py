@@ -0,0 +1,129 @@
+"""
+Navigation Commands for Journey Through Scripture
+
+Commands for finding your way around the Palace: travel
+"""
+
+from evennia import Command
+from evennia.utils.utils import delay
+
+from world.content_index import get_content_index
+from world.world_graph import get_world_graph, get_room_id
+
+
+# Seconds between steps while travelling
+TRAVEL_STEP_DELAY = 1.5
+
+
+def _travel_step(caller, token, steps):
+    """
+    Take the next step of a journey, then schedule the one after.
+
+    Args:
+        caller: Travelling character
+        token: Journey this step belongs to; stale steps are dropped
+        steps (list): Remaining (exit_name, room_id) steps
+    """
+    if caller.ndb.travel_token is not token:
+        return
+    if caller.db.in_combat:
+        caller.ndb.travel_token = None
+        caller.send_text_output("Your journey is interrupted by battle!", "combat")
+        return
+
+    exit_name, room_id = steps[0]
+    exit_obj = None
+    location = caller.location
+    if location:
+        for obj in location.contents:
+            if obj.destination and obj.key == exit_name:
+                exit_obj = obj
+                break
+
+    if not exit_obj or not exit_obj.access(caller, "traverse"):
+        caller.ndb.travel_token = None
+        caller.send_text_output(f"The way {exit_name} is blocked. You stop travelling.", "error")
+        return
+
+    exit_obj.at_traverse(caller, exit_obj.destination)
+    if caller.location != exit_obj.destination:
+        caller.ndb.travel_token = None
+        return
+
+    if len(steps) > 1:
+        delay(TRAVEL_STEP_DELAY, _travel_step, caller, token, steps[1:])
+    else:
+        caller.ndb.travel_token = None
+        caller.send_text_output("You have arrived.", "success")
+
+
+class CmdTravel(Command):
+    """
+    Travel to a room by the shortest route.
+
+    Usage:
+        travel <room>
+        travel sanctuary
+        travel stop
+
+    Walks you room by room to your destination. Use 'travel sanctuary'
+    to head for the nearest place of safety.
+    """
+
+    key = "travel"
+    aliases = ["goto", "walkto"]
+    locks = "cmd:all()"
+    help_category = "General"
+
+    def func(self):
+        """Execute travel command"""
+        caller = self.caller
+        query = self.args.strip().lower()
+
+        if not query:
+            caller.msg("Travel where? Usage: travel <room>")
+            return
+
+        if query == "stop":
+            if caller.ndb.travel_token:
+                caller.ndb.travel_token = None
+                caller.send_text_output("You stop travelling.", "info")
+            else:
+                caller.msg("You are not travelling anywhere.")
+            return
+
+        if caller.db.in_combat:
+            caller.send_text_output("You cannot travel while in combat!", "error")
+            return
+
+        graph = get_world_graph()
+        source_id = get_room_id(caller.location)
+        if not source_id:
+            caller.msg("You cannot find your bearings here.")
+            return
+
+        if query in ("sanctuary", "safe", "safety"):
+            target_id = graph.nearest_safe_room(source_id)
+            if not target_id:
+                caller.msg("There is no sanctuary within reach.")
+                return
+        else:
+            target_id = graph.find_room(query)
+            if not target_id:
+                caller.msg(f"You know of no place called '{self.args.strip()}'.")
+                return
+
+        steps = graph.path(source_id, target_id)
+        target_name = get_content_index().room(target_id)['key']
+        if steps is None:
+            caller.msg(f"You see no way to reach {target_name} from here.")
+            return
+        if not steps:
+            caller.msg(f"You are already at {target_name}.")
+            return
+
+        token = object()
+        caller.ndb.travel_token = token
+        route = ", ".join(exit_name for exit_name, _ in steps)
+        caller.send_text_output(f"You set out for {target_name} ({route}).", "info")
+        _travel_step(caller, token, steps)
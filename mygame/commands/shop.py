@@ -0,0 +1,124 @@
+"""
+Shop Commands for Journey Through Scripture
+
+Browse, buy from and sell to the merchants in your room.
+"""
+
+from evennia import Command
+
+from commands.character import parse_amount, take_units
+
+# Handle imports in both direct and Evennia contexts
+try:
+    from ..shops import get_shops
+except (ImportError, ValueError):
+    from shops import get_shops
+
+
+def find_merchant(caller):
+    """
+    Find a merchant in the caller's room.
+
+    Returns:
+        The first merchant present, or None (after telling the caller)
+    """
+    for obj in caller.location.contents if caller.location else []:
+        if obj.db.merchant:
+            return obj
+    caller.msg("There is no merchant here.")
+    return None
+
+
+class CmdList(Command):
+    """
+    Browse a merchant's wares.
+
+    Usage:
+        list
+        wares
+
+    Shows what the merchant here sells, with prices and stock.
+    """
+
+    key = "list"
+    aliases = ["wares", "browse"]
+    locks = "cmd:all()"
+    help_category = "Shop"
+
+    def func(self):
+        """Execute the list command"""
+        merchant = find_merchant(self.caller)
+        if merchant:
+            self.caller.msg(get_shops().listing(merchant))
+
+
+class CmdBuy(Command):
+    """
+    Buy from a merchant.
+
+    Usage:
+        buy <item>
+        buy <amount> <item>
+
+    Buys from the merchant in your room. See |wlist|n for prices.
+    """
+
+    key = "buy"
+    aliases = ["purchase"]
+    locks = "cmd:all()"
+    help_category = "Shop"
+
+    def func(self):
+        """Execute the buy command"""
+        caller = self.caller
+        if not self.args:
+            caller.msg("Buy what?")
+            return
+
+        merchant = find_merchant(caller)
+        if not merchant:
+            return
+        amount, name = parse_amount(self.args)
+        if amount is not None and amount < 1:
+            caller.msg("You must buy at least one.")
+            return
+        get_shops().buy(caller, merchant, name, amount or 1)
+
+
+class CmdSell(Command):
+    """
+    Sell to a merchant.
+
+    Usage:
+        sell <item>
+        sell <amount> <item>
+
+    Merchants pay half an item's value. Sacred quest items can't be sold.
+    """
+
+    key = "sell"
+    locks = "cmd:all()"
+    help_category = "Shop"
+
+    def func(self):
+        """Execute the sell command"""
+        caller = self.caller
+        if not self.args:
+            caller.msg("Sell what?")
+            return
+
+        merchant = find_merchant(caller)
+        if not merchant:
+            return
+        amount, name = parse_amount(self.args)
+        item = caller.search(name, location=caller,
+                             nofound_string=f"You aren't carrying '{name}'.")
+        if not item:
+            return
+        if not hasattr(item, 'get_quantity'):
+            caller.msg(f"{merchant.name} isn't interested in that.")
+            return
+
+        item = take_units(caller, item, amount)
+        if item and not get_shops().sell(caller, merchant, item):
+            item.merge_into_stack()
@@ -0,0 +1,91 @@
+"""
+Trade Commands for Journey Through Scripture
+
+Trade items and shekels with another pilgrim in the same room.
+"""
+
+from evennia import Command
+
+from commands.character import parse_amount
+
+# Handle imports in both direct and Evennia contexts
+try:
+    from ..trading import get_trades
+except (ImportError, ValueError):
+    from trading import get_trades
+
+
+class CmdTrade(Command):
+    """
+    Trade with another pilgrim.
+
+    Usage:
+        trade <character>   - propose a trade (or agree to theirs)
+        trade               - show the current offers
+        trade accept        - accept the offers as they stand
+        trade cancel        - call the trade off
+
+    Both sides add goods with |woffer|n. Nothing changes hands until you
+    both accept, and then everything is exchanged at once.
+    """
+
+    key = "trade"
+    locks = "cmd:all()"
+    help_category = "Character"
+
+    def func(self):
+        """Execute the trade command"""
+        caller = self.caller
+        trades = get_trades()
+        args = self.args.strip()
+
+        if not args:
+            session = trades.session_for(caller)
+            caller.msg(session.describe(caller) if session else "Usage: trade <character>")
+        elif args.lower() == "accept":
+            trades.accept(caller)
+        elif args.lower() in ("cancel", "decline"):
+            trades.cancel(caller)
+        else:
+            target = caller.search(args)
+            if target:
+                trades.request(caller, target)
+
+
+class CmdOffer(Command):
+    """
+    Put goods on your side of a trade.
+
+    Usage:
+        offer <item>
+        offer <amount> <item>
+        offer <amount> shekels
+
+    Offering an item again replaces the amount. Offer 0 shekels to take
+    your shekels off the table.
+    """
+
+    key = "offer"
+    locks = "cmd:all()"
+    help_category = "Character"
+
+    def func(self):
+        """Execute the offer command"""
+        caller = self.caller
+        if not self.args:
+            caller.msg("Offer what?")
+            return
+
+        amount, name = parse_amount(self.args)
+        if name.lower() in ("shekel", "shekels", "currency"):
+            get_trades().offer_currency(caller, amount or 0)
+            return
+
+        item = caller.search(name, location=caller,
+                             nofound_string=f"You aren't carrying '{name}'.")
+        if not item:
+            return
+        if not hasattr(item, 'get_quantity'):
+            caller.msg("You can't trade that.")
+            return
+        get_trades().offer_item(caller, item, amount or item.get_quantity())
@@ -0,0 +1,128 @@
+"""
+Conversation Sessions for Journey Through Scripture
+
+Who is talking to which NPC, kept in memory rather than in Attributes.
+A conversation lapses after DIALOGUE_TIMEOUT seconds without a choice.
+The table lives in this server process only; on a reload the open
+conversations are saved to ServerConfig and picked back up, so nobody
+is cut off mid-sentence by a code update.
+"""
+
+import time
+
+# Seconds a conversation stays open without a choice
+DIALOGUE_TIMEOUT = 300
+
+# ServerConfig key holding conversations across a reload
+SAVED_KEY = "dialogue_sessions"
+
+
+class ConversationTable:
+    """Open conversations by character"""
+
+    def __init__(self):
+        """Initialize an empty table"""
+        self.sessions = {}   # char id -> [npc, state, expires]
+
+    def start(self, character, npc, state="main_menu"):
+        """Open (or replace) a character's conversation"""
+        self.sweep()
+        self.sessions[character.id] = [npc, state, time.time() + DIALOGUE_TIMEOUT]
+
+    def partner(self, character):
+        """
+        Get the NPC a character is talking to, extending the timeout.
+
+        Returns:
+            The NPC, or None if there is no live conversation
+        """
+        session = self.sessions.get(character.id)
+        if not session:
+            return None
+        now = time.time()
+        if session[2] < now or not session[0].pk or session[0].location != character.location:
+            del self.sessions[character.id]
+            return None
+        session[2] = now + DIALOGUE_TIMEOUT
+        return session[0]
+
+    def state(self, character):
+        """Get the dialogue state of a character's conversation, or None"""
+        session = self.sessions.get(character.id)
+        return session[1] if session else None
+
+    def talking_with(self, npc, characters):
+        """
+        Check whether any of some characters is talking to an NPC.
+
+        Args:
+            npc: The NPC
+            characters (dict): char_id -> character
+
+        Returns:
+            bool: True if one of them has a live conversation with it
+        """
+        now = time.time()
+        return any(session[0] == npc and session[2] >= now
+                   for session in map(self.sessions.get, characters) if session)
+
+    def end(self, character):
+        """Close a character's conversation"""
+        self.sessions.pop(character.id, None)
+
+    def sweep(self):
+        """
+        Drop every lapsed conversation.
+
+        Returns:
+            int: Conversations dropped
+        """
+        now = time.time()
+        expired = [char_id for char_id, session in self.sessions.items() if session[2] < now]
+        for char_id in expired:
+            del self.sessions[char_id]
+        return len(expired)
+
+    def save(self):
+        """Store open conversations so they survive a reload"""
+        from evennia.server.models import ServerConfig
+
+        self.sweep()
+        now = time.time()
+        saved = [(char_id, npc.id, state, expires - now)
+                 for char_id, (npc, state, expires) in self.sessions.items() if npc.pk]
+        ServerConfig.objects.conf(SAVED_KEY, value=saved)
+
+    def restore(self):
+        """
+        Pick up conversations saved before a reload.
+
+        Returns:
+            int: Conversations restored
+        """
+        from evennia.objects.models import ObjectDB
+        from evennia.server.models import ServerConfig
+
+        saved = ServerConfig.objects.conf(SAVED_KEY, default=None)
+        if not saved:
+            return 0
+        ServerConfig.objects.conf(SAVED_KEY, delete=True)
+
+        npcs = ObjectDB.objects.in_bulk([npc_id for _, npc_id, _, _ in saved])
+        now = time.time()
+        for char_id, npc_id, state, remaining in saved:
+            if npc_id in npcs:
+                self.sessions[char_id] = [npcs[npc_id], state, now + remaining]
+        return len(self.sessions)
+
+
+# Conversations for this server process
+_conversations = None
+
+
+def get_conversations():
+    """Get the conversation table"""
+    global _conversations
+    if _conversations is None:
+        _conversations = ConversationTable()
+    return _conversations
@@ -313,6 +313,13 @@ for floor, encounters in ENCOUNTERS_BY_FLOOR.items():
             ENCOUNTERS_BY_ROOM[room_key] = []
         ENCOUNTERS_BY_ROOM[room_key].append(encounter)
 
+# Map encounter IDs to encounters
+ENCOUNTERS_BY_ID = {
+    enc_id: encounter
+    for encounters in ENCOUNTERS_BY_FLOOR.values()
+    for enc_id, encounter in encounters.items()
+}
+
 
 class EncounterManager:
     """Manages encounters for a room or location"""
@@ -384,11 +391,9 @@ class EncounterManager:
         Args:
             encounter_id: ID of encounter to disable
         """
-        # Search through all encounters
-        for floor, encounters in ENCOUNTERS_BY_FLOOR.items():
-            if encounter_id in encounters:
-                encounters[encounter_id].active = False
-                break
+        encounter = ENCOUNTERS_BY_ID.get(encounter_id)
+        if encounter:
+            encounter.active = False
 
 
 # Singleton instance
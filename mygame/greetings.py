@@ -0,0 +1,115 @@
+"""
+Greeting Throttle for Journey Through Scripture
+
+NPCs greet a character when they walk in, but not every time: once an
+NPC has greeted someone it stays quiet toward them for GREETING_COOLDOWN
+seconds. Rooms collect the greetings of every NPC present into a single
+message (see Room.at_object_receive), so pacing through a crowded
+courtyard costs one line of output, not one per NPC per visit.
+
+Who has been greeted is kept in a two-generation expiring set: pairs go
+into the current generation, and when a generation is COOLDOWN old the
+previous one is dropped whole. Membership is two set lookups, expiry
+needs no per-entry timestamps or sweeps, and memory is bounded by the
+greetings made in the last two cooldowns.
+"""
+
+import time
+
+# Seconds an NPC stays quiet toward a character it has greeted
+GREETING_COOLDOWN = 600
+
+
+class ExpiringSet:
+    """
+    Set whose members expire between ttl and 2 * ttl seconds after being
+    added.
+    """
+
+    __slots__ = ("ttl", "current", "previous", "rotated_at")
+
+    def __init__(self, ttl):
+        """
+        Args:
+            ttl (float): Minimum seconds a member is kept
+        """
+        self.ttl = ttl
+        self.current = set()
+        self.previous = set()
+        self.rotated_at = time.time()
+
+    def _rotate(self, now):
+        """Retire whole generations that have aged out"""
+        age = now - self.rotated_at
+        if age < self.ttl:
+            return
+        self.previous = self.current if age < 2 * self.ttl else set()
+        self.current = set()
+        self.rotated_at = now
+
+    def __contains__(self, member):
+        self._rotate(time.time())
+        return member in self.current or member in self.previous
+
+    def add(self, member):
+        """Add (or refresh) a member"""
+        self._rotate(time.time())
+        self.current.add(member)
+
+    def __len__(self):
+        return len(self.current | self.previous)
+
+
+class GreetingThrottle:
+    """Which NPCs have recently greeted which characters"""
+
+    def __init__(self, cooldown=GREETING_COOLDOWN):
+        """Initialize with nobody greeted"""
+        self.greeted = ExpiringSet(cooldown)
+
+    def claim(self, npc, character):
+        """
+        Check whether an NPC may greet a character, and if so record it.
+
+        Returns:
+            bool: True if the NPC hasn't greeted them within the cooldown
+        """
+        pair = (npc.id, character.id)
+        if pair in self.greeted:
+            return False
+        self.greeted.add(pair)
+        return True
+
+    def greetings(self, room, character):
+        """
+        Collect the greetings of every NPC in a room for an arriving
+        character, skipping NPCs that greeted them recently.
+
+        Args:
+            room: Room the character entered
+            character: The character
+
+        Returns:
+            list: Greeting lines, in NPC order
+        """
+        npcs = room.get_contents("npcs") if hasattr(room, 'get_contents') else room.contents
+        lines = []
+        for npc in npcs:
+            if not hasattr(npc, 'greeting_for') or npc.db.defeated:
+                continue
+            line = npc.greeting_for(character)
+            if line and self.claim(npc, character):
+                lines.append(line)
+        return lines
+
+
+# Greeting throttle for this server process
+_throttle = None
+
+
+def get_greetings():
+    """Get the greeting throttle"""
+    global _throttle
+    if _throttle is None:
+        _throttle = GreetingThrottle()
+    return _throttle
@@ -0,0 +1,344 @@
+"""
+Currency Ledger for Journey Through Scripture
+
+Every shekel that changes hands goes through here. A transaction is one
+line in an append-only log: a sequence number, a kind (kill_reward,
+quest_reward, purchase, sale, trade, ...), an optional idempotency ref
+and its postings, as (character id, amount) pairs. Balances are kept
+in memory, and a transaction either applies all its postings or none.
+
+Transactions whose side effects are saved at once (a creature killed,
+a quest completed, items bought, sold or traded) are written and fsynced
+to the log before post() returns; openings wait for the next commit.
+Balances are group-committed: about once a second each touched
+character's db.currency is updated in a single Attribute batch along
+with the last sequence number it has absorbed (db.ledger_seq). After a
+crash, recover() replays any logged postings a character has not
+absorbed yet.
+
+Every character's logged sum and latest postings are kept in memory, so
+audits and reconciles never read the log. Once the log holds
+LEDGER_ROTATE_ENTRIES committed entries, those figures are written to a
+snapshot and the log is archived, so recovery only reads the snapshot
+and the entries since. Refs are remembered for the current log and the
+one before it (like greetings.ExpiringSet), so replaying a reward with
+the same ref is a no-op without the set growing forever.
+"""
+
+import json
+import os
+import time
+from collections import deque
+
+from evennia.utils import logger
+from evennia.utils.utils import delay
+
+LEDGER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "server", "logs", "ledger.jsonl")
+
+# Seconds to gather transactions into one commit
+LEDGER_FLUSH_DELAY = 1.0
+
+# Kinds logged before post() returns, because what they pay for is
+# saved straight away
+DURABLE_KINDS = frozenset({"kill_reward", "quest_reward", "purchase", "sale", "trade"})
+
+# Committed entries in the log before it is snapshotted and archived
+LEDGER_ROTATE_ENTRIES = 10000
+
+# Latest entries kept per character for audits
+AUDIT_HISTORY = 50
+
+
+class LedgerError(ValueError):
+    """Raised when a transaction would overdraw a balance"""
+
+
+class Ledger:
+    """In-memory balances over an append-only transaction log"""
+
+    def __init__(self, path=LEDGER_PATH):
+        """
+        Initialize an empty ledger.
+
+        Args:
+            path (str): Transaction log file
+        """
+        self.path = path
+        self.snapshot_path = os.path.splitext(path)[0] + ".snapshot.json"
+        self.seq = 0
+        self.logged_seq = 0     # seq of the last entry in the log
+        self.log_entries = 0    # entries in the log since the last rotation
+        self.balances = {}      # char id -> shekels
+        self.last_seq = {}      # char id -> seq of its latest posting
+        self.sums = {}          # char id -> sum of every posting
+        self.history = {}       # char id -> its latest entries
+        self.refs = set()       # idempotency refs posted since the last rotation
+        self.old_refs = set()   # ... and in the log before that
+        self.pending = []       # entries not yet in the log
+        self.dirty = {}         # char id -> character with unwritten balance
+        self.flush_pending = False
+
+    def index(self, entry):
+        """Count an entry toward the sequence, refs, sums and histories"""
+        self.seq = max(self.seq, entry["seq"])
+        if entry.get("ref"):
+            self.refs.add(entry["ref"])
+        for char_id, amount in entry["postings"]:
+            self.sums[char_id] = self.sums.get(char_id, 0) + amount
+            self.history.setdefault(char_id, deque(maxlen=AUDIT_HISTORY)).append(entry)
+
+    def read_snapshot(self):
+        """Load the figures saved at the last rotation"""
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except FileNotFoundError:
+            return 0
+        self.seq = snapshot["seq"]
+        self.sums = {int(char_id): total for char_id, total in snapshot["sums"].items()}
+        self.history = {int(char_id): deque(entries, maxlen=AUDIT_HISTORY)
+                        for char_id, entries in snapshot["history"].items()}
+        self.old_refs = set(snapshot["refs"])
+        return snapshot["seq"]
+
+    def read_log(self):
+        """Yield every entry in the current log, oldest first"""
+        try:
+            with open(self.path, encoding="utf-8") as log:
+                for line in log:
+                    if line.strip():
+                        yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def recover(self):
+        """
+        Restore the sequence counter, refs, sums and histories from the
+        snapshot and the log, and apply any logged postings that never
+        reached their characters.
+
+        Returns:
+            int: Characters repaired
+        """
+        from evennia.objects.models import ObjectDB
+        from evennia.server.models import ServerConfig
+
+        checkpoint = ServerConfig.objects.conf("ledger_checkpoint", default=0) or 0
+        snapshot_seq = self.read_snapshot()
+        unapplied = {}
+        for entry in self.read_log():
+            self.log_entries += 1
+            # A log that was snapshotted but not yet archived
+            if entry["seq"] <= snapshot_seq:
+                continue
+            self.index(entry)
+            if entry["seq"] > checkpoint:
+                for char_id, amount in entry["postings"]:
+                    unapplied.setdefault(char_id, []).append((entry["seq"], entry["kind"], amount))
+
+        repaired = 0
+        for char_id, character in ObjectDB.objects.in_bulk(list(unapplied)).items():
+            absorbed = character.db.ledger_seq or 0
+            missed = [posting for posting in unapplied[char_id] if posting[0] > absorbed]
+            if not missed:
+                continue
+            currency = character.db.currency or 0
+            for _, kind, amount in missed:
+                # An opening entry is the pre-ledger purse db.currency still
+                # holds, so it sets the balance rather than adding to it
+                currency = amount if kind == "opening" else currency + amount
+            character.attributes.batch_add(
+                ("currency", currency),
+                ("ledger_seq", missed[-1][0]),
+            )
+            repaired += 1
+
+        self.logged_seq = self.seq
+        ServerConfig.objects.conf("ledger_checkpoint", value=self.seq)
+        if repaired:
+            logger.log_info(f"Ledger: replayed missed postings for {repaired} character(s)")
+        return repaired
+
+    def balance(self, character):
+        """
+        Get a character's current balance.
+
+        A balance from before the ledger existed is posted once as an
+        opening entry, so every balance is the sum of its log postings.
+        """
+        if character.id not in self.balances:
+            self.balances[character.id] = 0
+            if character.db.ledger_seq is None and character.db.currency:
+                self.post("opening", [(character, character.db.currency or 0)],
+                          ref=f"opening:{character.id}")
+            else:
+                self.balances[character.id] = character.db.currency or 0
+        return self.balances[character.id]
+
+    def post(self, kind, postings, ref=None, memo=None):
+        """
+        Apply one transaction atomically.
+
+        Args:
+            kind (str): What the transaction is for (kill_reward, purchase, ...)
+            postings (list): (character, amount) pairs; amounts may be negative
+            ref (str): Idempotency ref; a ref already posted is skipped
+            memo (str): Free-form note for audits
+
+        Returns:
+            dict: The logged entry, or None if ref was already posted
+
+        Raises:
+            LedgerError: If any balance would go negative (nothing is applied)
+        """
+        if ref and (ref in self.refs or ref in self.old_refs):
+            return None
+
+        totals = {}
+        for character, amount in postings:
+            totals[character] = totals.get(character, 0) + int(amount)
+        for character, amount in totals.items():
+            if self.balance(character) + amount < 0:
+                raise LedgerError(f"{character.key} cannot cover {-amount} shekels")
+
+        self.seq += 1
+        entry = {"seq": self.seq, "time": time.time(), "kind": kind, "ref": ref,
+                 "postings": [[character.id, amount] for character, amount in totals.items()]}
+        if memo:
+            entry["memo"] = memo
+
+        for character, amount in totals.items():
+            self.balances[character.id] += amount
+            self.last_seq[character.id] = self.seq
+            self.dirty[character.id] = character
+        self.index(entry)
+        self.pending.append(entry)
+        if kind in DURABLE_KINDS:
+            self.write_log()
+
+        if not self.flush_pending:
+            self.flush_pending = True
+            delay(LEDGER_FLUSH_DELAY, self.flush)
+        return entry
+
+    def credit(self, character, amount, kind, ref=None, memo=None):
+        """Pay shekels into a character's purse"""
+        return self.post(kind, [(character, amount)], ref=ref, memo=memo)
+
+    def debit(self, character, amount, kind, ref=None, memo=None):
+        """Take shekels from a character's purse (LedgerError if short)"""
+        return self.post(kind, [(character, -amount)], ref=ref, memo=memo)
+
+    def transfer(self, sender, receiver, amount, kind="trade", ref=None, memo=None):
+        """Move shekels between two characters in one transaction"""
+        return self.post(kind, [(sender, -amount), (receiver, amount)], ref=ref, memo=memo)
+
+    def write_log(self):
+        """
+        Append queued entries to the log and fsync it.
+
+        Returns:
+            bool: False if the log could not be written (the entries
+                stay queued for the next commit)
+        """
+        if not self.pending:
+            return True
+        pending, self.pending = self.pending, []
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as log:
+                log.write("".join(json.dumps(entry, separators=(",", ":")) + "\n"
+                                  for entry in pending))
+                log.flush()
+                os.fsync(log.fileno())
+        except OSError as err:
+            logger.log_err(f"Ledger: could not write log: {err}")
+            self.pending = pending + self.pending
+            return False
+        self.logged_seq = pending[-1]["seq"]
+        self.log_entries += len(pending)
+        return True
+
+    def flush(self):
+        """Commit queued transactions: log first, then balances"""
+        from evennia.server.models import ServerConfig
+
+        self.flush_pending = False
+        if not self.write_log():
+            # Try again on the next commit
+            self.flush_pending = True
+            delay(LEDGER_FLUSH_DELAY, self.flush)
+            return
+        if not self.dirty:
+            return
+
+        dirty, self.dirty = self.dirty, {}
+        for char_id, character in dirty.items():
+            if character.pk:
+                character.attributes.batch_add(("currency", self.balances[char_id]),
+                                               ("ledger_seq", self.last_seq[char_id]))
+        ServerConfig.objects.conf("ledger_checkpoint", value=self.logged_seq)
+
+        if self.log_entries >= LEDGER_ROTATE_ENTRIES:
+            self.rotate()
+
+    def rotate(self):
+        """
+        Snapshot sums, histories and refs at the checkpoint, then archive
+        the log so recovery starts from the snapshot. Only called right
+        after a commit, when every logged entry is checkpointed.
+        """
+        snapshot = {
+            "seq": self.logged_seq,
+            "sums": self.sums,
+            "history": {char_id: list(entries) for char_id, entries in self.history.items()},
+            "refs": sorted(self.refs),
+        }
+        archive = f"{os.path.splitext(self.path)[0]}-{self.logged_seq}.jsonl"
+        try:
+            with open(self.snapshot_path + ".tmp", "w", encoding="utf-8") as snapshot_file:
+                json.dump(snapshot, snapshot_file, separators=(",", ":"))
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(self.snapshot_path + ".tmp", self.snapshot_path)
+            os.replace(self.path, archive)
+        except OSError as err:
+            # The log keeps growing and rotation is tried after the next commit
+            logger.log_err(f"Ledger: could not rotate log: {err}")
+            return
+        self.old_refs, self.refs = self.refs, set()
+        self.log_entries = 0
+
+    def audit(self, character, limit=20):
+        """
+        Get a character's most recent transactions (up to AUDIT_HISTORY).
+
+        Returns:
+            list: Entries touching the character, newest last
+        """
+        return list(self.history.get(character.id, ()))[-limit:]
+
+    def reconcile(self):
+        """
+        Check every loaded balance against the sum of its postings.
+
+        Returns:
+            dict: char id -> (balance, posted sum) for each mismatch
+        """
+        return {char_id: (balance, self.sums.get(char_id, 0))
+                for char_id, balance in self.balances.items()
+                if balance != self.sums.get(char_id, 0)}
+
+
+# Ledger for this server process, recovered on first use
+_ledger = None
+
+
+def get_ledger():
+    """Get the ledger, recovering it from the log on first use"""
+    global _ledger
+    if _ledger is None:
+        _ledger = Ledger()
+        _ledger.recover()
+    return _ledger
@@ -0,0 +1,260 @@
+"""
+Loot System for Journey Through Scripture
+
+Weighted, level-tiered loot tables for creatures and bosses. Every tier
+is compiled into an alias sampler when this module loads, so each roll
+is one O(1) draw no matter how long the table grows.
+"""
+
+import bisect
+import random
+
+
+# Loot tables per creature type. Each table is a list of tiers; the tier
+# with the highest min_level not above the creature's level is used.
+# Entries are (item_id, weight, min_qty, max_qty); item_id None means
+# that roll drops nothing.
+CREATURE_LOOT = {
+    "orc": [
+        {"min_level": 1, "rolls": 1, "entries": [
+            (None, 40, 0, 0),
+            ("temple_shekel", 30, 3, 8),
+            ("fresh_bread", 20, 1, 1),
+            ("olive_branch", 10, 1, 2),
+        ]},
+        {"min_level": 3, "rolls": 2, "entries": [
+            (None, 30, 0, 0),
+            ("temple_shekel", 30, 6, 15),
+            ("bandages", 20, 1, 2),
+            ("previous_pilgrim_weapon", 5, 1, 1),
+            ("grain", 15, 1, 2),
+        ]},
+    ],
+    "demon": [
+        {"min_level": 1, "rolls": 1, "entries": [
+            (None, 35, 0, 0),
+            ("brazier_ash", 30, 1, 2),
+            ("temple_shekel", 25, 5, 10),
+            ("false_scripture", 10, 1, 1),
+        ]},
+        {"min_level": 3, "rolls": 2, "entries": [
+            (None, 25, 0, 0),
+            ("brazier_ash", 25, 1, 3),
+            ("temple_shekel", 25, 10, 20),
+            ("anointing_oil", 15, 1, 1),
+            ("false_scripture", 10, 1, 1),
+        ]},
+    ],
+    "serpent": [
+        {"min_level": 1, "rolls": 1, "entries": [
+            (None, 40, 0, 0),
+            ("hyssop_branch", 30, 1, 2),
+            ("medicinal_herbs", 20, 1, 2),
+            ("temple_shekel", 10, 4, 8),
+        ]},
+        {"min_level": 3, "rolls": 2, "entries": [
+            (None, 30, 0, 0),
+            ("medicinal_herbs", 30, 1, 3),
+            ("rare_herb", 15, 1, 1),
+            ("temple_shekel", 25, 8, 16),
+        ]},
+    ],
+    "dark_knight": [
+        {"min_level": 1, "rolls": 1, "entries": [
+            (None, 30, 0, 0),
+            ("temple_shekel", 35, 8, 15),
+            ("bandages", 20, 1, 2),
+            ("previous_pilgrim_weapon", 15, 1, 1),
+        ]},
+        {"min_level": 3, "rolls": 2, "entries": [
+            (None, 25, 0, 0),
+            ("temple_shekel", 35, 12, 25),
+            ("healing_ointment", 25, 1, 1),
+            ("forgotten_sword", 5, 1, 1),
+            ("previous_pilgrim_weapon", 10, 1, 1),
+        ]},
+    ],
+    "nephilim": [
+        {"min_level": 1, "rolls": 2, "entries": [
+            (None, 30, 0, 0),
+            ("temple_shekel", 35, 10, 20),
+            ("healing_bread", 25, 1, 2),
+            ("bronze_gate_fragment", 10, 1, 1),
+        ]},
+    ],
+    "behemoth": [
+        {"min_level": 1, "rolls": 2, "entries": [
+            (None, 25, 0, 0),
+            ("temple_shekel", 35, 15, 30),
+            ("grain", 20, 2, 4),
+            ("healing_ointment", 20, 1, 2),
+        ]},
+    ],
+    "leviathan": [
+        {"min_level": 1, "rolls": 3, "entries": [
+            (None, 20, 0, 0),
+            ("temple_shekel", 35, 20, 40),
+            ("fountain_water", 25, 1, 3),
+            ("rare_herb", 15, 1, 1),
+            ("illuminated_manuscript", 5, 1, 1),
+        ]},
+    ],
+}
+
+# Boss loot by NPC id. "guaranteed" items go to whoever landed the final
+# blow; every character present also rolls the tiered table.
+BOSS_LOOT = {
+    "the_deceiver": {
+        "guaranteed": ["deceiver_staff"],
+        "tiers": [
+            {"min_level": 1, "rolls": 2, "entries": [
+                ("temple_shekel", 40, 20, 40),
+                ("false_scripture", 20, 1, 1),
+                ("anointing_oil", 20, 1, 1),
+                ("scroll_of_psalms", 15, 1, 1),
+                ("cryptic_map", 5, 1, 1),
+            ]},
+        ],
+    },
+}
+
+
+class AliasSampler:
+    """
+    Walker/Vose alias table for constant-time weighted draws.
+    """
+
+    __slots__ = ("outcomes", "prob", "alias")
+
+    def __init__(self, outcomes, weights):
+        """
+        Compile the table.
+
+        Args:
+            outcomes (list): Things to draw
+            weights (list): Positive weight for each outcome
+        """
+        count = len(outcomes)
+        total = float(sum(weights))
+        scaled = [weight * count / total for weight in weights]
+        self.outcomes = tuple(outcomes)
+        self.prob = [1.0] * count
+        self.alias = list(range(count))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+    def draw(self, rng=random):
+        """Draw one outcome"""
+        i = rng.randrange(len(self.outcomes))
+        return self.outcomes[i] if rng.random() < self.prob[i] else self.outcomes[self.alias[i]]
+
+
+def compile_tiers(tiers):
+    """
+    Compile a table's tiers into samplers.
+
+    Returns:
+        tuple: (sorted min levels, [(rolls, sampler)] in the same order)
+    """
+    tiers = sorted(tiers, key=lambda tier: tier["min_level"])
+    levels = [tier["min_level"] for tier in tiers]
+    compiled = []
+    for tier in tiers:
+        entries = tier["entries"]
+        outcomes = [(item_id, low, high) for item_id, _, low, high in entries]
+        compiled.append((tier["rolls"], AliasSampler(outcomes, [entry[1] for entry in entries])))
+    return levels, compiled
+
+
+# Compiled once at load
+COMPILED_CREATURE_LOOT = {name: compile_tiers(tiers) for name, tiers in CREATURE_LOOT.items()}
+COMPILED_BOSS_LOOT = {name: compile_tiers(table["tiers"]) for name, table in BOSS_LOOT.items()}
+
+
+def _roll(compiled, level, rng):
+    """Roll a compiled table for one character at a level"""
+    levels, tiers = compiled
+    index = bisect.bisect_right(levels, level) - 1
+    if index < 0:
+        return {}
+    rolls, sampler = tiers[index]
+    drops = {}
+    for _ in range(rolls):
+        item_id, low, high = sampler.draw(rng)
+        if item_id:
+            drops[item_id] = drops.get(item_id, 0) + rng.randint(low, high)
+    return drops
+
+
+def roll_creature_loot(creature_type, level=1, rng=random):
+    """
+    Roll a creature's loot.
+
+    Args:
+        creature_type (str): Key in CREATURE_LOOT
+        level (int): Creature level, which picks the tier
+
+    Returns:
+        dict: item_id -> quantity
+    """
+    compiled = COMPILED_CREATURE_LOOT.get(creature_type)
+    return _roll(compiled, level, rng) if compiled else {}
+
+
+def roll_boss_loot(boss_id, level=1, killer=False, rng=random):
+    """
+    Roll a boss's loot for one character present at the kill.
+
+    Args:
+        boss_id (str): Key in BOSS_LOOT
+        level (int): The character's level, which picks the tier
+        killer (bool): Whether this character gets the guaranteed drops
+
+    Returns:
+        dict: item_id -> quantity
+    """
+    if boss_id not in BOSS_LOOT:
+        return {}
+    drops = _roll(COMPILED_BOSS_LOOT[boss_id], level, rng)
+    if killer:
+        for item_id in BOSS_LOOT[boss_id].get("guaranteed", []):
+            drops[item_id] = drops.get(item_id, 0) + 1
+    return drops
+
+
+def grant_loot(character, drops):
+    """
+    Put drops straight into a character's inventory, stacking where
+    possible.
+
+    Args:
+        character: Receiving character
+        drops (dict): item_id -> quantity
+
+    Returns:
+        list: The items that now hold the drops
+    """
+    from typeclasses.objects import deliver_item
+
+    received = []
+    for item_id, quantity in drops.items():
+        received.extend(deliver_item(item_id, character, quantity))
+    return received
+
+
+def describe_loot(drops):
+    """Format drops for a message, e.g. 'Fresh Bread Loaf x2, Temple Shekel x5'"""
+    from world.content_index import get_content_index
+
+    index = get_content_index()
+    return ", ".join(
+        f"{(index.item(item_id) or {}).get('key', item_id)} x{quantity}"
+        for item_id, quantity in drops.items()
+    )
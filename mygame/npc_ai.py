@@ -0,0 +1,239 @@
+"""
+NPC AI Scheduler for Journey Through Scripture
+
+Drives NPC behaviours (patrol, aggro, flee) over time. NPCs with
+behaviours sit in a priority queue ordered by their next wake time, and a
+single timer fires for whichever is due first. An NPC is only queued
+while its room has an online player in it: arrivals wake the room's NPCs
+through the presence index, and an NPC that wakes to an empty room
+simply isn't queued again. Hundreds of NPCs cost nothing until someone
+walks in on them.
+
+NPCs opt in with a "behaviours" list in world/npcs.py; HostileNPCs flee
+by default, and aggro only once given a creature_type to fight as.
+"""
+
+import heapq
+import random
+import time
+
+from evennia.utils.utils import delay
+
+try:
+    from .presence import get_presence
+    from .conversations import get_conversations
+except (ImportError, ValueError):
+    from presence import get_presence
+    from conversations import get_conversations
+
+# Seconds between decisions per behaviour; an NPC thinks at its fastest
+THINK_INTERVALS = {
+    "flee": 4,
+    "aggro": 4,
+    "patrol": 20,
+}
+
+# Random spread on first wake so a room's NPCs don't act in lockstep
+WAKE_JITTER = 3.0
+
+# Chance a patrolling NPC actually moves when it thinks
+PATROL_CHANCE = 0.5
+
+# Seconds before an aggressive NPC goes for the same character again
+AGGRO_COOLDOWN = 30
+
+# Share of max HP below which an NPC that flees runs away
+FLEE_THRESHOLD = 0.25
+
+
+def _exit_to(room, exit_name):
+    """Find a room's exit object by name"""
+    exits = room.get_contents("exits") if hasattr(room, 'get_contents') else room.exits
+    return next((exit_obj for exit_obj in exits if exit_obj.key == exit_name), None)
+
+
+def flee(npc, occupants):
+    """
+    Run from a room with players in it when badly hurt.
+
+    Returns:
+        bool: True if the NPC acted
+    """
+    max_hp = npc.db.max_hp or 1
+    hp = npc.get_hp() if hasattr(npc, 'get_hp') else (npc.db.hp or max_hp)
+    if hp > max_hp * FLEE_THRESHOLD:
+        return False
+
+    from world.world_graph import get_world_graph, get_room_id
+
+    presence = get_presence()
+    routes = get_world_graph().neighbours(get_room_id(npc.location))
+    random.shuffle(routes)
+    # Prefer a way out to a room nobody is standing in
+    routes.sort(key=lambda route: bool(presence.occupants(getattr(_exit_to(npc.location, route[0]),
+                                                                  'destination', None))))
+    for exit_name, _ in routes:
+        exit_obj = _exit_to(npc.location, exit_name)
+        if exit_obj and exit_obj.destination:
+            npc.location.msg_contents(f"|y{npc.name} flees {exit_name}!|n")
+            return npc.move_to(exit_obj.destination, quiet=True, move_type="traverse")
+    return False
+
+
+def aggro(npc, occupants):
+    """
+    Attack a player in the room who isn't already fighting. Only NPCs
+    with a creature_type can start a real fight.
+
+    Returns:
+        bool: True if the NPC acted
+    """
+    if not npc.db.creature_type or npc.location.db.room_type == "safe":
+        return False
+    now = time.time()
+    engaged = npc.ndb.engaged or {}
+    targets = [char for char in occupants.values()
+               if not char.db.in_combat and engaged.get(char.id, 0) + AGGRO_COOLDOWN < now]
+    if not targets:
+        return False
+
+    target = random.choice(targets)
+    engaged[target.id] = now
+    npc.ndb.engaged = engaged
+    target.msg(f"|r{npc.name} attacks!|n")
+    npc.initiate_combat(target, creature=npc.db.creature_type, level=npc.db.level or 1)
+    return True
+
+
+def patrol(npc, occupants):
+    """
+    Wander the exit graph within patrol_range rooms of the NPC's post.
+    NPCs stay put while someone is talking to them.
+
+    Returns:
+        bool: True if the NPC moved
+    """
+    if random.random() > PATROL_CHANCE:
+        return False
+    if get_conversations().talking_with(npc, occupants):
+        return False
+
+    from world.world_graph import get_world_graph, get_room_id
+
+    graph = get_world_graph()
+    here = get_room_id(npc.location)
+    if npc.db.patrol_home is None:
+        npc.db.patrol_home = here
+    reach = npc.db.patrol_range or 1
+
+    routes = []
+    for exit_name, room_id in graph.neighbours(here):
+        path = graph.path(npc.db.patrol_home, room_id)
+        if path is not None and len(path) <= reach:
+            routes.append(exit_name)
+    random.shuffle(routes)
+    for exit_name in routes:
+        exit_obj = _exit_to(npc.location, exit_name)
+        if exit_obj and exit_obj.destination and exit_obj.access(npc, "traverse"):
+            return npc.move_to(exit_obj.destination, move_type="traverse")
+    return False
+
+
+# Behaviours in priority order; the first one that acts ends the turn
+BEHAVIOURS = (
+    ("flee", flee),
+    ("aggro", aggro),
+    ("patrol", patrol),
+)
+
+
+def think_interval(npc):
+    """Seconds until an NPC's next decision"""
+    return min((THINK_INTERVALS.get(name, 10) for name in npc.db.behaviours or ()), default=10)
+
+
+class NPCScheduler:
+    """Wake-time priority queue over NPCs in occupied rooms"""
+
+    def __init__(self):
+        """Initialize with every NPC asleep"""
+        self.queue = []      # (wake time, seq, npc id)
+        self.awake = {}      # npc id -> npc with a queue entry
+        self.seq = 0
+        self.timer = None
+        self.timer_at = None
+
+    def wake_room(self, room):
+        """Queue the NPCs with behaviours in a room that just got a player"""
+        if not room:
+            return
+        npcs = room.get_contents("npcs") if hasattr(room, 'get_contents') else room.contents
+        now = time.time()
+        for npc in npcs:
+            if npc.id not in self.awake and npc.db.behaviours:
+                self.schedule(npc, now + random.uniform(0, WAKE_JITTER))
+
+    def wake_occupied(self):
+        """Wake every room with players in it (after a reload)"""
+        for rooms in get_presence().floors.values():
+            for room in list(rooms):
+                self.wake_room(room)
+
+    def schedule(self, npc, when):
+        """Queue an NPC's next decision"""
+        self.awake[npc.id] = npc
+        self.seq += 1
+        heapq.heappush(self.queue, (when, self.seq, npc.id))
+        if self.timer_at is None or when < self.timer_at:
+            self._arm(when)
+
+    def _arm(self, when):
+        """Point the single timer at the next wake time"""
+        if self.timer is not None:
+            try:
+                self.timer.cancel()
+            except Exception:
+                pass
+        self.timer_at = when
+        self.timer = delay(max(0, when - time.time()), self._run)
+
+    def _run(self):
+        """Let every NPC that's due think, then re-arm the timer"""
+        self.timer = self.timer_at = None
+        now = time.time()
+        presence = get_presence()
+
+        while self.queue and self.queue[0][0] <= now:
+            _, _, npc_id = heapq.heappop(self.queue)
+            npc = self.awake.pop(npc_id, None)
+            if npc is None or not npc.pk or not npc.location or npc.db.defeated:
+                continue
+            occupants = presence.occupants(npc.location)
+            if not occupants:
+                continue  # asleep until someone arrives
+            self.think(npc, occupants)
+            if npc.location and presence.occupants(npc.location) and npc.id not in self.awake:
+                self.schedule(npc, now + think_interval(npc))
+
+        if self.queue and self.timer_at is None:
+            self._arm(self.queue[0][0])
+
+    def think(self, npc, occupants):
+        """Run an NPC's behaviours until one acts"""
+        behaviours = npc.db.behaviours or ()
+        for name, behaviour in BEHAVIOURS:
+            if name in behaviours and behaviour(npc, occupants):
+                return name
+        return None
+
+
+# Scheduler for this server process
+_scheduler = None
+
+
+def get_scheduler():
+    """Get the NPC scheduler"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = NPCScheduler()
+    return _scheduler
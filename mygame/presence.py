@@ -0,0 +1,160 @@
+"""
+Presence Index for Journey Through Scripture
+
+Tracks which online characters are where: floor -> room -> characters.
+Kept in memory and updated as characters move, log in and log out, so
+"who is on floor N" and floor-wide announcements never scan sessions
+or the database.
+"""
+
+
+class PresenceIndex:
+    """In-memory index of online characters by floor and room"""
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.floors = {}     # floor -> {room: {char_id: character}}
+        self.on_floor = {}   # floor -> {char_id: character}
+        self.positions = {}  # char_id -> (floor, room)
+
+    def seed(self):
+        """
+        Fill the index from the currently puppeted characters.
+        Used after a reload, when the in-memory index starts empty.
+        """
+        try:
+            from evennia.server.sessionhandler import SESSION_HANDLER
+        except ImportError:
+            return
+        for session in SESSION_HANDLER.get_sessions():
+            character = session.puppet
+            if character and character.location:
+                self.move(character, character.location)
+
+    def move(self, character, room):
+        """
+        Record a character as being in a room.
+
+        Args:
+            character: Online character
+            room: The character's new location (rooms without a floor
+                are not indexed)
+        """
+        floor = room.db.floor if room else None
+        old = self.positions.get(character.id)
+        if old == (floor, room):
+            return
+        if old:
+            self._unlink(character.id, *old)
+        if floor is None:
+            self.positions.pop(character.id, None)
+            return
+
+        self.floors.setdefault(floor, {}).setdefault(room, {})[character.id] = character
+        self.on_floor.setdefault(floor, {})[character.id] = character
+        self.positions[character.id] = (floor, room)
+        if not old or old[0] != floor:
+            self._publish_counts()
+
+    def remove(self, character):
+        """
+        Drop a character from the index (logged out or deleted).
+
+        Args:
+            character: The character
+        """
+        old = self.positions.pop(character.id, None)
+        if old:
+            self._unlink(character.id, *old)
+            self._publish_counts()
+
+    def _unlink(self, char_id, floor, room):
+        """Remove one character from its floor and room buckets"""
+        rooms = self.floors.get(floor, {})
+        occupants = rooms.get(room)
+        if occupants is not None:
+            occupants.pop(char_id, None)
+            if not occupants:
+                del rooms[room]
+        self.on_floor.get(floor, {}).pop(char_id, None)
+
+    def characters_on_floor(self, floor):
+        """
+        Get the online characters on a floor.
+
+        Returns:
+            list: Characters
+        """
+        return list(self.on_floor.get(floor, {}).values())
+
+    def occupied_rooms(self, floor):
+        """
+        Get the rooms on a floor that have online characters in them.
+
+        Returns:
+            dict: room -> {char_id: character}
+        """
+        return self.floors.get(floor, {})
+
+    def occupants(self, room):
+        """
+        Get the online characters in a room.
+
+        Returns:
+            dict: char_id -> character (empty if nobody is there)
+        """
+        if not room:
+            return {}
+        return self.floors.get(room.db.floor, {}).get(room, {})
+
+    def floor_count(self, floor):
+        """Number of online characters on a floor"""
+        return len(self.on_floor.get(floor, {}))
+
+    def floor_counts(self):
+        """
+        Get player counts for every occupied floor.
+
+        Returns:
+            dict: floor -> number of online characters
+        """
+        return {floor: len(chars) for floor, chars in self.on_floor.items() if chars}
+
+    def announce_floor(self, floor, text, msg_type="system", exclude=None):
+        """
+        Send a message to everyone on a floor.
+
+        Args:
+            floor (int): Floor number
+            text (str): Message text
+            msg_type (str): Message type for the web client
+            exclude (list): Characters not to message
+        """
+        exclude = exclude or []
+        for character in self.characters_on_floor(floor):
+            if character not in exclude:
+                character.send_text_output(text, msg_type)
+
+    def _publish_counts(self):
+        """
+        Store per-floor counts where the portal can read them for MSSP.
+        Only called when a floor count actually changes.
+        """
+        try:
+            from evennia.server.models import ServerConfig
+        except ImportError:
+            return
+        ServerConfig.objects.conf("presence_floor_counts", value=self.floor_counts())
+
+
+# Singleton instance
+_presence = None
+
+
+def get_presence():
+    """Get the global presence index"""
+    global _presence
+    if _presence is None:
+        _presence = PresenceIndex()
+        _presence.seed()
+    return _presence
@@ -9,6 +9,11 @@ from enum import Enum
 from datetime import datetime
 import json
 
+try:
+    from .ledger import get_ledger
+except (ImportError, ValueError):
+    from ledger import get_ledger
+
 
 class QuestStatus(Enum):
     """Quest status enumeration"""
@@ -278,11 +283,14 @@ class QuestManager:
         quest = self.quest_log[quest_id]
         quest.complete()
 
-        # Award XP
-        self.character.gain_xp(quest.xp_reward)
+        # Award XP (reported below with the rest of the rewards)
+        self.character.gain_xp(quest.xp_reward, announce=False)
 
-        # Award currency
-        self.character.db.currency = (self.character.db.currency or 0) + quest.currency_reward
+        # Award currency; the ref makes a repeated completion pay once
+        started = quest.started_at.isoformat() if quest.started_at else ""
+        get_ledger().credit(self.character, quest.currency_reward, "quest_reward",
+                            ref=f"quest:{self.character.id}:{quest_id}:{started}",
+                            memo=quest.title)
 
         # Award items
         for item_key in quest.item_rewards:
@@ -30,7 +30,27 @@ def at_server_start():
     This is called every time the server starts up, regardless of
     how it was shut down.
     """
-    pass
+    from ledger import get_ledger
+    from npc_ai import get_scheduler
+    from typeclasses.scripts import ensure_ambient_scripts
+    from world.content_index import get_content_index
+    from world.knowledge import get_knowledge
+    from world.world_graph import get_world_graph
+
+    # Load content indexes, recompiling the snapshot if content changed
+    index = get_content_index()
+
+    # Compile routing tables and the knowledge index up front so the
+    # first travel or question is instant
+    get_world_graph()
+    get_knowledge()
+    ensure_ambient_scripts(index.floors())
+
+    # Replay any currency postings a crash kept from reaching the database
+    get_ledger()
+
+    # Wake the NPCs in rooms players were already standing in
+    get_scheduler().wake_occupied()
 
 
 def at_server_stop():
@@ -38,21 +58,32 @@ def at_server_stop():
     This is called just before the server is shut down, regardless
     of it is for a reload, reset or shutdown.
     """
-    pass
+    from ledger import get_ledger
+    from shops import get_shops
+
+    # Write back stock changes and transactions still waiting for their batch
+    get_shops().flush()
+    get_ledger().flush()
 
 
 def at_server_reload_start():
     """
     This is called only when server starts back up after a reload.
     """
-    pass
+    from conversations import get_conversations
+
+    # Pick up conversations that were open when the reload began
+    get_conversations().restore()
 
 
 def at_server_reload_stop():
     """
     This is called only time the server stops before a reload.
     """
-    pass
+    from conversations import get_conversations
+
+    # Open conversations are in memory only; carry them over the reload
+    get_conversations().save()
 
 
 def at_server_cold_start():
@@ -103,3 +103,26 @@ MSSPTable = {
     # World originality: "All Stock", "Mostly Stock", "Mostly Original", "All Original"
     "WORLD ORIGINALITY": "All Original",
 }
+
+
+# Per-floor player counts. The portal answers MSSP in its own process, so
+# it reads the counts the server's presence index publishes on change.
+def _floor_player_count(floor):
+    """Make a callable MSSP value reporting the players on one floor"""
+
+    def count():
+        from evennia.server.models import ServerConfig
+
+        counts = ServerConfig.objects.conf("presence_floor_counts", default={}) or {}
+        return str(counts.get(floor, 0))
+
+    return count
+
+
+try:
+    from world.world_data import ALL_ROOMS
+
+    for _floor in sorted({room.get("floor", 1) for room in ALL_ROOMS.values()}):
+        MSSPTable[f"PLAYERS FLOOR {_floor}"] = _floor_player_count(_floor)
+except ImportError:
+    pass
@@ -0,0 +1,272 @@
+"""
+Shop Engine for Journey Through Scripture
+
+Buying and selling with merchants. Each merchant gets a price sheet
+computed once from the item definitions and its shop_prices setting,
+along with a pre-rendered listing. Sheets are rebuilt only when the
+content index is reloaded or the merchant's stock changes.
+
+Stock levels live in memory and are written back to the merchants in
+batches, so a busy shop costs one Attribute write per flush rather than
+one per sale.
+"""
+
+from evennia.utils.utils import delay
+
+try:
+    from .ledger import get_ledger
+except (ImportError, ValueError):
+    from ledger import get_ledger
+
+# Buy price multiplier per shop_prices setting
+PRICE_MULTIPLIERS = {
+    "fair": 1,
+    "inflated": 3,
+}
+
+# Fraction of an item's value a merchant pays for it
+SELL_RATE = 0.5
+
+# Units of each item a merchant starts with
+DEFAULT_STOCK = 10
+
+# Seconds to gather stock changes before writing them
+STOCK_FLUSH_DELAY = 30
+
+# Item types merchants won't buy
+UNSELLABLE_TYPES = ("quest",)
+
+
+def buy_price(item_data, pricing):
+    """
+    Price a merchant charges for one unit.
+
+    Inflated shops charge an item's merchant_price where one is set.
+    """
+    multiplier = PRICE_MULTIPLIERS.get(pricing, 1)
+    if multiplier > 1 and item_data.get('merchant_price'):
+        return item_data['merchant_price']
+    return max(1, int(item_data.get('value', 0) * multiplier))
+
+
+def sell_price(item_data):
+    """Price a merchant pays for one unit, or 0 if it won't buy it"""
+    if item_data.get('item_type') in UNSELLABLE_TYPES:
+        return 0
+    return int(item_data.get('value', 0) * SELL_RATE)
+
+
+class PriceSheet:
+    """A merchant's prices and rendered listing"""
+
+    __slots__ = ("index", "prices", "names", "listing")
+
+    def __init__(self, index, inventory, pricing):
+        """
+        Price a merchant's inventory.
+
+        Args:
+            index: Content index the prices were computed from
+            inventory (list): Item IDs for sale
+            pricing (str): 'fair' or 'inflated'
+        """
+        self.index = index
+        self.prices = {}
+        self.names = {}
+        for item_id in inventory:
+            item_data = index.item(item_id)
+            if item_data:
+                self.prices[item_id] = buy_price(item_data, pricing)
+                self.names[item_data['key'].lower()] = item_id
+        self.listing = None
+
+    def find(self, query):
+        """
+        Find an item for sale by ID, name or name prefix.
+
+        Returns:
+            str: Item ID, or None
+        """
+        query = query.strip().lower()
+        if query in self.prices:
+            return query
+        if query in self.names:
+            return self.names[query]
+        for name, item_id in self.names.items():
+            if name.startswith(query) or query in name.split():
+                return item_id
+        return None
+
+
+class ShopEngine:
+    """Price sheets and in-memory stock for every merchant"""
+
+    def __init__(self):
+        """Initialize with nothing cached"""
+        self.sheets = {}   # merchant id -> PriceSheet
+        self.stock = {}    # merchant id -> {item_id: units}
+        self.dirty = {}    # merchant id -> merchant with unflushed stock
+        self.flush_pending = False
+
+    def sheet(self, merchant):
+        """
+        Get a merchant's price sheet, recomputing it after a content
+        reload.
+        """
+        from world.content_index import get_content_index
+
+        index = get_content_index()
+        sheet = self.sheets.get(merchant.id)
+        if sheet is None or sheet.index is not index:
+            sheet = PriceSheet(index, merchant.db.shop_inventory or [],
+                               merchant.db.shop_prices or "fair")
+            self.sheets[merchant.id] = sheet
+        return sheet
+
+    def get_stock(self, merchant):
+        """Get a merchant's stock levels, loading them on first use"""
+        stock = self.stock.get(merchant.id)
+        if stock is None:
+            saved = merchant.db.shop_stock or {}
+            stock = {item_id: saved.get(item_id, DEFAULT_STOCK)
+                     for item_id in merchant.db.shop_inventory or []}
+            self.stock[merchant.id] = stock
+        return stock
+
+    def adjust_stock(self, merchant, item_id, change):
+        """Change a merchant's stock of an item and queue the write"""
+        stock = self.get_stock(merchant)
+        stock[item_id] = max(0, stock.get(item_id, 0) + change)
+        self.sheet(merchant).listing = None
+        self.dirty[merchant.id] = merchant
+        if not self.flush_pending:
+            self.flush_pending = True
+            delay(STOCK_FLUSH_DELAY, self.flush)
+
+    def flush(self):
+        """Write all queued stock changes"""
+        self.flush_pending = False
+        dirty, self.dirty = self.dirty, {}
+        for merchant_id, merchant in dirty.items():
+            if merchant.pk:
+                merchant.db.shop_stock = dict(self.stock[merchant_id])
+
+    def invalidate(self, merchant=None):
+        """Drop cached sheets (and unflushed stock) for one or all merchants"""
+        self.flush()
+        if merchant is None:
+            self.sheets.clear()
+            self.stock.clear()
+        else:
+            self.sheets.pop(merchant.id, None)
+            self.stock.pop(merchant.id, None)
+
+    def listing(self, merchant):
+        """
+        Get a merchant's rendered listing.
+
+        Returns:
+            str: The shop listing, rendered once per stock change
+        """
+        sheet = self.sheet(merchant)
+        if sheet.listing is None:
+            stock = self.get_stock(merchant)
+            lines = [f"\n|w--- {merchant.name}'s Shop ---|n"]
+            for item_id, price in sheet.prices.items():
+                name = sheet.index.item(item_id)['key']
+                units = stock.get(item_id, 0)
+                available = f"{units} left" if units else "|rsold out|n"
+                lines.append(f"  {name:<28} |y{price:>4} shekels|n  ({available})")
+            if not sheet.prices:
+                lines.append("  Nothing for sale right now.")
+            lines.append("\nUse |wbuy [amount] <item>|n or |wsell [amount] <item>|n.")
+            sheet.listing = "\n".join(lines)
+        return sheet.listing
+
+    def buy(self, character, merchant, query, amount=1):
+        """
+        Buy units of an item from a merchant.
+
+        Args:
+            character: Buyer
+            merchant: Merchant NPC
+            query (str): Item name or ID
+            amount (int): Units to buy
+
+        Returns:
+            bool: True if the purchase went through
+        """
+        from typeclasses.objects import deliver_item
+
+        sheet = self.sheet(merchant)
+        item_id = sheet.find(query)
+        if not item_id:
+            character.msg(f"{merchant.name} doesn't sell '{query}'.")
+            return False
+
+        name = sheet.index.item(item_id)['key']
+        units = self.get_stock(merchant).get(item_id, 0)
+        if units < amount:
+            character.msg(f"{merchant.name} only has {units} {name} left.")
+            return False
+
+        cost = sheet.prices[item_id] * amount
+        ledger = get_ledger()
+        currency = ledger.balance(character)
+        if currency < cost:
+            character.msg(f"{name} x{amount} costs {cost} shekels; you have {currency}.")
+            return False
+
+        ledger.debit(character, cost, "purchase", memo=f"{item_id} x{amount} from {merchant.key}")
+        deliver_item(item_id, character, amount)
+        self.adjust_stock(merchant, item_id, -amount)
+        character.msg(f"|gYou buy {name} x{amount} from {merchant.name} for {cost} shekels.|n")
+        return True
+
+    def sell(self, character, merchant, item):
+        """
+        Sell an item (a whole stack) to a merchant.
+
+        Args:
+            character: Seller
+            merchant: Merchant NPC
+            item: Item in the seller's inventory
+
+        Returns:
+            bool: True if the sale went through
+        """
+        if item in (character.db.equipped_weapon, character.db.equipped_armor):
+            character.msg(f"Unequip {item.get_display_name(character)} before selling it.")
+            return False
+
+        item_id = item.db.item_id
+        item_data = self.sheet(merchant).index.item(item_id) if item_id else None
+        price = sell_price(item_data) if item_data else 0
+        if not price:
+            character.msg(f"{merchant.name} isn't interested in {item.get_display_name(character)}.")
+            return False
+
+        quantity = item.get_quantity()
+        earned = price * quantity
+        description = item.get_display_name(character)
+        if hasattr(character.db, 'carried_weight'):
+            character.db.carried_weight -= item.get_total_weight()
+        item.delete()
+
+        get_ledger().credit(character, earned, "sale", memo=f"{item_id} x{quantity} to {merchant.key}")
+        if item_id in self.get_stock(merchant):
+            self.adjust_stock(merchant, item_id, quantity)
+        character.msg(f"|gYou sell {description} to {merchant.name} for {earned} shekels.|n")
+        return True
+
+
+# Shop engine for this server process
+_shops = None
+
+
+def get_shops():
+    """Get the shop engine"""
+    global _shops
+    if _shops is None:
+        _shops = ShopEngine()
+    return _shops
@@ -0,0 +1,310 @@
+"""
+Trading System for Journey Through Scripture
+
+Player-to-player trades. Two characters in the same room open a trade
+session, each side offers items and shekels, and when both accept the
+whole exchange happens at once: every item move and the ledger entry for
+the shekels run in one DB transaction, and if any of them fails the
+whole swap is rolled back. Unanswered trade requests lapse after
+TRADE_REQUEST_TIMEOUT seconds.
+
+Sessions are process-local. Each one remembers the inventory version
+(Character.bump_inventory_version) both sides had when the offers last
+changed. If either inventory moves on before the swap, acceptances are
+withdrawn and both players must look again, so an item can't be dropped,
+sold or given away from under an accepted offer.
+"""
+
+import time
+import uuid
+
+from django.db import transaction
+
+try:
+    from .ledger import get_ledger, LedgerError
+except (ImportError, ValueError):
+    from ledger import get_ledger, LedgerError
+
+# Seconds a trade request waits for an answer
+TRADE_REQUEST_TIMEOUT = 60
+
+
+class TradeAborted(Exception):
+    """Raised inside a trade's transaction to roll the whole swap back"""
+
+
+class TradeSession:
+    """A trade between two characters"""
+
+    def __init__(self, first, second):
+        """
+        Open a session with empty offers.
+
+        Args:
+            first: Character who proposed the trade
+            second: Character who agreed to it
+        """
+        self.id = uuid.uuid4().hex
+        self.parties = (first, second)
+        self.offers = {first.id: {"items": {}, "currency": 0},
+                       second.id: {"items": {}, "currency": 0}}
+        self.accepted = set()
+        self.versions = {}
+        self.snapshot()
+
+    def other(self, character):
+        """The other party"""
+        first, second = self.parties
+        return second if character == first else first
+
+    def snapshot(self):
+        """Record both inventory versions and withdraw acceptances"""
+        self.accepted.clear()
+        self.versions = {party.id: party.ndb.inventory_version or 0 for party in self.parties}
+
+    def is_stale(self):
+        """True if either inventory changed since the offers last changed"""
+        return any((party.ndb.inventory_version or 0) != self.versions[party.id]
+                   for party in self.parties)
+
+    def prune(self):
+        """
+        Drop offered items their owner no longer holds in full.
+
+        Returns:
+            list: Names of the items dropped from the offers
+        """
+        dropped = []
+        for party in self.parties:
+            items = self.offers[party.id]["items"]
+            for item in list(items):
+                if not item.pk or item.location != party or item.get_quantity() < items[item]:
+                    dropped.append(item.key)
+                    del items[item]
+        return dropped
+
+    def describe(self, viewer):
+        """Render both offers for one party"""
+        lines = ["|w--- Trade ---|n"]
+        for party in self.parties:
+            offer = self.offers[party.id]
+            goods = [f"{item.key} x{amount}" for item, amount in offer["items"].items()]
+            if offer["currency"]:
+                goods.append(f"{offer['currency']} shekels")
+            who = "You" if party == viewer else party.get_display_name(viewer)
+            status = " |g(accepted)|n" if party.id in self.accepted else ""
+            lines.append(f"{who} offer{'' if who == 'You' else 's'}: "
+                         f"{', '.join(goods) or 'nothing'}{status}")
+        lines.append("Use |woffer|n to add to your side, |wtrade accept|n or |wtrade cancel|n.")
+        return "\n".join(lines)
+
+
+class TradeManager:
+    """Open trade sessions and pending trade requests"""
+
+    def __init__(self):
+        """Initialize with no trades"""
+        self.sessions = {}   # char id -> TradeSession
+        self.requests = {}   # requester id -> (requested character id, expires)
+
+    def session_for(self, character):
+        """Get a character's open trade session, or None"""
+        return self.sessions.get(character.id)
+
+    def request(self, character, target):
+        """
+        Propose a trade, or agree to one the target proposed.
+
+        Returns:
+            TradeSession: The new session if both sides have now agreed
+        """
+        if target == character or not hasattr(target, 'bump_inventory_version'):
+            character.msg("You can only trade with other pilgrims.")
+            return None
+        if target.location != character.location:
+            character.msg(f"{target.get_display_name(character)} isn't here.")
+            return None
+        if self.session_for(character):
+            character.msg("Finish your current trade first.")
+            return None
+        if self.session_for(target):
+            character.msg(f"{target.get_display_name(character)} is already trading.")
+            return None
+
+        now = time.time()
+        self.requests = {requester: request for requester, request in self.requests.items()
+                         if request[1] > now}
+        if self.requests.get(target.id, (None,))[0] == character.id:
+            del self.requests[target.id]
+            session = TradeSession(target, character)
+            self.sessions[target.id] = self.sessions[character.id] = session
+            for party in session.parties:
+                party.msg(session.describe(party))
+            return session
+
+        self.requests[character.id] = (target.id, now + TRADE_REQUEST_TIMEOUT)
+        character.msg(f"You ask {target.get_display_name(character)} to trade.")
+        target.msg(f"{character.get_display_name(target)} wants to trade with you. "
+                   f"Type |wtrade {character.key}|n to agree.")
+        return None
+
+    def _active_session(self, character):
+        """Get the character's session if both parties are still together"""
+        session = self.session_for(character)
+        if not session:
+            character.msg("You aren't trading with anyone.")
+            return None
+        if session.other(character).location != character.location:
+            self.cancel(character, "Your trading partner has left.")
+            return None
+        return session
+
+    def _changed(self, session):
+        """Re-validate after an offer change and show both sides the result"""
+        session.prune()
+        session.snapshot()
+        for party in session.parties:
+            party.msg(session.describe(party))
+
+    def offer_item(self, character, item, amount):
+        """
+        Add units of an item to the character's side.
+
+        Args:
+            character: Offering character
+            item: Item in their inventory
+            amount (int): Units to offer
+        """
+        session = self._active_session(character)
+        if not session:
+            return
+        if item in (character.db.equipped_weapon, character.db.equipped_armor):
+            character.msg(f"Unequip {item.get_display_name(character)} before trading it.")
+            return
+        if not item.at_pre_give(character, session.other(character)):
+            return
+        if amount < 1 or amount > item.get_quantity():
+            character.msg(f"You only have {item.get_quantity()} of {item.name}.")
+            return
+        session.offers[character.id]["items"][item] = amount
+        self._changed(session)
+
+    def offer_currency(self, character, amount):
+        """Set how many shekels the character offers"""
+        session = self._active_session(character)
+        if not session:
+            return
+        balance = get_ledger().balance(character)
+        if amount < 0 or amount > balance:
+            character.msg(f"You have {balance} shekels.")
+            return
+        session.offers[character.id]["currency"] = amount
+        self._changed(session)
+
+    def accept(self, character):
+        """Accept the current offers; the second acceptance completes the trade"""
+        session = self._active_session(character)
+        if not session:
+            return
+        if session.is_stale():
+            dropped = session.prune()
+            session.snapshot()
+            for party in session.parties:
+                party.msg("|yAn inventory changed, so the offers must be accepted again.|n")
+                if dropped:
+                    party.msg(f"|yNo longer offered: {', '.join(dropped)}|n")
+                party.msg(session.describe(party))
+            return
+
+        session.accepted.add(character.id)
+        if len(session.accepted) < 2:
+            other = session.other(character)
+            character.msg(f"You accept. Waiting for {other.get_display_name(character)}.")
+            other.msg(f"{character.get_display_name(other)} accepts the trade.")
+            return
+        self.complete(session)
+
+    def complete(self, session):
+        """Swap everything on offer in one go"""
+        first, second = session.parties
+        ledger = get_ledger()
+        for party in session.parties:
+            if ledger.balance(party) < session.offers[party.id]["currency"]:
+                session.snapshot()
+                for member in session.parties:
+                    member.msg(f"|y{party.key} can no longer cover their shekels.|n")
+                return
+
+        moves = [(item, amount, giver, session.other(giver))
+                 for giver in session.parties
+                 for item, amount in session.offers[giver.id]["items"].items()]
+
+        # The moves and the shekels commit together or not at all
+        net = session.offers[second.id]["currency"] - session.offers[first.id]["currency"]
+        moved, parts = [], []
+        try:
+            with transaction.atomic():
+                for item, amount, giver, receiver in moves:
+                    if amount < item.get_quantity():
+                        item = item.split(amount)
+                        if not item:
+                            raise TradeAborted
+                        parts.append(item)
+                    if not item.move_to(receiver, quiet=True, move_hooks=False, move_type="give"):
+                        raise TradeAborted
+                    moved.append((item, giver, receiver))
+                if net:
+                    ledger.post("trade", [(first, net), (second, -net)], ref=f"trade:{session.id}")
+        except (TradeAborted, LedgerError):
+            # The database rolled back; put the cached objects back to match
+            for item, giver, _ in reversed(moved):
+                item.move_to(giver, quiet=True, move_hooks=False, move_type="give")
+            for part in parts:
+                part.merge_into_stack()
+            session.snapshot()
+            for party in session.parties:
+                party.msg("|yThe exchange failed and nothing changed hands. Check the offers "
+                          "and accept again.|n")
+            return
+
+        for item, giver, receiver in moved:
+            weight = item.get_total_weight()
+            if hasattr(giver.db, 'carried_weight'):
+                giver.db.carried_weight -= weight
+            if hasattr(receiver.db, 'carried_weight'):
+                receiver.db.carried_weight += weight
+            item.merge_into_stack()
+        for party in session.parties:
+            party.bump_inventory_version()
+            party.msg("|gThe trade is complete.|n")
+        self._close(session)
+
+    def cancel(self, character, reason=None):
+        """Cancel the character's trade, or withdraw their trade request"""
+        session = self.session_for(character)
+        if not session:
+            if self.requests.pop(character.id, None):
+                character.msg("You withdraw your trade request.")
+            else:
+                character.msg("You aren't trading with anyone.")
+            return
+        self._close(session)
+        for party in session.parties:
+            party.msg(reason or f"{character.key} cancels the trade.")
+
+    def _close(self, session):
+        """Forget a session"""
+        for party in session.parties:
+            self.sessions.pop(party.id, None)
+
+
+# Trades for this server process
+_trades = None
+
+
+def get_trades():
+    """Get the trade manager"""
+    global _trades
+    if _trades is None:
+        _trades = TradeManager()
+    return _trades
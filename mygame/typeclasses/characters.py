@@ -3,9 +3,28 @@ Custom Character Typeclasses for Journey Through Scripture
 Player characters with biblical fantasy stats and progression
 """
 
+import bisect
+
 from evennia import DefaultCharacter
 from evennia.utils.utils import inherits_from
 
+from .regen import RegenMixin
+
+try:
+    from ..presence import get_presence
+except (ImportError, ValueError):
+    from presence import get_presence
+
+try:
+    from ..ledger import get_ledger
+except (ImportError, ValueError):
+    from ledger import get_ledger
+
+try:
+    from ..npc_ai import get_scheduler
+except (ImportError, ValueError):
+    from npc_ai import get_scheduler
+
 # Import quest system - delayed import to handle Evennia's module loading
 def _import_quests():
     """Lazy import of quests to handle Evennia's module context"""
@@ -31,7 +50,48 @@ except (ImportError, ValueError):
     create_quest = None
 
 
-class Character(DefaultCharacter):
+# XP curve: level 1 needs 100 XP, every level after needs 1.5x the previous
+BASE_XP_TO_LEVEL = 100
+XP_GROWTH = 1.5
+MAX_LEVEL = 100
+HP_PER_LEVEL = 10
+
+
+def _build_xp_tables(max_level=MAX_LEVEL):
+    """
+    Precompute the XP curve once at import.
+
+    Returns:
+        tuple: (XP needed to clear each level, total XP needed to reach each level)
+    """
+    per_level = []
+    cumulative = [0]
+    needed = BASE_XP_TO_LEVEL
+    for _ in range(max_level - 1):
+        per_level.append(needed)
+        cumulative.append(cumulative[-1] + needed)
+        needed = int(needed * XP_GROWTH)
+    return per_level, cumulative
+
+
+# XP_TO_NEXT_LEVEL[n - 1] is the XP needed to clear level n,
+# CUMULATIVE_XP[n - 1] is the total XP needed to reach level n
+XP_TO_NEXT_LEVEL, CUMULATIVE_XP = _build_xp_tables()
+
+
+def xp_to_next_level(level):
+    """XP needed to clear a level (0 at the level cap)"""
+    if level >= MAX_LEVEL:
+        return 0
+    return XP_TO_NEXT_LEVEL[max(1, level) - 1]
+
+
+def level_for_total_xp(total_xp):
+    """Resolve the level for a lifetime XP total with a binary search"""
+    return max(1, bisect.bisect_right(CUMULATIVE_XP, total_xp))
+
+
+class Character(RegenMixin, DefaultCharacter):
     """
     Extended character class for biblical fantasy MUD.
 
@@ -40,6 +100,9 @@ class Character(DefaultCharacter):
         Stats: Faith, Wisdom, Strength, Courage, Righteousness
         Progression: Level, XP, Skills
         Inventory: Items, equipment, currency
+
+    HP regenerates passively out of combat (see RegenMixin); read it with
+    get_hp() and write it with set_hp() rather than touching db.hp.
     """
 
     def at_object_creation(self):
@@ -81,10 +144,6 @@ class Character(DefaultCharacter):
         self.db.flags = []  # Quest flags, defeated bosses, etc.
         self.db.calling = None  # wisdom, service, trial, sacrifice, revelation
 
-        # Dialogue state
-        self.db.talking_to = None
-        self.db.dialogue_state = None
-
         # Quest system
         self.db.quests = {}  # Available quests
         self.db.quest_log = {}  # Active/completed quests
@@ -145,6 +204,10 @@ class Character(DefaultCharacter):
             self.msg("Invalid class. Choose: prophet, warrior, shepherd, or scribe")
             return False
 
+        # Class shows in the room state other occupants see
+        if hasattr(self.location, "broadcast_change"):
+            self.location.broadcast_change(self)
+
         return True
 
     def get_total_stat(self, stat_name):
@@ -161,12 +224,12 @@ class Character(DefaultCharacter):
         bonus = 0
 
         # Add weapon bonuses
-        if self.db.equipped_weapon and hasattr(self.db.equipped_weapon.db, 'stats'):
-            bonus += self.db.equipped_weapon.db.stats.get(f"{stat_name}_bonus", 0)
+        if self.db.equipped_weapon and hasattr(self.db.equipped_weapon, 'get_field'):
+            bonus += self.db.equipped_weapon.get_field("stats").get(f"{stat_name}_bonus", 0)
 
         # Add armor bonuses
-        if self.db.equipped_armor and hasattr(self.db.equipped_armor.db, 'stats'):
-            bonus += self.db.equipped_armor.db.stats.get(f"{stat_name}_bonus", 0)
+        if self.db.equipped_armor and hasattr(self.db.equipped_armor, 'get_field'):
+            bonus += self.db.equipped_armor.get_field("stats").get(f"{stat_name}_bonus", 0)
 
         return base_stat + bonus
 
@@ -175,8 +238,8 @@ class Character(DefaultCharacter):
         base_damage = self.db.damage
         weapon_damage = 0
 
-        if self.db.equipped_weapon and hasattr(self.db.equipped_weapon.db, 'stats'):
-            weapon_damage = self.db.equipped_weapon.db.stats.get('damage', 0)
+        if self.db.equipped_weapon and hasattr(self.db.equipped_weapon, 'get_field'):
+            weapon_damage = self.db.equipped_weapon.get_field("stats").get('damage', 0)
 
         strength_bonus = self.get_total_stat('strength') - 5  # 5 is average
 
@@ -193,11 +256,10 @@ class Character(DefaultCharacter):
         Returns:
             bool: True if still alive, False if died
         """
-        self.db.hp -= amount
-        self.msg(f"|rYou take {amount} damage! ({self.db.hp}/{self.db.max_hp} HP)|n")
+        hp = self.set_hp(self.get_hp() - amount)
+        self.msg(f"|rYou take {amount} damage! ({hp}/{self.db.max_hp} HP)|n")
 
-        if self.db.hp <= 0:
-            self.db.hp = 0
+        if hp <= 0:
             self.die(attacker)
             return False
 
@@ -205,12 +267,12 @@ class Character(DefaultCharacter):
 
     def heal(self, amount):
         """Heal character"""
-        old_hp = self.db.hp
-        self.db.hp = min(self.db.max_hp, self.db.hp + amount)
-        actual_healing = self.db.hp - old_hp
+        old_hp = self.get_hp()
+        hp = self.set_hp(old_hp + amount)
+        actual_healing = hp - old_hp
 
         if actual_healing > 0:
-            self.msg(f"|gYou are healed for {actual_healing} HP! ({self.db.hp}/{self.db.max_hp})|n")
+            self.msg(f"|gYou are healed for {actual_healing} HP! ({hp}/{self.db.max_hp})|n")
             return actual_healing
         else:
             self.msg("You are already at full health.")
@@ -226,38 +288,83 @@ class Character(DefaultCharacter):
 
         # Respawn at last safe room (simplified)
         self.msg("|yYou awaken in the last sanctuary you visited...|n")
-        self.db.hp = self.db.max_hp
+        self.set_hp(self.db.max_hp)
 
         # Could implement more complex death penalties
 
-    def gain_xp(self, amount):
-        """Gain experience points"""
-        self.db.xp += amount
-        self.msg(f"|y+{amount} XP|n")
+    def total_xp(self):
+        """Lifetime XP, derived from level and progress into the current level"""
+        level = min(self.db.level or 1, MAX_LEVEL)
+        return CUMULATIVE_XP[level - 1] + (self.db.xp or 0)
 
-        # Check for level up
-        while self.db.xp >= self.db.xp_to_next_level:
-            self.level_up()
+    def gain_xp(self, amount, announce=True):
+        """
+        Gain experience points.
 
-    def level_up(self):
-        """Level up the character"""
-        self.db.level += 1
-        self.db.xp -= self.db.xp_to_next_level
-        self.db.xp_to_next_level = int(self.db.xp_to_next_level * 1.5)
+        Any number of level-ups is resolved in one step against the
+        precomputed XP table, written as a single batch of Attributes and
+        reported with one combined message.
 
-        # Increase stats
-        self.db.max_hp += 10
-        self.db.hp = self.db.max_hp
+        Args:
+            amount (int): XP to award
+            announce (bool): Show the "+N XP" line. Callers that report
+                the reward themselves (combat, quests) pass False.
 
-        self.msg("|y" + "=" * 50 + "|n")
-        self.msg("|yLEVEL UP! You are now level {}!|n".format(self.db.level))
-        self.msg("|y+10 Max HP|n")
-        self.msg("|y" + "=" * 50 + "|n")
+        Returns:
+            int: Number of levels gained
+        """
+        old_level = self.db.level or 1
+        total = self.total_xp() + amount
+        new_level = max(old_level, level_for_total_xp(total))
+        levels_gained = new_level - old_level
+
+        changes = [
+            ("xp", total - CUMULATIVE_XP[min(new_level, MAX_LEVEL) - 1]),
+            ("xp_to_next_level", xp_to_next_level(new_level)),
+        ]
+        lines = [f"|y+{amount} XP|n"] if announce else []
+
+        if levels_gained:
+            hp_gain = HP_PER_LEVEL * levels_gained
+            max_hp = (self.db.max_hp or 100) + hp_gain
+            changes += [("level", new_level), ("max_hp", max_hp), ("hp", max_hp)]
+
+            if levels_gained == 1:
+                headline = f"|yLEVEL UP! You are now level {new_level}!|n"
+            else:
+                headline = (f"|yLEVEL UP x{levels_gained}! "
+                            f"You are now level {new_level}!|n")
+            lines += [
+                "|y" + "=" * 50 + "|n",
+                headline,
+                f"|y+{hp_gain} Max HP|n",
+                "|y" + "=" * 50 + "|n",
+            ]
+
+        self.attributes.batch_add(*changes)
+
+        if lines:
+            self.msg("\n".join(lines))
+
+        if levels_gained and self.location:
+            self.location.msg_contents(
+                f"|y{self.name} has reached level {new_level}!|n",
+                exclude=[self]
+            )
 
-        self.location.msg_contents(
-            f"|y{self.name} has reached level {self.db.level}!|n",
-            exclude=[self]
-        )
+        return levels_gained
+
+    def level_up(self):
+        """Advance exactly one level"""
+        level = self.db.level or 1
+        if level >= MAX_LEVEL:
+            return 0
+        remaining = CUMULATIVE_XP[level] - self.total_xp()
+        return self.gain_xp(max(0, remaining), announce=False)
+
+    def get_currency(self):
+        """Current shekels, from the ledger (db.currency may lag a commit behind)"""
+        return get_ledger().balance(self)
 
     def return_appearance(self, looker, **kwargs):
         """How character appears when looked at"""
@@ -269,7 +376,7 @@ class Character(DefaultCharacter):
             string += f"\n\n|w=== CHARACTER STATS ===|n"
             string += f"\n|wClass:|n {self.db.character_class or 'None'}"
             string += f"\n|wLevel:|n {self.db.level}  |wXP:|n {self.db.xp}/{self.db.xp_to_next_level}"
-            string += f"\n\n|wHealth:|n {self.db.hp}/{self.db.max_hp}"
+            string += f"\n\n|wHealth:|n {self.get_hp()}/{self.db.max_hp}"
             string += f"\n\n|wStats:|n"
             string += f"\n  Faith: {self.db.faith}"
             string += f"\n  Wisdom: {self.db.wisdom}"
@@ -285,7 +392,7 @@ class Character(DefaultCharacter):
             if self.db.equipped_armor:
                 string += f"\n|wArmor:|n {self.db.equipped_armor.name}"
 
-            string += f"\n\n|wCurrency:|n {self.db.currency} shekels"
+            string += f"\n\n|wCurrency:|n {self.get_currency()} shekels"
             string += f"\n|wWeight:|n {self.db.carried_weight:.1f}/{self.db.max_carry_weight} lbs"
 
             if self.db.calling:
@@ -296,11 +403,58 @@ class Character(DefaultCharacter):
     def at_object_receive(self, moved_obj, source_location, **kwargs):
         """Called when receiving an object"""
         super().at_object_receive(moved_obj, source_location, **kwargs)
+        self.bump_inventory_version()
 
         # Check if over-encumbered
         if self.db.carried_weight > self.db.max_carry_weight:
             self.msg("|yYou are over-encumbered!|n")
 
+    def at_object_leave(self, moved_obj, target_location, **kwargs):
+        """Called when an object leaves the inventory"""
+        super().at_object_leave(moved_obj, target_location, **kwargs)
+        self.bump_inventory_version()
+
+    def bump_inventory_version(self):
+        """
+        Mark the inventory as changed. Open trade offers were made against
+        an inventory version and are re-checked when it moves on.
+
+        Returns:
+            int: The new inventory version
+        """
+        self.ndb.inventory_version = (self.ndb.inventory_version or 0) + 1
+        return self.ndb.inventory_version
+
+    def at_post_move(self, source_location, **kwargs):
+        """
+        Called after moving. The mover gets the full state of the new room;
+        everyone else in both rooms gets a room_delta from the rooms' hooks.
+        """
+        super().at_post_move(source_location, **kwargs)
+        if self.sessions.count():
+            self.update_presence()
+        self.send_room_update()
+
+    def at_post_puppet(self, **kwargs):
+        """Called when a player takes control of this character"""
+        super().at_post_puppet(**kwargs)
+        self.update_presence()
+
+    def at_post_unpuppet(self, account=None, session=None, **kwargs):
+        """Called when the last session leaves this character"""
+        super().at_post_unpuppet(account=account, session=session, **kwargs)
+        if not self.sessions.count():
+            get_presence().remove(self)
+
+    def update_presence(self):
+        """Record this character's room in the presence index and sync current_floor"""
+        location = self.location
+        get_presence().move(self, location)
+        get_scheduler().wake_room(location)
+        floor = location.db.floor if location else None
+        if floor is not None and floor != self.db.current_floor:
+            self.db.current_floor = floor
+
     def send_to_web_client(self, message_dict):
         """
         Send a message to the web client via WebSocket.
@@ -337,14 +491,15 @@ class Character(DefaultCharacter):
                 "righteousness": self.db.righteousness or 5
             },
             "health": {
-                "current": self.db.hp or 100,
-                "max": self.db.max_hp or 100
+                "current": self.get_hp(),
+                "max": self.db.max_hp or 100,
+                "regen": self.get_regen_state()
             },
             "xp": {
                 "current": self.db.xp or 0,
                 "next_level": self.db.xp_to_next_level or 100
             },
-            "currency": self.db.currency or 0
+            "currency": self.get_currency()
         }
 
         # Build inventory
@@ -361,7 +516,7 @@ class Character(DefaultCharacter):
             inventory.append({
                 "id": item.key,
                 "name": item.get_display_name(self),
-                "type": getattr(item.db, "item_type", "misc"),
+                "type": item.get_field("item_type", "misc"),
                 "equipped": is_equipped
             })
 
@@ -378,45 +533,7 @@ class Character(DefaultCharacter):
         if not room:
             return
 
-        # Get characters in room
-        characters = []
-        for obj in room.contents:
-            if inherits_from(obj, "typeclasses.characters.Character"):
-                characters.append({
-                    "id": obj.key,
-                    "name": obj.get_display_name(self),
-                    "class": obj.db.character_class or "shepherd",
-                    "sprite": f"{obj.db.character_class or 'shepherd'}_idle"
-                })
-
-        # Get items in room
-        objects = []
-        for obj in room.contents:
-            if inherits_from(obj, "typeclasses.objects.Item"):
-                objects.append({
-                    "id": obj.key,
-                    "name": obj.get_display_name(self),
-                    "type": getattr(obj.db, "item_type", "misc"),
-                    "sprite": getattr(obj.db, "sprite", "item_default")
-                })
-
-        # Get exits
-        exits = []
-        for exit_obj in room.exits:
-            if exit_obj:
-                direction = getattr(exit_obj.db, "direction", None)
-                if direction:
-                    exits.append(direction)
-
-        room_state = {
-            "id": room.key,
-            "name": room.get_display_name(self),
-            "description": room.db.description or getattr(room.db, 'desc', 'A place of mystery.'),
-            "floor": getattr(room.db, 'floor', 1),
-            "characters": characters,
-            "objects": objects,
-            "exits": exits
-        }
+        room_state = room.get_state_payload(self)
 
         self.send_to_web_client({
             "type": "room_update",
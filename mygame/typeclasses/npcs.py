@@ -3,17 +3,48 @@ Custom NPC Typeclasses for Journey Through Scripture
 NPCs, merchants, priests, and bosses
 """
 
-from evennia import DefaultCharacter
+from evennia import DefaultCharacter, search_tag
 from evennia.utils.evmenu import EvMenu
 
+from world.dialogue import DialogueTree, get_dialogue
 
-class NPC(DefaultCharacter):
+from .regen import RegenMixin, NPC_REGEN_RATE
+
+try:
+    from ..presence import get_presence
+except (ImportError, ValueError):
+    from presence import get_presence
+
+try:
+    from ..loot import roll_boss_loot, grant_loot, describe_loot
+except (ImportError, ValueError):
+    from loot import roll_boss_loot, grant_loot, describe_loot
+
+try:
+    from ..shops import get_shops
+except (ImportError, ValueError):
+    from shops import get_shops
+
+try:
+    from ..conversations import get_conversations
+except (ImportError, ValueError):
+    from conversations import get_conversations
+
+try:
+    from ..combat import start_combat
+    from ..quests import create_quest
+except (ImportError, ValueError):
+    from combat import start_combat
+    from quests import create_quest
+
+
+class NPC(RegenMixin, DefaultCharacter):
     """
     Base NPC class with dialogue system.
 
     Attributes:
         npc_type (str): friendly, neutral, merchant, priest, hostile, boss
-        dialogue (dict): Dialogue tree structure
+        dialogue_id (str): ID of the shared compiled dialogue tree
         quest (str): Quest ID if NPC gives quests
         merchant (bool): Whether NPC is a merchant
         shop_inventory (list): Items for sale
@@ -21,44 +52,69 @@ class NPC(DefaultCharacter):
         services (list): Services provided (heal, save, bless)
         boss_stats (dict): Combat stats if boss
         can_become_hostile (bool): Whether NPC can turn hostile
+        behaviours (list): AI behaviours (patrol, aggro, flee) run by the
+            NPC scheduler while players are in the room
+        patrol_range (int): Rooms from its post a patrolling NPC may wander
     """
 
+    regen_rate = NPC_REGEN_RATE
+
     def at_object_creation(self):
         """Called when NPC is first created"""
         super().at_object_creation()
 
-        # NPC properties
-        self.db.npc_type = "friendly"
-        self.db.dialogue = {
-            "greeting": "Hello, traveler.",
-            "main_menu": {},
-            "responses": {}
-        }
-        self.db.quest = None
-        self.db.merchant = False
-        self.db.shop_inventory = []
-        self.db.shop_prices = "fair"
-        self.db.services = []
-        self.db.boss_stats = None
-        self.db.can_become_hostile = False
-        self.db.defeated = False
-
-        # Combat stats
-        self.db.hp = 50
-        self.db.max_hp = 50
-        self.db.damage = 5
-        self.db.defense = 2
+        # NPC properties and combat stats, written in one batch
+        self.attributes.batch_add(
+            ("npc_type", "friendly"),
+            ("dialogue_id", None),
+            ("quest", None),
+            ("merchant", False),
+            ("shop_inventory", []),
+            ("shop_prices", "fair"),
+            ("services", []),
+            ("boss_stats", None),
+            ("can_become_hostile", False),
+            ("behaviours", []),
+            ("patrol_range", 1),
+            ("defeated", False),
+            ("hp", 50),
+            ("max_hp", 50),
+            ("damage", 5),
+            ("defense", 2)
+        )
 
         # Make NPCs not controllable
         self.locks.add("puppet:false()")
         self.locks.add("get:false()")
 
-    def at_char_entered(self, character):
-        """Called when a character enters the room"""
-        # Greet characters who enter
-        if character.has_account and self.db.npc_type != "hostile":
-            greeting = self.db.dialogue.get("greeting", "...")
-            character.msg(f"{self.name} says, \"{greeting}\"")
+    def greeting_for(self, character):
+        """
+        Get what this NPC says to a character entering its room. The room
+        throttles and batches greetings (see greetings.py).
+
+        Returns:
+            str: The greeting, or None to stay quiet
+        """
+        if self.db.npc_type == "hostile":
+            return None
+        dialogue = self.get_dialogue()
+        return dialogue.greeting if dialogue else None
+
+    def get_dialogue(self):
+        """
+        Get this NPC's compiled dialogue tree.
+
+        NPCs built before dialogue trees were shared still carry their own
+        dialogue dict; that is compiled once per server run.
+
+        Returns:
+            DialogueTree: The tree, or None if the NPC has nothing to say
+        """
+        if self.db.dialogue_id:
+            return get_dialogue(self.db.dialogue_id)
+        if self.ndb.dialogue is None and self.db.dialogue:
+            self.ndb.dialogue = DialogueTree(self.key, self.key, self.db.dialogue)
+        return self.ndb.dialogue
 
     def talk_to(self, character):
         """Initiate dialogue with a character"""
@@ -80,88 +136,68 @@ class NPC(DefaultCharacter):
 
     def start_dialogue(self, character):
         """Start a dialogue tree with the character"""
-        dialogue = self.db.dialogue
-
-        # Show greeting
-        character.msg(f"\n{self.name} says, \"{dialogue.get('greeting', 'Hello.')}\"")
-
-        # Show main menu options
-        main_menu = dialogue.get('main_menu', {})
-        if not main_menu:
-            character.msg("(They have nothing more to say)")
+        dialogue = self.get_dialogue()
+        if not dialogue:
+            character.msg(f"{self.name} has nothing to say.")
             return
 
-        character.msg("\n|wWhat do you say?|n")
-        for num, option in main_menu.items():
-            character.msg(f"  {num}. {option['text']}")
+        # Greeting and menu go out as one message
+        character.msg(dialogue.opening(character.db.flags))
+        if not dialogue.options:
+            return
 
-        # Store dialogue state on character
-        character.db.talking_to = self
-        character.db.dialogue_state = "main_menu"
+        get_conversations().start(character, self)
 
     def respond(self, character, choice):
-        """Handle character's dialogue choice"""
-        dialogue = self.db.dialogue
-        main_menu = dialogue.get('main_menu', {})
-        responses = dialogue.get('responses', {})
-
-        # Get the chosen option
-        option = main_menu.get(int(choice))
+        """
+        Handle character's dialogue choice.
+
+        Args:
+            character: Character in the conversation
+            choice (int): Menu number they picked
+        """
+        dialogue = self.get_dialogue()
+        flags = character.db.flags
+        option = dialogue.choose(choice, flags) if dialogue else None
         if not option:
             character.msg("Invalid choice.")
             return
 
-        # Check if option requires something
-        if 'requires' in option:
-            required = option['requires']
-            if not character.db.flags or required not in character.db.flags:
-                character.msg("(That option is not available yet)")
-                return
-
-        # Get the response
-        response_key = option['response']
-
-        if response_key == "farewell":
-            character.msg(f"\n{self.name} says, \"{responses.get('farewell', 'Farewell.')}\"")
-            character.db.talking_to = None
-            character.db.dialogue_state = None
-            return
-
-        response_text = responses.get(response_key, "...")
+        if option.action:
+            self.run_action(character, option.action)
 
-        # Handle special responses
-        if response_text.startswith("[GAME ACTION:"):
-            self.handle_game_action(character, response_text)
+        if option.ends:
+            character.msg(option.reply)
+            get_conversations().end(character)
         else:
-            character.msg(f"\n{self.name} says, \"{response_text}\"")
-
-        # Show menu again
-        character.msg("\n|wWhat else do you want to ask?|n")
-        for num, opt in main_menu.items():
-            character.msg(f"  {num}. {opt['text']}")
-
-    def handle_game_action(self, character, action_text):
-        """Handle special game actions in dialogue"""
-        if "Heal" in action_text or "heal" in action_text:
-            self.heal_character(character)
-        elif "Save" in action_text or "save" in action_text:
-            self.save_game(character)
-        elif "shop" in action_text or "Shop" in action_text:
-            self.open_shop(character)
-        elif "COMBAT" in action_text:
-            self.initiate_combat(character)
-        else:
-            character.msg(action_text)
-
-    def heal_character(self, character):
-        """Heal a character to full HP"""
-        if hasattr(character.db, 'hp'):
-            old_hp = character.db.hp
-            character.db.hp = character.db.max_hp
-            healed = character.db.hp - old_hp
+            character.msg(option.reply + dialogue.menu(flags))
+
+    def run_action(self, character, action):
+        """
+        Run a compiled dialogue action.
+
+        Args:
+            character: Character in the conversation
+            action (Action): Action from the dialogue tree
+        """
+        action.handler(self, character, **action.params)
+
+    def heal_character(self, character, amount=None):
+        """
+        Heal a character.
+
+        Args:
+            character: Character to heal
+            amount (int): HP to restore, or None for full health
+        """
+        if hasattr(character, 'set_hp'):
+            old_hp = character.get_hp()
+            target = character.db.max_hp if amount is None else old_hp + amount
+            hp = character.set_hp(target)
+            healed = hp - old_hp
             character.msg(f"|g{self.name} places a hand on your shoulder.|n")
             character.msg(f"|gDivine light flows through you, restoring {healed} health!|n")
-            character.msg(f"|gYou are now at {character.db.hp}/{character.db.max_hp} HP.|n")
+            character.msg(f"|gYou are now at {hp}/{character.db.max_hp} HP.|n")
         else:
             character.msg(f"{self.name} blesses you with healing energy.")
 
@@ -171,27 +207,65 @@ class NPC(DefaultCharacter):
         character.msg("|yYour progress has been saved.|n")
         # In a full implementation, this would save to database
 
-    def open_shop(self, character):
-        """Open merchant shop interface"""
-        if not self.db.merchant:
+    def open_shop(self, character, shop=None):
+        """
+        Open merchant shop interface.
+
+        Args:
+            character: Customer
+            shop (str): NPC ID of the merchant whose shop to show, or None
+                for this NPC's own
+        """
+        merchant = self
+        if shop:
+            found = search_tag(shop, category="world_npc")
+            merchant = found[0] if found else None
+        if not merchant or not merchant.db.merchant:
             character.msg(f"{self.name} is not a merchant.")
             return
 
-        character.msg(f"\n|w--- {self.name}'s Shop ---|n")
-        character.msg(f"\nInventory:")
-
-        # Show items for sale
-        for item_key in self.db.shop_inventory:
-            # Would look up item data from items.py
-            character.msg(f"  - {item_key} (price varies)")
+        character.msg(get_shops().listing(merchant))
 
-        character.msg("\n(Shop system coming soon!)")
+    def offer_quest(self, character, quest):
+        """
+        Give a character a quest and start it.
 
-    def initiate_combat(self, character):
-        """Start combat with this NPC"""
+        Args:
+            character: Character to receive the quest
+            quest (str): Quest ID
+        """
+        manager = getattr(character, 'quest_manager', None)
+        if not manager:
+            return
+        if quest not in manager.quests:
+            new_quest = create_quest(quest)
+            if not new_quest:
+                return
+            manager.add_quest(new_quest)
+        manager.start_quest(quest)
+
+    def initiate_combat(self, character, creature=None, level=1):
+        """
+        Start a fight.
+
+        Args:
+            character: Character to fight
+            creature (str): Creature type to send against them, or None to
+                fight this NPC
+            level (int): Creature level
+        """
+        if creature:
+            start_combat(character, creature, level)
+            return
         character.msg(f"|r{self.name} prepares to fight!|n")
         character.msg("(Combat system coming soon!)")
 
+    def set_flag(self, character, flag):
+        """Set a story flag on a character"""
+        flags = character.db.flags or []
+        if flag not in flags:
+            character.db.flags = flags + [flag]
+
 
 class Priest(NPC):
     """
@@ -253,12 +327,23 @@ class Boss(NPC):
         self.location.msg_contents(
             f"|y✧ {self.name} has been defeated! ✧|n"
         )
+        get_presence().announce_floor(
+            self.location.db.floor,
+            f"|y✧ {self.name} has fallen to {killer.name} in {self.location.key}! ✧|n",
+            exclude=self.location.contents
+        )
 
-        # Give rewards
-        if self.db.defeat_reward:
-            killer.msg("|gYou have gained:|n")
-            for reward in self.db.defeat_reward:
-                killer.msg(f"  - {reward}")
+        # Everyone present shares the kill; each rolls the boss's loot
+        # table, and the killer also takes its guaranteed drops
+        boss_id = self.tags.get(category="world_npc") or self.key.lower().replace(" ", "_")
+        party = [obj for obj in self.location.contents if obj.has_account]
+        if killer not in party:
+            party.append(killer)
+        for member in party:
+            drops = roll_boss_loot(boss_id, member.db.level or 1, killer=member == killer)
+            if drops:
+                grant_loot(member, drops)
+                member.msg(f"|gYou have gained:|n {describe_loot(drops)}")
 
         # Unlock next area
         if self.db.defeat_unlocks and hasattr(self.location, 'defeat_boss'):
@@ -285,9 +370,9 @@ class HostileNPC(NPC):
         self.db.max_hp = 30
         self.db.damage = 8
         self.db.defense = 3
+        # Add "aggro" along with a creature_type for the fight it starts
+        self.db.behaviours = ["flee"]
 
-    def at_char_entered(self, character):
-        """Attack characters who enter"""
-        if character.has_account:
-            character.msg(f"|r{self.name} attacks!|n")
-            # Would initiate combat
+    def greeting_for(self, character):
+        """Warn characters who enter; the NPC scheduler makes the attack"""
+        return f"|r{self.name} turns toward you with hostile intent.|n"
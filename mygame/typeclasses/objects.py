@@ -3,19 +3,36 @@ Custom Object Typeclasses for Journey Through Scripture
 Items, equipment, consumables, and quest objects
 """
 
-from evennia import DefaultObject
+import copy
+
+from evennia import DefaultObject, create_object
 from evennia.utils.utils import inherits_from
 
+from world.content_index import get_content_index
+
+
 class ObjectParent:
     """
     Parent class for all objects. This is required by Evennia's exits.py
     """
     pass
+
+
+# Item types whose identical units collapse into one object with a quantity
+STACKABLE_ITEM_TYPES = ("currency", "consumable", "material")
+
+
 class Item(DefaultObject):
     """
     Base item class for all objects in the game.
 
-    Attributes:
+    Items are flyweights: an instance stores its `item_id` and only the
+    state that is really its own (uses left, equipped, or any override).
+    Everything else is read through get_field() from the shared ITEMS
+    definition, falling back to the class's field_defaults. Writing a
+    field with set_field() stores an instance override (copy-on-write).
+
+    Fields:
         item_type (str): consumable, weapon, equipment, lore, quest, material, currency, key
         value (int): Base value in temple shekels
         weight (float): Weight for encumbrance
@@ -27,36 +44,162 @@ class Item(DefaultObject):
         text (str): Text content for readable items
         cursed (bool): Whether item has negative effects
         effect (str): Special effect identifier
+
+    Stackable item types (STACKABLE_ITEM_TYPES) keep one object per
+    stack with a quantity; stacks merge when picked up, dropped or given
+    next to a matching stack, and split when only part is handed over.
+
+    Attributes:
+        item_id (str): Key into world.items.ITEMS
+        equipped (bool): Whether the item is equipped
+        quantity (int): Units in this stack (stackable items only)
     """
 
+    field_defaults = {
+        "desc": "",
+        "item_type": "material",
+        "value": 0,
+        "weight": 1.0,
+        "stats": {},
+        "healing": 0,
+        "uses": 1,
+        "usable_by": ["all"],
+        "readable": False,
+        "text": "",
+        "cursed": False,
+        "effect": None,
+    }
+
     def at_object_creation(self):
         """Called when item is first created"""
         super().at_object_creation()
 
-        # Item properties
-        self.db.item_type = "material"
-        self.db.value = 0
-        self.db.weight = 1.0
-        self.db.stats = {}
-        self.db.healing = 0
-        self.db.uses = 1
-        self.db.usable_by = ["all"]
-        self.db.readable = False
-        self.db.text = ""
-        self.db.cursed = False
-        self.db.effect = None
-        self.db.equipped = False
-
         # Make items gettable
         self.locks.add("get:all()")
 
+    def at_object_post_creation(self):
+        """Show the item to the room once create_object has set its Attributes"""
+        super().at_object_post_creation()
+        if hasattr(self.location, 'broadcast_move'):
+            self.location.broadcast_move(self, arriving=True)
+
+    def get_definition(self):
+        """
+        Get the shared definition this item was made from.
+
+        Returns:
+            dict: Entry in world.items.ITEMS, or {} for ad-hoc items
+        """
+        item_id = self.db.item_id
+        return (get_item(item_id) if item_id else None) or {}
+
+    def get_field(self, name, default=None):
+        """
+        Read an item field: instance override, then definition, then
+        the class default.
+
+        Lists and dicts are returned as copies, so changing the result
+        never touches the shared definition; use set_field to keep a change.
+        """
+        value = self.attributes.get(name)
+        if value is None:
+            value = self.get_definition().get(name, self.field_defaults.get(name, default))
+            if isinstance(value, (dict, list)):
+                value = copy.deepcopy(value)
+        return value
+
+    def set_field(self, name, value):
+        """Store an instance override for a field (copy-on-write)"""
+        self.attributes.add(name, value)
+
+    def get_display_desc(self, looker, **kwargs):
+        """Description from the instance or the shared definition"""
+        return self.get_field("desc") or super().get_display_desc(looker, **kwargs)
+
+    def get_display_name(self, looker=None, **kwargs):
+        """Name, with the count for stacks of more than one"""
+        name = super().get_display_name(looker, **kwargs)
+        quantity = self.get_quantity()
+        return f"{name} (x{quantity})" if quantity > 1 else name
+
+    # Stacks
+
+    def get_quantity(self):
+        """Units in this stack"""
+        return self.db.quantity or 1
+
+    def set_quantity(self, quantity):
+        """Resize this stack, marking its holder's inventory as changed"""
+        self.db.quantity = quantity
+        if hasattr(self.location, 'bump_inventory_version'):
+            self.location.bump_inventory_version()
+
+    def get_total_weight(self):
+        """Weight of the whole stack"""
+        return self.get_field("weight") * self.get_quantity()
+
+    def get_total_value(self):
+        """Value of the whole stack"""
+        return self.get_field("value") * self.get_quantity()
+
+    def can_stack_with(self, other):
+        """
+        Check if two items can share one stack: same definition, a
+        stackable type, and no partly used units.
+        """
+        return (other is not self
+                and self.db.item_id
+                and getattr(other, 'db', None) is not None
+                and other.db.item_id == self.db.item_id
+                and hasattr(other, 'get_field')
+                and self.get_field("item_type") in STACKABLE_ITEM_TYPES
+                and not self.attributes.has("uses")
+                and not other.attributes.has("uses"))
+
+    def merge_into_stack(self):
+        """
+        Fold this item into a matching stack in the same location.
+
+        Returns:
+            Item: The stack now holding these units (self if none matched)
+        """
+        if not self.location or self.get_field("item_type") not in STACKABLE_ITEM_TYPES:
+            return self
+        for other in self.location.contents:
+            if self.can_stack_with(other):
+                other.set_quantity(other.get_quantity() + self.get_quantity())
+                # delete() fires no leave hook; tell the room's clients
+                # this entry is gone
+                if hasattr(self.location, 'broadcast_move'):
+                    self.location.broadcast_move(self, arriving=False)
+                self.delete()
+                return other
+        return self
+
+    def split(self, quantity):
+        """
+        Take units off this stack as a new stack in the same location.
+
+        Args:
+            quantity (int): Units to take; must be less than the stack size
+
+        Returns:
+            Item: The new stack, or None if this item can't be split (it
+                has no item definition); the stack is then left whole
+        """
+        part = create_item(self.db.item_id, location=self.location, quantity=quantity)
+        if part:
+            self.set_quantity(self.get_quantity() - quantity)
+        return part
+
     def at_get(self, getter, **kwargs):
         """Called when item is picked up"""
         super().at_get(getter, **kwargs)
 
         # Add to character's inventory weight
         if hasattr(getter.db, 'carried_weight'):
-            getter.db.carried_weight += self.db.weight
+            getter.db.carried_weight += self.get_total_weight()
+        self.merge_into_stack()
 
     def at_drop(self, dropper, **kwargs):
         """Called when item is dropped"""
@@ -64,30 +207,42 @@ class Item(DefaultObject):
 
         # Remove from character's inventory weight
         if hasattr(dropper.db, 'carried_weight'):
-            dropper.db.carried_weight -= self.db.weight
+            dropper.db.carried_weight -= self.get_total_weight()
+        self.merge_into_stack()
+
+    def at_give(self, giver, getter, **kwargs):
+        """Called when item is given to someone else"""
+        super().at_give(giver, getter, **kwargs)
+
+        # Move the weight from giver to getter
+        weight = self.get_total_weight()
+        if hasattr(giver.db, 'carried_weight'):
+            giver.db.carried_weight -= weight
+        if hasattr(getter.db, 'carried_weight'):
+            getter.db.carried_weight += weight
+        self.merge_into_stack()
 
     def use(self, user):
         """Use this item (consumables, etc.)"""
-        if self.db.item_type != "consumable":
+        if self.get_field("item_type") != "consumable":
             user.msg(f"You cannot use {self.name} that way.")
             return False
 
-        if self.db.uses <= 0:
+        if self.get_field("uses") <= 0:
             user.msg(f"{self.name} has been used up.")
             return False
 
         # Check if user can use this item
-        if "all" not in self.db.usable_by and \
-           user.db.character_class not in self.db.usable_by:
+        if "all" not in self.get_field("usable_by") and \
+           user.db.character_class not in self.get_field("usable_by"):
             user.msg(f"Your class cannot use {self.name}.")
             return False
 
         # Apply healing
-        if self.db.healing > 0:
-            if hasattr(user.db, 'hp'):
-                old_hp = user.db.hp
-                user.db.hp = min(user.db.max_hp, user.db.hp + self.db.healing)
-                actual_healing = user.db.hp - old_hp
+        if self.get_field("healing") > 0:
+            if hasattr(user, 'set_hp'):
+                old_hp = user.get_hp()
+                actual_healing = user.set_hp(old_hp + self.get_field("healing")) - old_hp
                 user.msg(f"|gYou use {self.name} and restore {actual_healing} health.|n")
                 user.location.msg_contents(
                     f"{user.name} uses {self.name}.",
@@ -95,22 +250,32 @@ class Item(DefaultObject):
                 )
 
         # Apply special effects
-        if self.db.effect:
+        if self.get_field("effect"):
             self.apply_effect(user)
 
         # Decrease uses
-        self.db.uses -= 1
-        if self.db.uses <= 0:
+        uses = self.get_field("uses") - 1
+        if uses <= 0 and self.get_quantity() > 1:
+            # One unit of the stack is spent; the next one starts fresh
+            self.set_quantity(self.get_quantity() - 1)
+            self.attributes.remove("uses")
+            user.msg(f"{self.name} crumbles to dust, its power spent. ({self.get_quantity()} left)")
+            if hasattr(user.db, 'carried_weight') and self.location == user:
+                user.db.carried_weight -= self.get_field("weight")
+        elif uses <= 0:
             user.msg(f"{self.name} crumbles to dust, its power spent.")
+            if hasattr(user.db, 'carried_weight') and self.location == user:
+                user.db.carried_weight -= self.get_field("weight")
             self.delete()
         else:
-            user.msg(f"({self.db.uses} use(s) remaining)")
+            self.set_field("uses", uses)
+            user.msg(f"({uses} use(s) remaining)")
 
         return True
 
     def apply_effect(self, user):
         """Apply special effects from items"""
-        effect = self.db.effect
+        effect = self.get_field("effect")
 
         if effect == "faith_permanent_+1":
             user.db.faith += 1
@@ -132,34 +297,34 @@ class Item(DefaultObject):
 
     def read(self, reader):
         """Read this item if it's readable"""
-        if not self.db.readable:
+        if not self.get_field("readable"):
             reader.msg(f"There is nothing to read on {self.name}.")
             return False
 
-        if not self.db.text:
+        if not self.get_field("text"):
             reader.msg(f"{self.name} appears to be blank.")
             return False
 
         # Display the text in a nice format
         reader.msg(f"\n|w--- {self.name.upper()} ---|n")
-        reader.msg(self.db.text)
+        reader.msg(self.get_field("text"))
         reader.msg("|w" + "-" * (len(self.name) + 10) + "|n\n")
         return True
 
     def equip(self, user):
         """Equip this item (weapons, armor, etc.)"""
-        if self.db.item_type not in ["weapon", "equipment", "clothing"]:
+        if self.get_field("item_type") not in ["weapon", "equipment", "clothing"]:
             user.msg(f"You cannot equip {self.name}.")
             return False
 
         # Check class restriction
-        if "all" not in self.db.usable_by and \
-           user.db.character_class not in self.db.usable_by:
+        if "all" not in self.get_field("usable_by") and \
+           user.db.character_class not in self.get_field("usable_by"):
             user.msg(f"Your class cannot equip {self.name}.")
             return False
 
         # Unequip current item in slot (simple version - one weapon slot)
-        if self.db.item_type == "weapon":
+        if self.get_field("item_type") == "weapon":
             if user.db.equipped_weapon:
                 user.db.equipped_weapon.db.equipped = False
                 user.msg(f"You unequip {user.db.equipped_weapon.name}.")
@@ -169,10 +334,10 @@ class Item(DefaultObject):
         user.msg(f"|gYou equip {self.name}.|n")
 
         # Show stat bonuses
-        if self.db.stats:
-            user.msg(f"Bonuses: {', '.join([f'{k}: +{v}' for k, v in self.db.stats.items()])}")
+        if self.get_field("stats"):
+            user.msg(f"Bonuses: {', '.join([f'{k}: +{v}' for k, v in self.get_field('stats').items()])}")
 
-        if self.db.cursed:
+        if self.get_field("cursed"):
             user.msg("|rYou feel a dark energy emanating from the item...|n")
 
         return True
@@ -182,36 +347,38 @@ class Item(DefaultObject):
         string = super().return_appearance(looker, **kwargs)
 
         # Add item type
-        string += f"\n|wType:|n {self.db.item_type.capitalize()}"
+        string += f"\n|wType:|n {self.get_field('item_type').capitalize()}"
 
         # Add value and weight
-        string += f"\n|wValue:|n {self.db.value} shekels  |wWeight:|n {self.db.weight} lbs"
+        string += f"\n|wValue:|n {self.get_field('value')} shekels  |wWeight:|n {self.get_field('weight')} lbs"
+        if self.get_quantity() > 1:
+            string += f"\n|wStack:|n {self.get_quantity()} ({self.get_total_value()} shekels, {self.get_total_weight():.1f} lbs)"
 
         # Add stats if present
-        if self.db.stats:
+        if self.get_field("stats"):
             string += "\n|wBonuses:|n"
-            for stat, value in self.db.stats.items():
+            for stat, value in self.get_field("stats").items():
                 string += f"\n  {stat}: +{value}"
 
         # Add healing if consumable
-        if self.db.healing > 0:
-            string += f"\n|gRestores:|n {self.db.healing} HP"
+        if self.get_field("healing") > 0:
+            string += f"\n|gRestores:|n {self.get_field('healing')} HP"
 
         # Add uses if consumable
-        if self.db.item_type == "consumable" and self.db.uses:
-            string += f"\n|yUses remaining:|n {self.db.uses}"
+        if self.get_field("item_type") == "consumable" and self.get_field("uses"):
+            string += f"\n|yUses remaining:|n {self.get_field('uses')}"
 
         # Warn if cursed
-        if self.db.cursed:
+        if self.get_field("cursed"):
             string += "\n|r⚠ This item is cursed! ⚠|n"
 
         # Show if readable
-        if self.db.readable:
+        if self.get_field("readable"):
             string += "\n|c(Use 'read <item>' to read this)|n"
 
         # Show who can use it
-        if self.db.usable_by and "all" not in self.db.usable_by:
-            string += f"\n|yUsable by:|n {', '.join(self.db.usable_by)}"
+        if self.get_field("usable_by") and "all" not in self.get_field("usable_by"):
+            string += f"\n|yUsable by:|n {', '.join(self.get_field('usable_by'))}"
 
         return string
 
@@ -219,28 +386,22 @@ class Item(DefaultObject):
 class Weapon(Item):
     """Weapon items with combat bonuses"""
 
-    def at_object_creation(self):
-        super().at_object_creation()
-        self.db.item_type = "weapon"
-        self.db.stats = {"damage": 5, "strength_bonus": 1}
+    field_defaults = dict(Item.field_defaults, item_type="weapon")
 
 
 class Consumable(Item):
     """Consumable items that restore health or provide buffs"""
 
-    def at_object_creation(self):
-        super().at_object_creation()
-        self.db.item_type = "consumable"
-        self.db.healing = 10
-        self.db.uses = 1
+    field_defaults = dict(Item.field_defaults, item_type="consumable")
 
 
 class QuestItem(Item):
     """Important quest items that cannot be dropped or sold"""
 
+    field_defaults = dict(Item.field_defaults, item_type="quest")
+
     def at_object_creation(self):
         super().at_object_creation()
-        self.db.item_type = "quest"
         self.locks.add("drop:false()")  # Cannot drop quest items
 
     def at_drop(self, dropper, **kwargs):
@@ -252,17 +413,94 @@ class QuestItem(Item):
 class Key(Item):
     """Keys that unlock doors and containers"""
 
-    def at_object_creation(self):
-        super().at_object_creation()
-        self.db.item_type = "key"
-        self.db.unlocks = ""  # What this key unlocks
+    field_defaults = dict(Item.field_defaults,
+                          item_type="key",
+                          unlocks="")  # What this key unlocks
 
     def unlock_door(self, door, user):
         """Use key to unlock a door"""
-        if door.key == self.db.unlocks:
+        if door.key == self.get_field("unlocks"):
             user.msg(f"|gYou use {self.name} to unlock the door!|n")
             # Unlock the door
             return True
         else:
             user.msg(f"{self.name} doesn't fit this lock.")
             return False
+
+
+# Item typeclass by definition item_type; anything else is a plain Item
+ITEM_TYPECLASSES = {
+    "weapon": Weapon,
+    "consumable": Consumable,
+    "quest": QuestItem,
+    "key": Key,
+}
+
+
+def get_item(item_id):
+    """Get an item definition from the content index, or None"""
+    return get_content_index().item(item_id)
+
+
+def item_class_for(item_type):
+    """Get the typeclass for an item_type"""
+    return ITEM_TYPECLASSES.get(item_type, Item)
+
+
+def create_item(item_id, location=None, quantity=1, **overrides):
+    """
+    Create an item instance from its definition in world.items.
+
+    Args:
+        item_id (str): Key into ITEMS
+        location: Where to put the item
+        quantity (int): Stack size (only meaningful for stackable types)
+        **overrides: Fields this instance should not share with the definition
+
+    Returns:
+        Item: The new item, or None if item_id is unknown
+    """
+    item_data = get_item(item_id)
+    if not item_data:
+        return None
+    if quantity != 1:
+        overrides["quantity"] = quantity
+    return create_object(
+        item_class_for(item_data.get('item_type', 'material')),
+        key=item_data['key'],
+        location=location,
+        aliases=[item_id],
+        attributes=[("item_id", item_id)] + list(overrides.items())
+    )
+
+
+def deliver_item(item_id, character, quantity=1):
+    """
+    Create units of an item straight into a character's inventory,
+    counting their weight and stacking where the type allows.
+
+    Args:
+        item_id (str): Key into ITEMS
+        character: Receiving character
+        quantity (int): Units to deliver
+
+    Returns:
+        list: The items now holding the units
+    """
+    item_data = get_item(item_id)
+    if not item_data or quantity < 1:
+        return []
+    if item_data.get('item_type', 'material') in STACKABLE_ITEM_TYPES:
+        batches = [quantity]
+    else:
+        batches = [1] * quantity
+
+    received = []
+    for units in batches:
+        item = create_item(item_id, location=character, quantity=units)
+        if hasattr(character.db, 'carried_weight'):
+            character.db.carried_weight += item.get_total_weight()
+        item = item.merge_into_stack()
+        if item not in received:
+            received.append(item)
+    return received
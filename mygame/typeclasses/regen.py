@@ -0,0 +1,99 @@
+"""
+Passive HP Regeneration for Journey Through Scripture
+
+HP is never ticked. Each combatant stores the HP it had at its last change
+and when that change happened; current HP is worked out from the elapsed
+time whenever something reads it. Idle characters cost nothing.
+"""
+
+import math
+import time
+
+
+# HP regained per second while out of combat
+CHARACTER_REGEN_RATE = 0.2  # 1 HP every 5 seconds
+NPC_REGEN_RATE = 0.1  # 1 HP every 10 seconds
+
+
+def regen_hp(stored_hp, max_hp, rate, updated_at, now):
+    """
+    Work out current HP from the last stored value.
+
+    Args:
+        stored_hp (int): HP when it was last written
+        max_hp (int): HP cap
+        rate (float): HP regained per second
+        updated_at (float): Timestamp of the last write, or None
+        now (float): Current timestamp
+
+    Returns:
+        int: Current HP
+    """
+    if not rate or updated_at is None or stored_hp >= max_hp:
+        return min(stored_hp, max_hp)
+    return min(max_hp, int(stored_hp + (now - updated_at) * rate))
+
+
+class RegenMixin:
+    """
+    Mixin for typeclasses with `db.hp`/`db.max_hp` that regenerate passively.
+
+    Attributes:
+        hp_updated_at (float): When `db.hp` was last written
+        hp_regen_rate (float): Optional per-object override of regen_rate
+    """
+
+    regen_rate = CHARACTER_REGEN_RATE
+
+    def get_regen_rate(self):
+        """HP per second this object currently regenerates"""
+        if self.db.in_combat or self.db.defeated:
+            return 0
+        rate = self.db.hp_regen_rate
+        return self.regen_rate if rate is None else rate
+
+    def get_hp(self, now=None):
+        """Current HP including regeneration since the last write"""
+        max_hp = self.db.max_hp or 100
+        stored = self.db.hp
+        if stored is None:
+            return max_hp
+        return regen_hp(stored, max_hp, self.get_regen_rate(),
+                        self.db.hp_updated_at, now or time.time())
+
+    def set_hp(self, value, now=None):
+        """
+        Write HP and restart the regeneration clock.
+
+        Returns:
+            int: The HP actually stored (clamped to 0..max_hp)
+        """
+        hp = max(0, min(self.db.max_hp or 100, int(value)))
+        self.attributes.batch_add(
+            ("hp", hp),
+            ("hp_updated_at", now or time.time())
+        )
+        return hp
+
+    def settle_hp(self):
+        """
+        Fold regeneration so far into `db.hp`. Call this before anything
+        that changes the regen rate (entering or leaving combat).
+        """
+        now = time.time()
+        return self.set_hp(self.get_hp(now), now)
+
+    def get_regen_state(self, now=None):
+        """
+        Regen data the web client uses to predict HP between updates.
+
+        Returns:
+            dict: per_second rate and seconds until full health
+        """
+        now = now or time.time()
+        rate = self.get_regen_rate()
+        missing = (self.db.max_hp or 100) - self.get_hp(now)
+        return {
+            "per_second": rate,
+            "full_in": math.ceil(missing / rate) if rate and missing > 0 else 0
+        }
@@ -5,6 +5,76 @@ Extends Evennia's base Room with biblical MUD features
 
 from evennia import DefaultRoom
 from evennia.utils.evtable import EvTable
+from evennia.utils.utils import inherits_from
+
+try:
+    from ..presence import get_presence
+except (ImportError, ValueError):
+    from presence import get_presence
+
+try:
+    from ..greetings import get_greetings
+except (ImportError, ValueError):
+    from greetings import get_greetings
+
+
+# Categories kept in each room's contents index
+CONTENT_CATEGORIES = ("exits", "npcs", "characters", "items", "other")
+
+# room_delta events sent to occupants, per category: (arrival, departure,
+# change in place)
+DELTA_EVENTS = {
+    "characters": ("arrive", "depart", "updated"),
+    "items": ("item_added", "item_removed", "item_updated"),
+}
+
+
+def content_category(obj):
+    """
+    Decide which contents index category an object belongs to.
+
+    Args:
+        obj: Any object that can sit in a room
+
+    Returns:
+        str: One of CONTENT_CATEGORIES
+    """
+    if obj.destination:
+        return "exits"
+    if inherits_from(obj, "typeclasses.npcs.NPC"):
+        return "npcs"
+    if inherits_from(obj, "typeclasses.characters.Character") or obj.has_account:
+        return "characters"
+    if inherits_from(obj, "typeclasses.objects.Item"):
+        return "items"
+    return "other"
+
+
+def character_entry(obj):
+    """
+    Room-state entry for a character (same for every viewer). Deltas are
+    matched on id, the dbref, since keys need not be unique in a room.
+    """
+    character_class = obj.db.character_class or "shepherd"
+    return {
+        "id": obj.id,
+        "key": obj.key,
+        "name": obj.name,
+        "class": character_class,
+        "sprite": f"{character_class}_idle"
+    }
+
+
+def item_entry(obj):
+    """Room-state entry for an item (same for every viewer), matched on id"""
+    return {
+        "id": obj.id,
+        "key": obj.key,
+        "name": obj.name,
+        "type": (obj.get_field("item_type", "misc") if hasattr(obj, "get_field")
+                 else obj.db.item_type or "misc"),
+        "sprite": obj.db.sprite or "item_default"
+    }
 
 
 class Room(DefaultRoom):
@@ -19,21 +89,248 @@ class Room(DefaultRoom):
         lore (str): Background story/lore text
         ambient_sounds (list): Environmental sounds for atmosphere
         is_save_point (bool): Whether this is a save location
+
+    Contents are indexed by category in memory (see get_contents) so that
+    rendering and room-state serialization never re-classify every object.
+    The web client room state is built once and shared by every viewer (see
+    get_state_payload); changes are pushed to everyone already in the room
+    as room_delta messages (see broadcast_delta). The room version counts
+    deltas, so a client that sees a gap knows it missed one.
     """
 
     def at_object_creation(self):
         """Called when room is first created"""
         super().at_object_creation()
 
-        # Set default attributes
-        self.db.floor = 1
-        self.db.room_type = "normal"
-        self.db.danger_level = 0
-        self.db.hint = ""
-        self.db.lore = ""
-        self.db.ambient_sounds = []
-        self.db.is_save_point = False
-        self.db.locked_exits = {}  # Exits that require conditions to unlock
+        # Set default attributes in one batch
+        self.attributes.batch_add(
+            ("floor", 1),
+            ("room_type", "normal"),
+            ("danger_level", 0),
+            ("hint", ""),
+            ("lore", ""),
+            ("ambient_sounds", []),
+            ("is_save_point", False),
+            ("locked_exits", {})  # Exits that require conditions to unlock
+        )
+
+    def get_contents_index(self):
+        """
+        Get the in-memory contents index, building it if needed.
+
+        The index is built from self.contents the first time it is used
+        (and again after a reload, since it lives on ndb), then kept current
+        by at_object_receive/at_object_leave, which create_object and every
+        move with hooks call. Deleted objects are dropped as they are found
+        (see get_contents); call invalidate_contents after moving anything
+        in or out with move_hooks=False.
+
+        Returns:
+            dict: category -> {object id: object}
+        """
+        index = self.ndb.contents_index
+        if index is None:
+            index = {category: {} for category in CONTENT_CATEGORIES}
+            for obj in self.contents:
+                index[content_category(obj)][obj.id] = obj
+            self.ndb.contents_index = index
+            self.invalidate_state()
+        return index
+
+    def invalidate_contents(self):
+        """Drop the contents index so the next read rebuilds it"""
+        self.ndb.contents_index = None
+
+    def get_contents(self, category):
+        """
+        Get the objects of one category in this room.
+
+        Args:
+            category (str): One of CONTENT_CATEGORIES
+
+        Returns:
+            list: Objects currently in that category
+        """
+        bucket = self.get_contents_index()[category]
+        objs = [obj for obj in bucket.values() if obj.pk]
+        if len(objs) != len(bucket):
+            # Deleted objects leave without a leave hook
+            for obj_id in [obj_id for obj_id, obj in bucket.items() if not obj.pk]:
+                del bucket[obj_id]
+        return objs
+
+    def bump_state_version(self):
+        """
+        Advance the room version. Only broadcast_delta calls this, so every
+        version step reaches clients as exactly one delta.
+
+        Returns:
+            int: The new room version
+        """
+        self.ndb.state_version = (self.ndb.state_version or 0) + 1
+        self.invalidate_state()
+        return self.ndb.state_version
+
+    def invalidate_state(self):
+        """
+        Drop the cached room-state payload without changing the version.
+        For changes clients don't track by delta (exits, NPCs, a rebuilt
+        contents index); they see them in the next full state.
+        """
+        self.ndb.state_cache = None
+
+    def get_base_state(self):
+        """
+        Get the viewer-independent room state, rebuilding it only after a
+        change invalidated it. The room's own text (description, floor,
+        flavor) is compared on every call, since @desc and friends write
+        those Attributes without telling the room.
+
+        The returned dict and its lists are shared between viewers and must
+        not be modified.
+
+        Returns:
+            dict: description, floor, exits, objects and characters
+        """
+        # Refresh the index first; a rebuild invalidates the cache
+        self.get_contents_index()
+        version = self.ndb.state_version or 0
+        header = (self.db.description or self.db.desc or "A place of mystery.",
+                  self.db.floor or 1, self.db.flavor or "")
+        cached = self.ndb.state_cache
+        if cached and cached[0] == version and cached[1] == header:
+            return cached[2]
+
+        exits = []
+        for exit_obj in self.get_contents("exits"):
+            direction = getattr(exit_obj.db, "direction", None)
+            if direction:
+                exits.append(direction)
+
+        base = {
+            "id": self.key,
+            "description": header[0],
+            "floor": header[1],
+            "characters": [character_entry(obj) for obj in self.get_contents("characters")],
+            "objects": [item_entry(obj) for obj in self.get_contents("items")],
+            "exits": exits,
+            "flavor": header[2],
+            "version": version
+        }
+        self.ndb.state_cache = (version, header, base)
+        return base
+
+    def get_state_payload(self, viewer):
+        """
+        Get the room state for one viewer: the shared base state plus a
+        small overlay of the fields that actually differ per viewer.
+
+        Args:
+            viewer: The character the state is sent to
+
+        Returns:
+            dict: Room state for the web client
+        """
+        state = dict(self.get_base_state())
+        state["name"] = self.get_display_name(viewer)
+        state["you"] = viewer.key
+        return state
+
+    def get_web_sessions(self, exclude=None):
+        """
+        Get the websocket sessions of everyone in the room.
+
+        Args:
+            exclude (list): Characters to leave out
+
+        Returns:
+            list: Sessions to fan room messages out to
+        """
+        exclude = exclude or []
+        sessions = []
+        for char in self.get_contents("characters"):
+            if char in exclude:
+                continue
+            for session in char.sessions.all():
+                if getattr(session, "protocol_key", "").startswith("websocket"):
+                    sessions.append(session)
+        return sessions
+
+    def broadcast_delta(self, event, entry, exclude=None):
+        """
+        Advance the room version and send the change to every web client
+        in the room. The message is built once and the same dict is handed
+        to each session.
+
+        Args:
+            event (str): One of the DELTA_EVENTS
+            entry (dict): Room-state entry of the object that changed
+            exclude (list): Characters that should not get the delta (they
+                get the full state instead)
+
+        Returns:
+            int: Number of sessions the delta was sent to
+        """
+        version = self.bump_state_version()
+        sessions = self.get_web_sessions(exclude=exclude)
+        if not sessions:
+            return 0
+
+        message = {
+            "type": "room_delta",
+            "room": self.key,
+            "version": version,
+            "event": event,
+            "object": entry
+        }
+        for session in sessions:
+            session.msg(message)
+        return len(sessions)
+
+    def _broadcast(self, obj, which, exclude=None):
+        """Fan out a change to obj if clients show objects of its kind"""
+        category = content_category(obj)
+        if category not in DELTA_EVENTS:
+            return
+        entry = character_entry(obj) if category == "characters" else item_entry(obj)
+        self.broadcast_delta(DELTA_EVENTS[category][which], entry, exclude=exclude)
+
+    def broadcast_move(self, obj, arriving):
+        """Fan out an arrival or departure of obj"""
+        self._broadcast(obj, 0 if arriving else 1, exclude=[obj])
+
+    def broadcast_change(self, obj):
+        """
+        Fan out a change to something in the room that its state entry
+        shows (a character's class, an item's sprite).
+        """
+        self._broadcast(obj, 2)
+
+    def _index_add(self, obj):
+        """Add an arriving object to the contents index if it is built"""
+        self.invalidate_state()
+        index = self.ndb.contents_index
+        if index is not None:
+            index[content_category(obj)][obj.id] = obj
+
+    def _index_remove(self, obj):
+        """Remove a departing object from the contents index if it is built"""
+        self.invalidate_state()
+        index = self.ndb.contents_index
+        if index is not None:
+            for bucket in index.values():
+                bucket.pop(obj.id, None)
+
+    def get_visible_contents(self, looker, **kwargs):
+        """Feed Evennia's default look template from the contents index"""
+        def _visible(objs):
+            return [obj for obj in objs if obj != looker and obj.access(looker, "view")]
+
+        return {
+            "exits": _visible(self.get_contents("exits")),
+            "characters": _visible(self.get_contents("characters") + self.get_contents("npcs")),
+            "things": _visible(self.get_contents("items") + self.get_contents("other")),
+        }
 
     def return_appearance(self, looker, **kwargs):
         """
@@ -68,22 +365,22 @@ class Room(DefaultRoom):
             string += f"\n|c(You hear: {sounds})|n"
 
         # Show items in room
-        items = [obj for obj in self.contents if obj.typename == "Item" and obj != looker]
+        items = [obj for obj in self.get_contents("items") if obj != looker]
         if items:
             string += "\n\n|wItems here:|n"
             for item in items:
                 string += f"\n  - {item.name}"
 
         # Show NPCs in room
-        npcs = [obj for obj in self.contents if obj.typename == "NPC"]
+        npcs = self.get_contents("npcs")
         if npcs:
             string += "\n\n|wPeople here:|n"
             for npc in npcs:
                 string += f"\n  - {npc.name}"
 
         # Show other characters
-        characters = [obj for obj in self.contents
-                     if obj.has_account and obj != looker]
+        characters = [obj for obj in self.get_contents("characters")
+                      if obj.has_account and obj != looker]
         if characters:
             string += "\n\n|wOther pilgrims:|n"
             for char in characters:
@@ -96,13 +393,31 @@ class Room(DefaultRoom):
         Called when an object enters this room.
         """
         super().at_object_receive(moved_obj, source_location, **kwargs)
-
-        # If it's a character entering, show ambient message
+        self._index_add(moved_obj)
+        # Items still being created announce themselves once their
+        # Attributes are set (Item.at_object_post_creation)
+        if not (hasattr(moved_obj, "_createdict") and content_category(moved_obj) == "items"):
+            self.broadcast_move(moved_obj, arriving=True)
+
+        # If it's a character entering, show ambient message and the
+        # greetings of the NPCs here, all in one message
         if moved_obj.has_account:
+            lines = []
             if self.db.room_type == "safe":
-                moved_obj.msg("|gA feeling of peace washes over you as you enter the sanctuary.|n")
+                lines.append("|gA feeling of peace washes over you as you enter the sanctuary.|n")
             elif self.db.danger_level >= 7:
-                moved_obj.msg("|rYou sense great danger ahead. Prepare yourself.|n")
+                lines.append("|rYou sense great danger ahead. Prepare yourself.|n")
+            lines += get_greetings().greetings(self, moved_obj)
+            if lines:
+                moved_obj.msg("\n".join(lines))
+
+    def at_object_leave(self, moved_obj, target_location, **kwargs):
+        """
+        Called when an object leaves this room.
+        """
+        super().at_object_leave(moved_obj, target_location, **kwargs)
+        self._index_remove(moved_obj)
+        self.broadcast_move(moved_obj, arriving=False)
 
     def get_lore(self):
         """Return the lore text for this room"""
@@ -127,11 +442,12 @@ class SafeRoom(Room):
         """Heal characters who enter"""
         super().at_object_receive(moved_obj, source_location, **kwargs)
 
-        if moved_obj.has_account and hasattr(moved_obj.db, 'hp'):
+        if moved_obj.has_account and hasattr(moved_obj, 'set_hp'):
             # Restore some health when entering
-            if moved_obj.db.hp < moved_obj.db.max_hp:
-                heal_amount = min(10, moved_obj.db.max_hp - moved_obj.db.hp)
-                moved_obj.db.hp += heal_amount
+            hp = moved_obj.get_hp()
+            if hp < moved_obj.db.max_hp:
+                heal_amount = min(10, moved_obj.db.max_hp - hp)
+                moved_obj.set_hp(hp + heal_amount)
                 moved_obj.msg(f"|gThe sanctuary's divine presence restores {heal_amount} health.|n")
 
 
@@ -154,9 +470,10 @@ class BossRoom(Room):
 
         # Unlock the progression exit
         if self.db.locked_exit_direction and self.db.locked_exit_destination:
-            # Announce to everyone in room
-            self.msg_contents(
-                "|y✧ The path forward is now open! ✧|n"
+            # Announce to everyone on the floor
+            get_presence().announce_floor(
+                self.db.floor,
+                f"|y✧ The path forward from {self.key} is now open! ✧|n"
             )
 
     def return_appearance(self, looker, **kwargs):
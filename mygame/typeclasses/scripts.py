@@ -12,8 +12,21 @@ just overloads its hooks to have it perform its function.
 
 """
 
+import random
+
 from evennia.scripts.scripts import DefaultScript
 
+try:
+    from ..presence import get_presence
+except (ImportError, ValueError):
+    from presence import get_presence
+
+
+# Seconds between ambient ticks on each floor
+AMBIENT_INTERVAL = 60
+# Chance an occupied room gets an ambient line on a given tick
+AMBIENT_CHANCE = 0.5
+
 
 class Script(DefaultScript):
     """
@@ -101,3 +114,64 @@ class Script(DefaultScript):
     """
 
     pass
+
+
+class AmbientScript(Script):
+    """
+    Sends ambient sounds to occupied rooms on one floor.
+
+    One of these runs per floor. Each tick it asks the presence index
+    which rooms have online characters in them, so rooms nobody is
+    standing in are never touched. Each occupied room gets at most one
+    line per tick, rendered once and sent to every occupant.
+
+    Attributes:
+        floor (int): Floor this script covers
+    """
+
+    def at_script_creation(self):
+        """Set up the repeating timer"""
+        self.desc = "Ambient room sounds for one floor"
+        self.interval = AMBIENT_INTERVAL
+        self.persistent = True
+        self.start_delay = True
+
+    def at_repeat(self):
+        """Pick a sound for each occupied room and send it to its occupants"""
+        batch = []
+        for room, occupants in get_presence().occupied_rooms(self.db.floor).items():
+            if not occupants or random.random() >= AMBIENT_CHANCE:
+                continue
+            sounds = [sound for sound in room.db.ambient_sounds or [] if sound != "silence"]
+            if sounds:
+                batch.append((f"|x... {random.choice(sounds)} ...|n", list(occupants.values())))
+
+        for text, occupants in batch:
+            for character in occupants:
+                character.msg(text)
+
+
+def ensure_ambient_scripts(floors):
+    """
+    Make sure every floor has its ambient script running.
+
+    Args:
+        floors (iterable): Floor numbers
+
+    Returns:
+        list: The ambient scripts, one per floor
+    """
+    from evennia import create_script, search_script
+
+    scripts = []
+    for floor in floors:
+        key = f"ambient_floor_{floor}"
+        found = search_script(key)
+        if found:
+            script = found[0]
+        else:
+            script = create_script(AmbientScript, key=key, autostart=False)
+            script.db.floor = floor
+            script.start()
+        scripts.append(script)
+    return scripts
@@ -46,9 +46,9 @@ class WebSocketHandler:
             inventory.append({
                 "id": item.key,
                 "name": item.get_display_name(character),
-                "type": getattr(item.db, "item_type", "misc"),
+                "type": item.get_field("item_type", "misc"),
                 "equipped": is_equipped,
-                "description": item.db.description or ""
+                "description": item.get_field("desc") or ""
             })
 
         # Get stats based on class
@@ -67,15 +67,16 @@ class WebSocketHandler:
                 "righteousness": character.db.righteousness or 5
             },
             "health": {
-                "current": character.db.hp or 100,
-                "max": character.db.max_hp or 100
+                "current": character.get_hp(),
+                "max": character.db.max_hp or 100,
+                "regen": character.get_regen_state()
             },
             "xp": {
                 "current": character.db.xp or 0,
                 "next_level": character.db.xp_to_next_level or 100
             },
             "inventory": inventory,
-            "currency": character.db.currency or 0,
+            "currency": character.get_currency(),
             "position": {
                 "floor": character.db.current_floor or 1,
                 "room": character.location.key if character.location else "unknown"
@@ -86,6 +87,7 @@ class WebSocketHandler:
     def get_room_state(character, room):
         """
         Get complete room state for sending to client.
+        The viewer-independent part is cached on the room.
 
         Args:
             character: The character object
@@ -97,46 +99,7 @@ class WebSocketHandler:
         if not room:
             return None
 
-        # Get characters in room
-        characters = []
-        for obj in room.contents:
-            if inherits_from(obj, "typeclasses.characters.Character"):
-                characters.append({
-                    "id": obj.key,
-                    "name": obj.get_display_name(character),
-                    "class": obj.db.character_class or "shepherd",
-                    "sprite": f"{obj.db.character_class or 'shepherd'}_idle"
-                })
-
-        # Get items in room
-        objects = []
-        for obj in room.contents:
-            if inherits_from(obj, "typeclasses.objects.Item"):
-                objects.append({
-                    "id": obj.key,
-                    "name": obj.get_display_name(character),
-                    "type": getattr(obj.db, "item_type", "misc"),
-                    "sprite": getattr(obj.db, "sprite", "item_default")
-                })
-
-        # Get exits
-        exits = []
-        for exit_obj in room.exits:
-            if exit_obj:
-                direction = getattr(exit_obj.db, "direction", None)
-                if direction:
-                    exits.append(direction)
-
-        return {
-            "id": room.key,
-            "name": room.get_display_name(character),
-            "description": room.db.description or room.db.desc or "A place of mystery.",
-            "floor": room.db.floor or 1,
-            "characters": characters,
-            "objects": objects,
-            "exits": exits,
-            "flavor": getattr(room.db, "flavor", "")
-        }
+        return room.get_state_payload(character)
 
     @staticmethod
     def handle_command(character, command_text):
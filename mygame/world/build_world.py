@@ -3,284 +3,673 @@ World Builder Script for Journey Through Scripture
 Populates the Palace of Light from world_data, items, and npcs modules
 """
 
+import hashlib
+import json
+from contextlib import contextmanager
+from time import perf_counter
+
+from django.db import transaction
+from django.db.models import Count
 from evennia import create_object, search_object
+from evennia.objects.models import ObjectDB
+from evennia.server.models import ServerConfig
 from evennia.utils import logger
+from evennia.utils.dbserialize import from_pickle, to_pickle
 from typeclasses.rooms import Room, SafeRoom, BossRoom, HiddenRoom
-from typeclasses.objects import Item, Weapon, Consumable, QuestItem, Key
+from typeclasses.objects import Item, item_class_for
 from typeclasses.npcs import NPC, Priest, Merchant, Boss, HostileNPC
 from world.world_data import ALL_ROOMS, get_room
 from world.items import ITEMS, get_item
 from world.npcs import NPCS, get_npc
+from world.content_index import get_content_index, rebuild_content_index
+from world.snapshot import compile_snapshot
+from world.world_graph import rebuild_world_graph
 
 
 def build_all():
     """
     Master build function - builds entire world.
     Call this from in-game with: @py world.build_world.build_all()
+
+    Each phase runs in its own transaction and creates every object
+    with its aliases, locks and Attributes in a single create_object
+    call, so a full build is a handful of commits rather than one per
+    attribute.
     """
     logger.log_info("=== BUILDING PALACE OF LIGHT ===")
+    timings = {}
+
+    # Refuse to build from broken content (raises SnapshotError)
+    snapshot = compile_snapshot()
+    rebuild_content_index()
+    logger.log_info(f"Content version {snapshot['version'][:12]}")
+    generation = next_generation()
+    logger.log_info(f"Build generation {generation}")
 
     # Build in order
-    rooms = build_rooms()
+    with build_phase("rooms", timings):
+        rooms = build_rooms(generation)
     logger.log_info(f"Created {len(rooms)} rooms")
 
-    connect_exits(rooms)
-    logger.log_info("Connected all exits")
+    with build_phase("exits", timings):
+        exits = connect_exits(rooms, generation)
+    logger.log_info(f"Connected {len(exits)} exits")
 
-    items = build_items(rooms)
+    rebuild_world_graph()
+    logger.log_info("Compiled world graph")
+
+    with build_phase("items", timings):
+        items = build_items(rooms, generation)
     logger.log_info(f"Created {len(items)} items")
 
-    npcs = build_npcs(rooms)
+    with build_phase("npcs", timings):
+        npcs = build_npcs(rooms, generation)
     logger.log_info(f"Created {len(npcs)} NPCs")
 
     logger.log_info("=== WORLD BUILD COMPLETE ===")
+    logger.log_info("  " + ", ".join(f"{phase} {secs:.2f}s" for phase, secs in timings.items()))
     logger.log_info(f"The Palace of Light awaits pilgrims!")
 
     return rooms, items, npcs
 
 
-def build_rooms():
+@contextmanager
+def build_phase(name, timings):
     """
-    Create all rooms from world_data.
+    Run one build phase in a single transaction and time it.
+
+    Args:
+        name (str): Phase name for the timing report
+        timings (dict): Phase name -> seconds, filled in on exit
+    """
+    start = perf_counter()
+    with transaction.atomic():
+        yield
+    timings[name] = perf_counter() - start
+
+
+# Field mapping - definition dicts to typeclasses and Attribute lists
+
+def room_typeclass(room_data):
+    """Get the room typeclass for a room definition"""
+    room_type = room_data.get('room_type', 'normal')
+    if room_type == 'safe':
+        return SafeRoom
+    elif room_type == 'boss':
+        return BossRoom
+    elif room_type == 'hidden':
+        return HiddenRoom
+    return Room
+
+
+def room_attributes(room_id, room_data):
+    """
+    Map a room definition to Attributes.
 
     Returns:
-        dict: Mapping of room IDs to room objects
+        list: (key, value) tuples for create_object
     """
-    logger.log_info("Building rooms...")
-    room_objects = {}
+    attributes = [
+        ("room_id", room_id),
+        ("desc", room_data.get('desc', '')),
+        ("floor", room_data.get('floor', 1)),
+        ("room_type", room_data.get('room_type', 'normal')),
+        ("danger_level", room_data.get('danger_level', 0)),
+        ("hint", room_data.get('hint', '')),
+        ("lore", room_data.get('lore', '')),
+        ("ambient_sounds", room_data.get('ambient_sounds', [])),
+        ("is_save_point", room_data.get('is_save_point', False)),
+    ]
+
+    # Boss room specific
+    if room_data.get('room_type') == 'boss' and 'locked_exit' in room_data:
+        locked = room_data['locked_exit']
+        attributes.append(("locked_exit_direction", locked.get('direction')))
+        attributes.append(("locked_exit_destination", locked.get('unlocks_to')))
+
+    return attributes
+
+
+def exit_options(room_data, exit_name):
+    """
+    Map one exit of a room definition to create_object locks and Attributes.
+
+    Returns:
+        tuple: (locks string or None, list of (key, value) tuples)
+    """
+    locked = room_data.get('locked_exit', {})
+    if room_data.get('room_type') == 'boss' and locked.get('direction') == exit_name:
+        return "traverse:false()", [
+            ("locked", True),
+            ("lock_msg", "The way is blocked by a powerful presence."),
+        ]
+    return None, []
 
-    for room_id, room_data in ALL_ROOMS.items():
-        # Determine room typeclass
-        room_type = room_data.get('room_type', 'normal')
-
-        if room_type == 'safe':
-            typeclass = SafeRoom
-        elif room_type == 'boss':
-            typeclass = BossRoom
-        elif room_type == 'hidden':
-            typeclass = HiddenRoom
-        else:
-            typeclass = Room
-
-        # Create the room
-        room = create_object(
-            typeclass,
-            key=room_data['key'],
-            aliases=[room_id]
-        )
 
-        # Set room attributes
-        room.db.desc = room_data.get('desc', '')
-        room.db.floor = room_data.get('floor', 1)
-        room.db.room_type = room_type
-        room.db.danger_level = room_data.get('danger_level', 0)
-        room.db.hint = room_data.get('hint', '')
-        room.db.lore = room_data.get('lore', '')
-        room.db.ambient_sounds = room_data.get('ambient_sounds', [])
-        room.db.is_save_point = room_data.get('is_save_point', False)
+def item_typeclass(item_data):
+    """Get the item typeclass for an item definition"""
+    return item_class_for(item_data.get('item_type', 'material'))
 
-        # Boss room specific
-        if room_type == 'boss' and 'locked_exit' in room_data:
-            locked = room_data['locked_exit']
-            room.db.locked_exit_direction = locked.get('direction')
-            room.db.locked_exit_destination = locked.get('unlocks_to')
 
-        room_objects[room_id] = room
+def item_attributes(item_id, item_data):
+    """
+    Map an item definition to Attributes. Items are flyweights, so only
+    the item ID is stored; every static field is read from ITEMS.
+
+    Returns:
+        list: (key, value) tuples for create_object
+    """
+    return [("item_id", item_id)]
 
-        logger.log_info(f"  Created: {room_data['key']} ({room_id})")
 
-    return room_objects
+def npc_typeclass(npc_data):
+    """Get the NPC typeclass for an NPC definition"""
+    npc_type = npc_data.get('npc_type', 'friendly')
+    if npc_type == 'priest':
+        return Priest
+    elif npc_type == 'merchant' or npc_data.get('merchant'):
+        return Merchant
+    elif npc_type == 'boss':
+        return Boss
+    elif npc_type == 'hostile':
+        return HostileNPC
+    return NPC
 
 
-def connect_exits(room_objects):
+def npc_attributes(npc_id, npc_data):
     """
-    Connect all room exits.
+    Map an NPC definition to Attributes.
+
+    Returns:
+        list: (key, value) tuples for create_object
+    """
+    npc_type = npc_data.get('npc_type', 'friendly')
+    attributes = [
+        ("desc", npc_data.get('desc', '')),
+        ("npc_type", npc_type),
+        ("dialogue_id", npc_id if npc_data.get('dialogue') else None),
+        ("quest", npc_data.get('quest', None)),
+        ("merchant", npc_data.get('merchant', False)),
+        ("shop_inventory", npc_data.get('shop_inventory', [])),
+        ("shop_prices", npc_data.get('shop_prices', 'fair')),
+        ("services", npc_data.get('services', [])),
+        ("can_become_hostile", npc_data.get('can_become_hostile', False)),
+        ("behaviours", npc_data.get('behaviours', [])),
+        ("patrol_range", npc_data.get('patrol_range', 1)),
+    ]
+
+    # Boss specific
+    if npc_type == 'boss' and 'boss_stats' in npc_data:
+        stats = npc_data['boss_stats']
+        attributes += [
+            ("hp", stats.get('hp', 100)),
+            ("max_hp", stats.get('hp', 100)),
+            ("damage", stats.get('damage', 15)),
+            ("defense", stats.get('defense', 5)),
+            ("defeat_unlocks", npc_data.get('defeat_unlocks', '')),
+            ("defeat_reward", npc_data.get('defeat_reward', [])),
+        ]
+
+    return attributes
+
+
+# Object specs - everything needed to create or sync one world object
+
+# Tag categories marking built objects; the tag key is the object's world ID
+ROOM_CATEGORY = "world_room"
+EXIT_CATEGORY = "world_exit"
+ITEM_CATEGORY = "world_item"
+NPC_CATEGORY = "world_npc"
+
+# Tag category recording which build or sync created an object; the
+# tag key is the generation number
+BUILD_CATEGORY = "world_build"
+
+# ServerConfig key holding what a sync generation changed or removed on
+# older objects, so rollback can put it back
+UNDO_KEY = "world_build_undo:{}"
+
+# Tag categories a sync may take off an object
+MANAGED_CATEGORIES = (ROOM_CATEGORY, EXIT_CATEGORY, ITEM_CATEGORY, NPC_CATEGORY, BUILD_CATEGORY)
+
+EXIT_TYPECLASS = "evennia.objects.objects.DefaultExit"
+
+# Attributes the builders only write for some definitions. Objects record
+# the keys their spec wrote in db.spec_keys; for objects built before that
+# these are the keys a sync may have to remove.
+CONDITIONAL_ATTRIBUTES = {
+    ROOM_CATEGORY: ("locked_exit_direction", "locked_exit_destination"),
+    EXIT_CATEGORY: ("locked", "lock_msg"),
+    NPC_CATEGORY: ("defeat_unlocks", "defeat_reward"),
+}
+
+
+def content_hash(spec):
+    """
+    Hash the parts of a spec that end up on the live object.
 
     Args:
-        room_objects (dict): Mapping of room IDs to room objects
+        spec (dict): Object spec from one of the *_specs() generators
+
+    Returns:
+        str: Hex digest, stored on the object as db.content_hash
     """
-    logger.log_info("Connecting exits...")
+    payload = json.dumps(
+        [spec['key'], spec['typeclass'], spec['locks'], spec['location'],
+         spec['destination'], sorted(spec['attributes'])],
+        sort_keys=True, default=str
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def make_spec(tag, category, typeclass, key, attributes, location=None,
+              destination=None, aliases=None, locks=None):
+    """
+    Build an object spec.
 
+    Args:
+        tag (str): World ID, used as the tag key
+        category (str): Tag category (ROOM_CATEGORY etc.)
+        typeclass: Typeclass or typeclass path
+        key (str): Object key
+        attributes (list): (key, value) tuples
+        location (str): Room ID to place the object in
+        destination (str): Room ID an exit leads to
+        aliases (list): Object aliases
+        locks (str): Lock string
+
+    Returns:
+        dict: The spec, including its content hash
+    """
+    if not isinstance(typeclass, str):
+        typeclass = f"{typeclass.__module__}.{typeclass.__name__}"
+    spec = {
+        'tag': tag,
+        'category': category,
+        'typeclass': typeclass,
+        'key': key,
+        'attributes': attributes,
+        'location': location,
+        'destination': destination,
+        'aliases': aliases or [],
+        'locks': locks,
+    }
+    spec['hash'] = content_hash(spec)
+    return spec
+
+
+def room_specs():
+    """Yield a spec for every room in world_data"""
     for room_id, room_data in ALL_ROOMS.items():
-        room = room_objects.get(room_id)
-        if not room:
-            continue
+        yield make_spec(
+            room_id, ROOM_CATEGORY, room_typeclass(room_data), room_data['key'],
+            room_attributes(room_id, room_data), aliases=[room_id]
+        )
 
-        exits = room_data.get('exits', {})
 
-        for exit_name, destination_id in exits.items():
+def exit_specs():
+    """Yield a spec for every exit between rooms in world_data"""
+    for room_id, room_data in ALL_ROOMS.items():
+        for exit_name, destination_id in room_data.get('exits', {}).items():
             # Skip special exits that aren't actual rooms
             if destination_id.startswith('['):
                 continue
 
-            destination = room_objects.get(destination_id)
-            if not destination:
+            if destination_id not in ALL_ROOMS:
                 logger.log_warn(f"  Exit '{exit_name}' in {room_id} points to non-existent room: {destination_id}")
                 continue
 
-            # Create the exit
-            exit_obj = create_object(
-                "evennia.objects.objects.DefaultExit",
-                key=exit_name,
-                location=room,
-                destination=destination
+            # Locked if it is the boss room's way forward
+            locks, attributes = exit_options(room_data, exit_name)
+            yield make_spec(
+                f"{room_id}:{exit_name}", EXIT_CATEGORY, EXIT_TYPECLASS, exit_name,
+                attributes, location=room_id, destination=destination_id, locks=locks
             )
 
-            # Check if this is a locked exit (boss room)
-            if hasattr(room.db, 'locked_exit_direction') and \
-               room.db.locked_exit_direction and \
-               exit_name == room.db.locked_exit_direction:
-                # Lock the exit
-                exit_obj.locks.add("traverse:false()")
-                exit_obj.db.locked = True
-                exit_obj.db.lock_msg = "The way is blocked by a powerful presence."
 
-    logger.log_info("  All exits connected")
+def item_specs():
+    """
+    Yield a spec for every item placed in a room in world_data.
+
+    The same item listed twice in a room gets two specs, numbered by
+    occurrence so each keeps a stable world ID.
+    """
+    index = get_content_index()
+    for room_id in ALL_ROOMS:
+        seen = {}
+        for item_id in index.items_in_room(room_id):
+            item_data = index.item(item_id)
+            if not item_data:
+                logger.log_warn(f"  Item {item_id} not found in items database")
+                continue
+
+            seen[item_id] = seen.get(item_id, 0) + 1
+            yield make_spec(
+                f"{room_id}:{item_id}:{seen[item_id]}", ITEM_CATEGORY,
+                item_typeclass(item_data), item_data['key'],
+                item_attributes(item_id, item_data), location=room_id, aliases=[item_id]
+            )
 
 
-def build_items(room_objects):
+def npc_specs():
+    """Yield a spec for every NPC in npcs"""
+    for npc_id, npc_data in NPCS.items():
+        room_id = npc_data.get('room')
+        if room_id not in ALL_ROOMS:
+            logger.log_warn(f"  NPC {npc_id} has invalid room: {room_id}")
+            continue
+
+        yield make_spec(
+            npc_id, NPC_CATEGORY, npc_typeclass(npc_data), npc_data['key'],
+            npc_attributes(npc_id, npc_data), location=room_id, aliases=[npc_id]
+        )
+
+
+def spawn(spec, room_objects, generation):
     """
-    Create all items and place them in rooms.
+    Create the object for a spec, tagged and hashed for later syncs.
 
     Args:
+        spec (dict): Object spec
         room_objects (dict): Mapping of room IDs to room objects
+        generation (int): Build generation creating the object
 
     Returns:
-        list: All created item objects
+        The new object
     """
-    logger.log_info("Building items...")
-    item_objects = []
+    return create_object(
+        spec['typeclass'],
+        key=spec['key'],
+        location=room_objects.get(spec['location']),
+        destination=room_objects.get(spec['destination']),
+        aliases=spec['aliases'],
+        locks=spec['locks'],
+        attributes=spec['attributes'] + [("content_hash", spec['hash']),
+                                         ("spec_keys", [key for key, _ in spec['attributes']])],
+        tags=[(spec['tag'], spec['category']), (str(generation), BUILD_CATEGORY)]
+    )
+
+
+def capture_state(obj):
+    """
+    Record everything a sync may change on an object, before it does.
 
-    # Track which items to create in which rooms
-    for room_id, room_data in ALL_ROOMS.items():
-        room = room_objects.get(room_id)
-        if not room:
-            continue
+    Args:
+        obj: Live built object
 
-        item_ids = room_data.get('items', [])
+    Returns:
+        dict: State for restore_state
+    """
+    return {
+        "id": obj.id,
+        "typeclass": obj.typeclass_path,
+        "key": obj.key,
+        "location": obj.db_location_id,
+        "destination": obj.db_destination_id,
+        "locks": str(obj.locks),
+        "aliases": list(obj.aliases.all()),
+        "tags": [tuple(tag) for tag in obj.tags.all(return_key_and_category=True)],
+        "attributes": [(attr.key, to_pickle(attr.value)) for attr in obj.attributes.all()],
+    }
+
+
+def restore_state(state, objects):
+    """
+    Put an object back the way capture_state found it, recreating it if
+    it has since been deleted. Items stay where players left them.
 
-        for item_id in item_ids:
-            item_data = ITEMS.get(item_id)
-            if not item_data:
-                logger.log_warn(f"  Item {item_id} not found in items database")
-                continue
+    Args:
+        state (dict): From capture_state
+        objects (dict): Object ID -> live object for everything the
+            states refer to; recreated objects are added under their old ID
 
-            # Determine item typeclass
-            item_type = item_data.get('item_type', 'material')
-
-            if item_type == 'weapon':
-                typeclass = Weapon
-            elif item_type == 'consumable':
-                typeclass = Consumable
-            elif item_type == 'quest':
-                typeclass = QuestItem
-            elif item_type == 'key':
-                typeclass = Key
-            else:
-                typeclass = Item
-
-            # Create the item
-            item = create_object(
-                typeclass,
-                key=item_data['key'],
-                location=room,
-                aliases=[item_id]
-            )
+    Returns:
+        The restored object
+    """
+    location = objects.get(state["location"])
+    destination = objects.get(state["destination"])
+    attributes = [(key, from_pickle(value)) for key, value in state["attributes"]]
+
+    obj = objects.get(state["id"])
+    if obj is None:
+        obj = create_object(
+            state["typeclass"],
+            key=state["key"],
+            location=location,
+            destination=destination,
+            aliases=state["aliases"],
+            locks=state["locks"],
+            attributes=attributes,
+            tags=state["tags"]
+        )
+        objects[state["id"]] = obj
+        return obj
+
+    if obj.typeclass_path != state["typeclass"]:
+        obj.swap_typeclass(state["typeclass"], clean_attributes=False, run_start_hooks=None)
+    obj.key = state["key"]
+    if destination:
+        obj.destination = destination
+    obj.locks.replace(state["locks"])
+    if obj.tags.get(category=NPC_CATEGORY) and location and obj.location != location:
+        obj.move_to(location, quiet=True, move_type="teleport")
+
+    saved = {key for key, _ in attributes}
+    for attr in obj.attributes.all():
+        if attr.key not in saved:
+            obj.attributes.remove(attr.key)
+    obj.attributes.batch_add(*attributes)
+
+    for category in MANAGED_CATEGORIES:
+        obj.tags.remove(category=category)
+    obj.tags.batch_add(*[tag for tag in state["tags"] if tag[1] in MANAGED_CATEGORIES])
+    if hasattr(obj, 'invalidate_state'):
+        obj.invalidate_state()
+    return obj
+
+
+def restore_generation(generation, recreated=None, dry_run=False):
+    """
+    Undo what one sync changed or removed on objects it didn't create.
+
+    Exits Evennia deleted along with a removed room were never seen by
+    the sync; the next sync against the reverted definitions recreates them.
+
+    Args:
+        generation (int): Sync generation to undo
+        recreated (dict): Old object ID -> object recreated by restoring a
+            newer generation; updated with what this one recreates
+        dry_run (bool): Only count what would be restored
+
+    Returns:
+        int: Number of objects restored (or to restore)
+    """
+    states = ServerConfig.objects.conf(UNDO_KEY.format(generation), default=None) or []
+    if dry_run or not states:
+        return len(states)
+
+    objects = {pk: obj for pk, obj in (recreated or {}).items() if obj.pk}
+    ids = {ref for state in states
+           for ref in (state["id"], state["location"], state["destination"])
+           if ref and ref not in objects}
+    live = ObjectDB.objects.in_bulk(list(ids))
+    objects.update(live)
+    # States are in sync order, so recreated rooms exist before their contents
+    with transaction.atomic():
+        for state in states:
+            restore_state(state, objects)
+        ServerConfig.objects.conf(UNDO_KEY.format(generation), delete=True)
+    if recreated is not None:
+        recreated.update({pk: obj for pk, obj in objects.items() if pk not in live})
+    return len(states)
+
+
+def build_rooms(generation):
+    """
+    Create all rooms from world_data.
+
+    Args:
+        generation (int): Build generation
+
+    Returns:
+        dict: Mapping of room IDs to room objects
+    """
+    logger.log_info("Building rooms...")
+    return {spec['tag']: spawn(spec, {}, generation) for spec in room_specs()}
 
-            # Set item attributes
-            item.db.desc = item_data.get('desc', '')
-            item.db.item_type = item_type
-            item.db.value = item_data.get('value', 0)
-            item.db.weight = item_data.get('weight', 1.0)
-            item.db.stats = item_data.get('stats', {})
-            item.db.healing = item_data.get('healing', 0)
-            item.db.uses = item_data.get('uses', 1)
-            item.db.usable_by = item_data.get('usable_by', ['all'])
-            item.db.readable = item_data.get('readable', False)
-            item.db.text = item_data.get('text', '')
-            item.db.cursed = item_data.get('cursed', False)
-            item.db.effect = item_data.get('effect', None)
 
-            # Key specific
-            if item_type == 'key':
-                item.db.unlocks = item_data.get('unlocks', '')
+def connect_exits(room_objects, generation):
+    """
+    Connect all room exits.
 
-            item_objects.append(item)
+    Args:
+        room_objects (dict): Mapping of room IDs to room objects
+        generation (int): Build generation
 
-    logger.log_info(f"  Created {len(item_objects)} items")
-    return item_objects
+    Returns:
+        list: All created exit objects
+    """
+    logger.log_info("Connecting exits...")
+    return [spawn(spec, room_objects, generation) for spec in exit_specs()
+            if spec['location'] in room_objects]
 
 
-def build_npcs(room_objects):
+def build_items(room_objects, generation):
+    """
+    Create all items and place them in rooms.
+
+    Args:
+        room_objects (dict): Mapping of room IDs to room objects
+        generation (int): Build generation
+
+    Returns:
+        list: All created item objects
+    """
+    logger.log_info("Building items...")
+    return [spawn(spec, room_objects, generation) for spec in item_specs()
+            if spec['location'] in room_objects]
+
+
+def build_npcs(room_objects, generation):
     """
     Create all NPCs and place them in rooms.
 
     Args:
         room_objects (dict): Mapping of room IDs to room objects
+        generation (int): Build generation
 
     Returns:
         list: All created NPC objects
     """
     logger.log_info("Building NPCs...")
-    npc_objects = []
+    return [spawn(spec, room_objects, generation) for spec in npc_specs()
+            if spec['location'] in room_objects]
 
-    for npc_id, npc_data in NPCS.items():
-        room_id = npc_data.get('room')
-        room = room_objects.get(room_id)
 
-        if not room:
-            logger.log_warn(f"  NPC {npc_id} has invalid room: {room_id}")
-            continue
+def next_generation():
+    """
+    Start a new build generation.
 
-        # Determine NPC typeclass
-        npc_type = npc_data.get('npc_type', 'friendly')
-
-        if npc_type == 'priest':
-            typeclass = Priest
-        elif npc_type == 'merchant' or npc_data.get('merchant'):
-            typeclass = Merchant
-        elif npc_type == 'boss':
-            typeclass = Boss
-        elif npc_type == 'hostile':
-            typeclass = HostileNPC
-        else:
-            typeclass = NPC
-
-        # Create the NPC
-        npc = create_object(
-            typeclass,
-            key=npc_data['key'],
-            location=room,
-            aliases=[npc_id]
-        )
+    Returns:
+        int: The new generation number
+    """
+    generation = (ServerConfig.objects.conf("world_build_generation", default=0) or 0) + 1
+    ServerConfig.objects.conf("world_build_generation", value=generation)
+    return generation
 
-        # Set NPC attributes
-        npc.db.desc = npc_data.get('desc', '')
-        npc.db.npc_type = npc_type
-        npc.db.dialogue = npc_data.get('dialogue', {})
-        npc.db.quest = npc_data.get('quest', None)
-        npc.db.merchant = npc_data.get('merchant', False)
-        npc.db.shop_inventory = npc_data.get('shop_inventory', [])
-        npc.db.shop_prices = npc_data.get('shop_prices', 'fair')
-        npc.db.services = npc_data.get('services', [])
-        npc.db.can_become_hostile = npc_data.get('can_become_hostile', False)
 
-        # Boss specific
-        if npc_type == 'boss' and 'boss_stats' in npc_data:
-            stats = npc_data['boss_stats']
-            npc.db.hp = stats.get('hp', 100)
-            npc.db.max_hp = stats.get('hp', 100)
-            npc.db.damage = stats.get('damage', 15)
-            npc.db.defense = stats.get('defense', 5)
-            npc.db.defeat_unlocks = npc_data.get('defeat_unlocks', '')
-            npc.db.defeat_reward = npc_data.get('defeat_reward', [])
+def built_objects(generations=None):
+    """
+    Query built objects by build generation tag.
 
-        npc_objects.append(npc)
+    Args:
+        generations (list): Generation numbers to include, or None for all
 
-        logger.log_info(f"  Created: {npc_data['key']} in {room.key}")
+    Returns:
+        QuerySet: Matching objects
+    """
+    if generations is None:
+        return ObjectDB.objects.filter(db_tags__db_category=BUILD_CATEGORY)
+    # One filter() call, so both conditions apply to the same tag
+    return ObjectDB.objects.filter(db_tags__db_category=BUILD_CATEGORY,
+                                   db_tags__db_key__in=[str(gen) for gen in generations])
 
-    logger.log_info(f"  Created {len(npc_objects)} NPCs")
-    return npc_objects
+
+def generation_counts():
+    """
+    Count built objects per generation.
+
+    Returns:
+        dict: generation -> number of objects
+    """
+    rows = built_objects().values_list('db_tags__db_key').annotate(count=Count('id'))
+    return {int(generation): count for generation, count in rows}
+
+
+def teardown(generations=None, dry_run=False):
+    """
+    Delete built objects found with one tag query, inside a single
+    transaction. Objects are deleted one at a time rather than with a
+    queryset delete, so Evennia's delete hooks still run.
+
+    Contents go before rooms, so nothing is shuffled home out of a room
+    that is about to be deleted anyway. Tearing down every build also
+    drops the sync undo records, which would refer to the old world.
+
+    Args:
+        generations (list): Generations to delete, or None for every build
+        dry_run (bool): Only count what would be deleted
+
+    Returns:
+        dict: generation -> number of objects deleted (or to delete)
+    """
+    counts = generation_counts()
+    if generations is not None:
+        counts = {gen: count for gen, count in counts.items() if gen in generations}
+    if dry_run or not counts:
+        return counts
+
+    objects = sorted(built_objects(list(counts)), key=lambda obj: obj.db_location_id is None)
+    with transaction.atomic():
+        for obj in objects:
+            obj.delete()
+        if generations is None:
+            current = ServerConfig.objects.conf("world_build_generation", default=0) or 0
+            for gen in range(1, current + 1):
+                ServerConfig.objects.conf(UNDO_KEY.format(gen), delete=True)
+
+    logger.log_info(f"  Deleted {len(objects)} objects from generations {sorted(counts)}")
+    return counts
+
+
+def rollback(generation, dry_run=False):
+    """
+    Return the world to how it stood after a generation.
+
+    Newer generations are undone newest first: the objects each one
+    created are deleted, then the objects it changed or removed are put
+    back from its undo record (see restore_state).
+
+    Args:
+        generation (int): Last good generation to keep
+        dry_run (bool): Only count what would change
+
+    Returns:
+        dict: generation -> {"deleted": n, "restored": n}
+    """
+    logger.log_warn(f"=== ROLLING BACK TO GENERATION {generation} ===")
+    current = ServerConfig.objects.conf("world_build_generation", default=0) or 0
+    report = {}
+    recreated = {}
+    for gen in range(current, generation, -1):
+        deleted = teardown([gen], dry_run=dry_run).get(gen, 0)
+        restored = restore_generation(gen, recreated, dry_run=dry_run)
+        if deleted or restored:
+            report[gen] = {"deleted": deleted, "restored": restored}
+
+    if report and not dry_run:
+        rebuild_world_graph()
+    return report
 
 
 def reset_world():
@@ -290,26 +679,21 @@ def reset_world():
     """
     logger.log_warn("=== RESETTING WORLD ===")
 
-    # Delete all custom rooms
-    for room_id in ALL_ROOMS.keys():
-        rooms = search_object(room_id, typeclass=Room)
-        for room in rooms:
-            logger.log_info(f"  Deleting room: {room.key}")
-            room.delete()
-
-    # Delete all items
-    for item_id in ITEMS.keys():
-        items = search_object(item_id, typeclass=Item)
-        for item in items:
-            logger.log_info(f"  Deleting item: {item.key}")
-            item.delete()
-
-    # Delete all NPCs
-    for npc_id in NPCS.keys():
-        npcs = search_object(npc_id, typeclass=NPC)
-        for npc in npcs:
-            logger.log_info(f"  Deleting NPC: {npc.key}")
-            npc.delete()
+    if teardown():
+        logger.log_warn("=== WORLD RESET COMPLETE ===")
+        return
+
+    # Worlds built before generation tags: look up each definition
+    with transaction.atomic():
+        for room_id in ALL_ROOMS.keys():
+            for room in search_object(room_id, typeclass=Room):
+                room.delete()
+        for item_id in ITEMS.keys():
+            for item in search_object(item_id, typeclass=Item):
+                item.delete()
+        for npc_id in NPCS.keys():
+            for npc in search_object(npc_id, typeclass=NPC):
+                npc.delete()
 
     logger.log_warn("=== WORLD RESET COMPLETE ===")
 
@@ -340,6 +724,12 @@ def build():
     return build_all()
 
 
+def sync(dry_run=False):
+    """Update the live world in place to match the world definitions"""
+    from world.world_sync import sync_world
+    return sync_world(dry_run=dry_run)
+
+
 def rebuild():
     """Reset and rebuild the world"""
     reset_world()
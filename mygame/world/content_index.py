@@ -0,0 +1,135 @@
+"""
+Journey Through Scripture - Content Index
+O(1) lookups over rooms, items and NPCs
+
+The stable way for game code to query world content. Every view is a
+prebuilt map (from the compiled world snapshot), so lookups cost the
+same however much content there is. Returned ID lists are tuples and
+should be treated as read-only.
+"""
+
+from evennia.utils import logger
+
+from world.snapshot import load_snapshot, build_indexes, SnapshotError
+
+
+class ContentIndex:
+    """Prebuilt maps over world content"""
+
+    def __init__(self, rooms, items, npcs, indexes):
+        """
+        Initialize from content dicts and their precomputed indexes.
+
+        Args:
+            rooms (dict): Room definitions by ID
+            items (dict): Item definitions by ID
+            npcs (dict): NPC definitions by ID
+            indexes (dict): Output of world.snapshot.build_indexes
+        """
+        self.rooms = rooms
+        self.items = items
+        self.npcs = npcs
+        self._rooms_by_floor = self._freeze(indexes["rooms_by_floor"])
+        self._rooms_by_type = self._freeze(indexes["rooms_by_type"])
+        self._exits_to = self._freeze(indexes["exits_to"])
+        self._items_by_type = self._freeze(indexes["items_by_type"])
+        self._items_by_room = self._freeze(indexes["items_by_room"])
+        self._npcs_by_room = self._freeze(indexes["npcs_by_room"])
+        self._npcs_by_type = self._freeze(indexes["npcs_by_type"])
+        self._merchants = tuple(indexes["merchants"])
+        self._floors = tuple(sorted(self._rooms_by_floor))
+
+    @staticmethod
+    def _freeze(index):
+        """Turn an index's ID lists into tuples"""
+        return {key: tuple(ids) for key, ids in index.items()}
+
+    # Definitions by ID
+
+    def room(self, room_id):
+        """Get room data by ID"""
+        return self.rooms.get(room_id)
+
+    def item(self, item_id):
+        """Get item data by ID"""
+        return self.items.get(item_id)
+
+    def npc(self, npc_id):
+        """Get NPC data by ID"""
+        return self.npcs.get(npc_id)
+
+    # Rooms
+
+    def floors(self):
+        """All floor numbers, lowest first"""
+        return self._floors
+
+    def rooms_on_floor(self, floor):
+        """Room IDs on a floor"""
+        return self._rooms_by_floor.get(floor, ())
+
+    def rooms_of_type(self, room_type):
+        """Room IDs of a room type (normal, safe, boss, hidden)"""
+        return self._rooms_by_type.get(room_type, ())
+
+    def safe_rooms(self):
+        """Room IDs of all safe rooms"""
+        return self.rooms_of_type('safe')
+
+    def exits_to(self, room_id):
+        """(room_id, exit_name) pairs for every exit leading into a room"""
+        return self._exits_to.get(room_id, ())
+
+    # Items
+
+    def items_in_room(self, room_id):
+        """Item IDs placed in a room (duplicates kept)"""
+        return self._items_by_room.get(room_id, ())
+
+    def items_of_type(self, item_type):
+        """Item IDs of an item type"""
+        return self._items_by_type.get(item_type, ())
+
+    # NPCs
+
+    def npcs_in_room(self, room_id):
+        """NPC IDs stationed in a room"""
+        return self._npcs_by_room.get(room_id, ())
+
+    def npcs_of_type(self, npc_type):
+        """NPC IDs of an NPC type"""
+        return self._npcs_by_type.get(npc_type, ())
+
+    def merchants(self):
+        """NPC IDs of all merchants"""
+        return self._merchants
+
+
+# Content index, built on first use
+_content_index = None
+
+
+def rebuild_content_index():
+    """Reload the content index from the (recompiled if stale) snapshot"""
+    global _content_index
+    try:
+        # A fresh snapshot is unpickled without importing the content
+        # modules; they are only imported to recompile a stale one
+        snapshot = load_snapshot()
+        _content_index = ContentIndex(snapshot["rooms"], snapshot["items"], snapshot["npcs"],
+                                      snapshot["indexes"])
+    except SnapshotError as err:
+        # Still serve lookups over broken content; the builder refuses it
+        logger.log_err(str(err))
+        from world.world_data import ALL_ROOMS
+        from world.items import ITEMS
+        from world.npcs import NPCS
+        _content_index = ContentIndex(ALL_ROOMS, ITEMS, NPCS, build_indexes(ALL_ROOMS, ITEMS, NPCS))
+    return _content_index
+
+
+def get_content_index():
+    """Get the content index, building it on first use"""
+    if _content_index is None:
+        return rebuild_content_index()
+    return _content_index
@@ -0,0 +1,248 @@
+"""
+Journey Through Scripture - Dialogue Trees
+Compiled, shared state machines for NPC conversations
+
+Every NPC definition's dialogue dict is compiled once into an immutable
+DialogueTree: options keyed by number, each with its reply, any flag it
+requires and any game action it triggers, plus menus rendered ahead of
+time. Actions are typed (see ACTION_HANDLERS) and resolved to the NPC
+method that runs them when the tree is compiled. NPCs hold only a
+dialogue_id, so all instances share one tree and answering a choice is
+one dict lookup and one message.
+
+Trees are recompiled when the content index is reloaded.
+"""
+
+from collections import namedtuple
+from types import MappingProxyType
+
+# Response key that ends the conversation
+FAREWELL = "farewell"
+
+# Action type -> (NPC method that runs it, parameters it takes)
+ACTION_HANDLERS = {
+    "heal": ("heal_character", ("amount",)),
+    "save": ("save_game", ()),
+    "shop": ("open_shop", ("shop",)),
+    "quest": ("offer_quest", ("quest",)),
+    "combat": ("initiate_combat", ("creature", "level")),
+    "flag": ("set_flag", ("flag",)),
+}
+
+# Parameters an action type can't do without
+REQUIRED_PARAMS = {
+    "quest": ("quest",),
+    "flag": ("flag",),
+}
+
+# Markers older dialogue used inside response text, and what they mean
+LEGACY_MARKERS = (
+    ("[INITIATE COMBAT]", "combat"),
+    ("[GAME ACTION:", None),
+)
+LEGACY_KEYWORDS = (("heal", "heal"), ("save", "save"), ("shop", "shop"))
+
+Action = namedtuple("Action", "type handler params")
+Action.__doc__ = """
+A compiled game action.
+
+    type (str): Key in ACTION_HANDLERS
+    handler (function): NPC method that runs it, called as
+        handler(npc, character, **params)
+    params (dict): Keyword arguments for the handler
+"""
+
+DialogueOption = namedtuple("DialogueOption", "number text requires reply action ends")
+DialogueOption.__doc__ = """
+One menu choice.
+
+    number (int): Menu number
+    text (str): What the player says
+    requires (str): Flag the player needs to see the option, or None
+    reply (str): Rendered NPC reply
+    action (Action): Game action it triggers, or None
+    ends (bool): Whether choosing it ends the conversation
+"""
+
+
+def action_errors(spec):
+    """
+    Check an action definition.
+
+    Args:
+        spec (dict): {"type": ..., **params}
+
+    Returns:
+        list: Error messages (empty if the action is valid)
+    """
+    action_type = spec.get('type')
+    if action_type not in ACTION_HANDLERS:
+        return [f"unknown action type {action_type}"]
+    allowed = ACTION_HANDLERS[action_type][1]
+    errors = [f"{action_type} action takes no parameter {name}"
+              for name in spec if name != 'type' and name not in allowed]
+    errors += [f"{action_type} action needs {name}"
+               for name in REQUIRED_PARAMS.get(action_type, ()) if not spec.get(name)]
+    return errors
+
+
+def compile_action(spec):
+    """
+    Resolve an action definition to its handler.
+
+    Args:
+        spec (dict): {"type": ..., **params}
+
+    Returns:
+        Action: The compiled action
+
+    Raises:
+        ValueError: If the definition is invalid
+    """
+    from typeclasses.npcs import NPC
+
+    errors = action_errors(spec)
+    if errors:
+        raise ValueError("; ".join(errors))
+    params = {name: value for name, value in spec.items() if name != 'type'}
+    return Action(spec['type'], getattr(NPC, ACTION_HANDLERS[spec['type']][0]), params)
+
+
+def split_action(response):
+    """
+    Separate a leading action marker, as older dialogue wrote them
+    ("[GAME ACTION: Heal player]", "[INITIATE COMBAT]"), from the spoken
+    text. Runs once per response, when the tree is compiled.
+
+    Returns:
+        tuple: (Action or None, spoken text)
+    """
+    for marker, action_type in LEGACY_MARKERS:
+        if response.startswith(marker) and "]" in response:
+            end = response.index("]") + 1
+            label = response[:end].lower()
+            if action_type is None:
+                action_type = next((found for keyword, found in LEGACY_KEYWORDS
+                                    if keyword in label), None)
+            if action_type:
+                return compile_action({"type": action_type}), response[end:].strip()
+    return None, response
+
+
+class DialogueTree:
+    """An NPC's conversation, compiled and shared by all its instances"""
+
+    __slots__ = ("dialogue_id", "speaker", "greeting", "options", "gated", "_menus")
+
+    def __init__(self, dialogue_id, speaker, dialogue):
+        """
+        Compile a dialogue definition.
+
+        Args:
+            dialogue_id (str): ID the NPCs refer to (the NPC ID)
+            speaker (str): Name used in rendered lines
+            dialogue (dict): greeting, main_menu and responses
+        """
+        self.dialogue_id = dialogue_id
+        self.speaker = speaker
+        self.greeting = f"{speaker} says, \"{dialogue.get('greeting', 'Hello.')}\""
+        responses = dialogue.get('responses', {})
+        menu = sorted((int(number), option) for number, option in dialogue.get('main_menu', {}).items())
+
+        # Options that need a flag; each subset unlocked gets its own menus
+        self.gated = tuple(number for number, option in menu if option.get('requires'))
+        self._menus = {}
+        for unlocked in self._subsets(self.gated):
+            shown = [(number, option) for number, option in menu
+                     if not option.get('requires') or number in unlocked]
+            lines = "".join(f"\n  {number}. {option['text']}" for number, option in shown)
+            self._menus[unlocked] = (
+                f"\n\n|wWhat do you say?|n{lines}" if shown else "\n(They have nothing more to say)",
+                f"\n\n|wWhat else do you want to ask?|n{lines}",
+            )
+
+        options = {}
+        for number, option in menu:
+            key = option['response']
+            ends = key == FAREWELL
+            action, spoken = split_action(responses.get(key, "Farewell." if ends else "..."))
+            if option.get('action'):
+                action = compile_action(option['action'])
+            reply = f"\n{speaker} says, \"{spoken}\"" if spoken else ""
+            options[number] = DialogueOption(number, option['text'], option.get('requires'),
+                                             reply, action, ends)
+        self.options = MappingProxyType(options)
+
+    @staticmethod
+    def _subsets(numbers):
+        """Every subset of the gated option numbers, as frozensets"""
+        subsets = [frozenset()]
+        for number in numbers:
+            subsets += [subset | {number} for subset in subsets]
+        return subsets
+
+    def unlocked(self, flags):
+        """The gated options a player with these flags can see"""
+        if not self.gated:
+            return frozenset()
+        flags = flags or ()
+        return frozenset(number for number in self.gated
+                         if self.options[number].requires in flags)
+
+    def opening(self, flags):
+        """Greeting and first menu as one message"""
+        return f"\n{self.greeting}{self._menus[self.unlocked(flags)][0]}"
+
+    def menu(self, flags):
+        """The follow-up menu shown after a reply"""
+        return self._menus[self.unlocked(flags)][1]
+
+    def choose(self, number, flags):
+        """
+        Look up a choice.
+
+        Returns:
+            DialogueOption: The option, or None if it doesn't exist or
+                isn't available to the player
+        """
+        option = self.options.get(number)
+        if option and option.requires and option.requires not in (flags or ()):
+            return None
+        return option
+
+
+# (content index, {dialogue_id: DialogueTree}), compiled on first use
+_compiled = (None, {})
+
+
+def compile_dialogues(npcs):
+    """
+    Compile every NPC's dialogue.
+
+    Args:
+        npcs (dict): NPC definitions by ID
+
+    Returns:
+        dict: dialogue_id -> DialogueTree
+    """
+    return {npc_id: DialogueTree(npc_id, npc.get('key', npc_id), npc['dialogue'])
+            for npc_id, npc in npcs.items() if npc.get('dialogue')}
+
+
+def get_dialogue(dialogue_id):
+    """
+    Get a compiled dialogue tree.
+
+    Args:
+        dialogue_id (str): Dialogue (NPC) ID
+
+    Returns:
+        DialogueTree: The tree, or None if there is none
+    """
+    global _compiled
+    from world.content_index import get_content_index
+
+    index = get_content_index()
+    if _compiled[0] is not index:
+        _compiled = (index, compile_dialogues(index.npcs))
+    return _compiled[1].get(dialogue_id)
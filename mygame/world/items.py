@@ -395,6 +395,97 @@ Day 10: The Deceiver blocks the way upward. I must prepare myself..."""
         "weight": 4
     },
 
+    # FLOOR 3 ITEMS - Workshop of Sacred Crafts
+    "bronze_tools": {
+        "key": "Bronze Craftsman's Tools",
+        "desc": "Chisels, hammers, and files of polished bronze, worn smooth by skilled hands.",
+        "item_type": "tool",
+        "value": 25,
+        "weight": 4
+    },
+
+    "unfinished_altar_piece": {
+        "key": "Unfinished Altar Piece",
+        "desc": "A carved acacia panel meant for the sanctuary altar. The final engravings are still missing.",
+        "item_type": "quest",
+        "value": 0,
+        "weight": 6
+    },
+
+    "sacred_lamp": {
+        "key": "Sacred Lamp",
+        "desc": "A seven-branched lamp of hammered gold, waiting to be filled with pure oil.",
+        "item_type": "treasure",
+        "value": 120,
+        "weight": 5
+    },
+
+    # Healing Chambers Items
+    "medicinal_herbs": {
+        "key": "Bundle of Medicinal Herbs",
+        "desc": "Dried herbs tied with twine. Chewing them eases pain and restores a little strength.",
+        "item_type": "consumable",
+        "healing": 10,
+        "value": 8,
+        "weight": 0.2,
+        "uses": 1
+    },
+
+    "healing_ointment": {
+        "key": "Healing Ointment",
+        "desc": "A small jar of balm made from oil and myrrh. Soothes wounds quickly.",
+        "item_type": "consumable",
+        "healing": 20,
+        "value": 20,
+        "weight": 0.5,
+        "uses": 2
+    },
+
+    "bandages": {
+        "key": "Linen Bandages",
+        "desc": "Clean strips of linen for binding wounds.",
+        "item_type": "consumable",
+        "healing": 12,
+        "value": 6,
+        "weight": 0.3,
+        "uses": 1
+    },
+
+    # Kitchen & Storehouse Items
+    "olive_oil": {
+        "key": "Jar of Olive Oil",
+        "desc": "Pure pressed olive oil, fit for cooking, anointing, or filling a lamp.",
+        "item_type": "material",
+        "value": 12,
+        "weight": 1.5,
+        "crafting_ingredient": True
+    },
+
+    "grain": {
+        "key": "Sack of Grain",
+        "desc": "A small sack of barley from the temple storehouse.",
+        "item_type": "material",
+        "value": 4,
+        "weight": 3
+    },
+
+    "cooking_supplies": {
+        "key": "Cooking Supplies",
+        "desc": "A clay pot, a wooden spoon, and a pouch of salt.",
+        "item_type": "tool",
+        "value": 10,
+        "weight": 3
+    },
+
+    # Merchant Goods
+    "rope": {
+        "key": "Coil of Rope",
+        "desc": "Sturdy rope woven from goat hair. Useful for climbing and hauling.",
+        "item_type": "equipment",
+        "value": 8,
+        "weight": 2
+    },
+
     # Generic Currency
     "temple_shekel": {
         "key": "Temple Shekel",
@@ -418,7 +509,8 @@ def get_item(item_id):
 
 def get_items_by_type(item_type):
     """Get all items of a specific type"""
-    return {k: v for k, v in ITEMS.items() if v.get('item_type') == item_type}
+    from world.content_index import get_content_index
+    return {k: ITEMS[k] for k in get_content_index().items_of_type(item_type)}
 
 def get_items_in_room(room_items):
     """Get full item data for a list of item IDs"""
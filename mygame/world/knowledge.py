@@ -0,0 +1,201 @@
+"""
+Journey Through Scripture - NPC Knowledge
+Ranked topic search behind "ask <npc> about <topic>"
+
+Every NPC dialogue response and every room's lore is a document in one
+inverted index: stemmed term -> ((document, weight), ...), with tf-idf
+weights normalised per document. The index is built once (at server
+start, and again when the content index is reloaded), so answering a
+question is a handful of dict lookups and additions.
+
+An NPC knows its own responses best, then the lore of its room, then the
+lore of the rest of its floor; each document is scored within that
+scope and boosted accordingly.
+"""
+
+import math
+import re
+from collections import Counter, namedtuple
+
+from world.dialogue import FAREWELL, split_action
+
+# Score multiplier by how close a document is to the NPC asked
+OWN_BOOST = 2.0
+ROOM_BOOST = 1.5
+FLOOR_BOOST = 1.0
+
+# Times the words of an option's text count toward its response
+TITLE_WEIGHT = 2
+
+WORD = re.compile(r"[a-z]+")
+
+STOPWORDS = frozenset("""
+a about an and any are as at be but by can do does for from have he her
+his how i if in is it its me my no not of on or our so tell than that the
+their them then there these they this to was we what when where which who
+why will with you your
+""".split())
+
+Document = namedtuple("Document", "owner kind title text")
+Document.__doc__ = """
+Something an NPC can be asked about.
+
+    owner (str): NPC ID (responses) or room ID (lore)
+    kind (str): "response" or "lore"
+    title (str): Menu text leading to the response, or the room name
+    text (str): The answer itself
+"""
+
+
+def stem(word):
+    """
+    Reduce a word to a rough stem, so "gates", "gate" and "gated" meet.
+    Deliberately crude: plurals, -ing/-ed/-ly and a final e.
+    """
+    if word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith(("sses", "ches", "shes", "xes")):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")) and len(word) > 3:
+        word = word[:-1]
+    for suffix in ("ing", "ed", "ly"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """
+    Split text into stemmed terms, dropping stopwords.
+
+    Returns:
+        list: Terms in order (with repeats)
+    """
+    return [stem(word) for word in WORD.findall(text.lower().replace("'s", ""))
+            if word not in STOPWORDS and len(word) > 1]
+
+
+def collect_documents(rooms, npcs):
+    """
+    Gather the documents to index.
+
+    Args:
+        rooms (dict): Room definitions by ID
+        npcs (dict): NPC definitions by ID
+
+    Returns:
+        list: Document tuples
+    """
+    documents = []
+    for npc_id, npc in npcs.items():
+        dialogue = npc.get('dialogue') or {}
+        titles = {}
+        for option in dialogue.get('main_menu', {}).values():
+            titles.setdefault(option['response'], option['text'])
+        for key, response in dialogue.get('responses', {}).items():
+            if key == FAREWELL:
+                continue
+            _, spoken = split_action(response)
+            if spoken:
+                documents.append(Document(npc_id, "response", titles.get(key, ""), spoken))
+    for room_id, room in rooms.items():
+        if room.get('lore'):
+            documents.append(Document(room_id, "lore", room.get('key', room_id), room['lore']))
+    return documents
+
+
+class KnowledgeIndex:
+    """Inverted index over NPC responses and room lore"""
+
+    def __init__(self, rooms, npcs):
+        """
+        Build the index.
+
+        Args:
+            rooms (dict): Room definitions by ID
+            npcs (dict): NPC definitions by ID
+        """
+        self.documents = tuple(collect_documents(rooms, npcs))
+
+        counts = [Counter(tokenize(doc.text) + tokenize(doc.title) * TITLE_WEIGHT)
+                  for doc in self.documents]
+        frequency = Counter(term for terms in counts for term in terms)
+        total = len(self.documents)
+
+        postings = {}
+        for doc_number, terms in enumerate(counts):
+            weights = {term: (1 + math.log(count)) * math.log(1 + total / frequency[term])
+                       for term, count in terms.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            for term, weight in weights.items():
+                postings.setdefault(term, []).append((doc_number, weight / norm))
+        self.postings = {term: tuple(entries) for term, entries in postings.items()}
+
+        # What each NPC can speak to: owner -> boost
+        floor_rooms = {}
+        for room_id, room in rooms.items():
+            floor_rooms.setdefault(room.get('floor'), []).append(room_id)
+        self.scopes = {}
+        for npc_id, npc in npcs.items():
+            home = npc.get('room')
+            floor = rooms.get(home, {}).get('floor')
+            scope = {room_id: FLOOR_BOOST for room_id in floor_rooms.get(floor, ())}
+            scope[home] = ROOM_BOOST
+            scope[npc_id] = OWN_BOOST
+            self.scopes[npc_id] = scope
+
+    def search(self, query, scope):
+        """
+        Rank documents against a query.
+
+        Args:
+            query (str): Free text
+            scope (dict): owner -> boost; documents of other owners are
+                ignored
+
+        Returns:
+            list: (score, Document), best first
+        """
+        scores = {}
+        for term in set(tokenize(query)):
+            for doc_number, weight in self.postings.get(term, ()):
+                boost = scope.get(self.documents[doc_number].owner)
+                if boost:
+                    scores[doc_number] = scores.get(doc_number, 0.0) + weight * boost
+        ranked = sorted(scores.items(), key=lambda entry: -entry[1])
+        return [(score, self.documents[doc_number]) for doc_number, score in ranked]
+
+    def ask(self, npc_id, topic):
+        """
+        Find an NPC's best answer about a topic.
+
+        Args:
+            npc_id (str): NPC ID
+            topic (str): What the player asked about
+
+        Returns:
+            Document: The best match, or None if the NPC knows nothing of it
+        """
+        scope = self.scopes.get(npc_id)
+        if not scope:
+            return None
+        results = self.search(topic, scope)
+        return results[0][1] if results else None
+
+
+# (content index, KnowledgeIndex), built on first use
+_knowledge = (None, None)
+
+
+def get_knowledge():
+    """Get the knowledge index, rebuilding it if the content index was reloaded"""
+    global _knowledge
+    from world.content_index import get_content_index
+
+    index = get_content_index()
+    if _knowledge[0] is not index:
+        _knowledge = (index, KnowledgeIndex(index.rooms, index.npcs))
+    return _knowledge[1]
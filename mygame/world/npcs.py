@@ -43,7 +43,8 @@ never complete. There is always more to learn, more to understand. I return to g
             "main_menu": {
                 1: {"text": "What is this place?", "response": "explain_palace"},
                 2: {"text": "Can you tell me about the inscription?", "response": "inscription"},
-                3: {"text": "What should I know before entering?", "response": "advice"},
+                3: {"text": "What should I know before entering?", "response": "advice",
+                    "action": {"type": "quest", "quest": "quest_meet_elder"}},
                 4: {"text": "Thank you", "response": "farewell"}
             },
             "responses": {
@@ -110,7 +111,9 @@ is found in humble service. I am content here, providing for those who thirst.""
         },
         "quest": None,
         "merchant": False,
-        "gives_item": "fountain_water"
+        "gives_item": "fountain_water",
+        "behaviours": ["patrol"],
+        "patrol_range": 1
     },
 
     "priest_ezra": {
@@ -121,15 +124,15 @@ is found in humble service. I am content here, providing for those who thirst.""
         "dialogue": {
             "greeting": "Welcome to the Pilgrim's Rest. You are safe here, child. How may I serve you?",
             "main_menu": {
-                1: {"text": "I need healing", "response": "healing"},
-                2: {"text": "Can I save my progress here?", "response": "save_game"},
+                1: {"text": "I need healing", "response": "healing", "action": {"type": "heal"}},
+                2: {"text": "Can I save my progress here?", "response": "save_game", "action": {"type": "save"}},
                 3: {"text": "Tell me about this sanctuary", "response": "sanctuary_lore"},
                 4: {"text": "What is my calling?", "response": "calling", "requires": "defeated_deceiver"},
                 5: {"text": "Thank you for your service", "response": "farewell"}
             },
             "responses": {
-                "healing": "[GAME ACTION: Heal player to full HP] May the divine light restore you. You are renewed.",
-                "save_game": "[GAME ACTION: Save game] Your journey is recorded. You may return to this point if needed.",
+                "healing": "May the divine light restore you. You are renewed.",
+                "save_game": "Your journey is recorded. You may return to this point if needed.",
                 "sanctuary_lore": """This chamber has stood for ten thousand years as a place of
 refuge. No evil can enter here—it is protected by ancient wards. Every floor has such a sanctuary,
 tended by a priest. Seek them when you are weary.""",
@@ -249,12 +252,12 @@ hidden chamber. Beware him!""",
         "dialogue": {
             "greeting": "Welcome, traveler! I have supplies for your journey. Fair prices, quality goods!",
             "main_menu": {
-                1: {"text": "Show me your wares", "response": "shop"},
+                1: {"text": "Show me your wares", "response": "shop", "action": {"type": "shop"}},
                 2: {"text": "Tell me about the other merchant", "response": "warn_about_zadok"},
                 3: {"text": "Thank you, I'm just looking", "response": "farewell"}
             },
             "responses": {
-                "shop": "[GAME ACTION: Open shop interface] Browse at your leisure!",
+                "shop": "Browse at your leisure!",
                 "warn_about_zadok": """[Lowers voice] Be careful with Zadok. He sells some fake relics
 and overcharges. Not all merchants here are honest. I try to keep my prices fair—I serve pilgrims,
 not profit.""",
@@ -275,7 +278,7 @@ not profit.""",
         "dialogue": {
             "greeting": "Ah! A new customer! I have RARE artifacts! Once-in-a-lifetime deals!",
             "main_menu": {
-                1: {"text": "Show me your rare artifacts", "response": "show_fakes"},
+                1: {"text": "Show me your rare artifacts", "response": "show_fakes", "action": {"type": "shop"}},
                 2: {"text": "These look fake to me", "response": "expose_fraud"},
                 3: {"text": "I'll pass", "response": "farewell"}
             },
@@ -328,14 +331,14 @@ authority. His voice is smooth and persuasive, but his eyes are empty.""",
             "main_menu": {
                 1: {"text": "I challenge your false teachings!", "response": "confront"},
                 2: {"text": "Listen to his words", "response": "listen_danger"},
-                3: {"text": "Attack immediately", "response": "combat"}
+                3: {"text": "Attack immediately", "response": "combat", "action": {"type": "combat"}}
             },
             "responses": {
                 "confront": """[WISDOM CHECK] If successful, you expose his lies and break his hold
 on the entranced pilgrims. If failed, combat begins. Either way, you must defeat him.""",
                 "listen_danger": """[FAITH CHECK] His words are seductive, twisting truth just enough
 to mislead. Roll to resist his influence, or become confused yourself!""",
-                "combat": "[INITIATE COMBAT] The Deceiver laughs. 'Violence? How primitive. Very well.'"
+                "combat": "The Deceiver laughs. 'Violence? How primitive. Very well.'"
             }
         },
         "quest": None,
@@ -360,15 +363,15 @@ to mislead. Roll to resist his influence, or become confused yourself!""",
         "dialogue": {
             "greeting": "Welcome to the Court of Wisdom, seeker. Knowledge and understanding await you here.",
             "main_menu": {
-                1: {"text": "I need healing", "response": "healing"},
-                2: {"text": "Can I save my progress?", "response": "save_game"},
+                1: {"text": "I need healing", "response": "healing", "action": {"type": "heal"}},
+                2: {"text": "Can I save my progress?", "response": "save_game", "action": {"type": "save"}},
                 3: {"text": "Tell me about this floor", "response": "floor_info"},
                 4: {"text": "May I study here?", "response": "study"},
                 5: {"text": "Thank you", "response": "farewell"}
             },
             "responses": {
-                "healing": "[GAME ACTION: Heal to full] Be renewed in body and mind.",
-                "save_game": "[GAME ACTION: Save] Your progress is preserved.",
+                "healing": "Be renewed in body and mind.",
+                "save_game": "Your progress is preserved.",
                 "floor_info": """The Court of Wisdom tests your understanding and discernment. False
 teachers will challenge you with twisted logic. Truth must be defended with both knowledge and faith.""",
                 "study": """Of course. The scrolls here contain deep wisdom. Study them well—they
@@ -392,7 +395,8 @@ def get_npc(npc_id):
 
 def get_npcs_in_room(room_id):
     """Get all NPCs in a specific room"""
-    return {k: v for k, v in NPCS.items() if v.get('room') == room_id}
+    from world.content_index import get_content_index
+    return {k: NPCS[k] for k in get_content_index().npcs_in_room(room_id)}
 
 def get_npc_dialogue(npc_id, dialogue_key):
     """Get specific dialogue from an NPC"""
@@ -0,0 +1,207 @@
+"""
+Journey Through Scripture - World Snapshot
+Compiles rooms, items and NPCs into one validated, versioned file
+
+The content modules are large literal dicts, and the views derived from
+them (rooms by floor, NPCs by room, ...) used to be rebuilt by scanning
+on every call. compile_snapshot() validates all content once, precomputes
+every secondary index, and pickles the result. load_snapshot() reads it
+back in a few milliseconds, recompiling only when a content module is
+newer than the file.
+
+Compile from the game directory with: python -m world.snapshot
+"""
+
+import hashlib
+import os
+import pickle
+import sys
+
+# Bump when the snapshot layout changes
+SNAPSHOT_FORMAT = 1
+
+WORLD_DIR = os.path.dirname(os.path.abspath(__file__))
+SNAPSHOT_PATH = os.path.join(WORLD_DIR, "world_snapshot.pickle")
+SOURCE_FILES = [os.path.join(WORLD_DIR, name)
+                for name in ("world_data.py", "items.py", "npcs.py")]
+
+
+class SnapshotError(ValueError):
+    """Raised when world content fails validation"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f"{len(errors)} world content error(s):\n  " + "\n  ".join(errors))
+
+
+def validate(rooms, items, npcs):
+    """
+    Check cross-references between rooms, items and NPCs.
+
+    A room's own "npcs" list is descriptive only; NPC placement comes
+    from each NPC's "room", so only that is checked.
+
+    Returns:
+        list: Error messages (empty if the content is valid)
+    """
+    from world.dialogue import action_errors
+
+    errors = []
+
+    for room_id, room in rooms.items():
+        for exit_name, destination in room.get('exits', {}).items():
+            if not destination.startswith('[') and destination not in rooms:
+                errors.append(f"room {room_id}: exit '{exit_name}' leads to unknown room {destination}")
+        locked = room.get('locked_exit')
+        if locked and locked.get('unlocks_to') not in rooms:
+            errors.append(f"room {room_id}: locked exit unlocks unknown room {locked.get('unlocks_to')}")
+        for item_id in room.get('items', []):
+            if item_id not in items:
+                errors.append(f"room {room_id}: unknown item {item_id}")
+
+    for npc_id, npc in npcs.items():
+        if npc.get('room') not in rooms:
+            errors.append(f"npc {npc_id}: unknown room {npc.get('room')}")
+        for item_id in npc.get('shop_inventory', []):
+            if item_id not in items:
+                errors.append(f"npc {npc_id}: shop sells unknown item {item_id}")
+        dialogue = npc.get('dialogue', {})
+        for number, option in dialogue.get('main_menu', {}).items():
+            response = option.get('response')
+            if response != "farewell" and response not in dialogue.get('responses', {}):
+                errors.append(f"npc {npc_id}: dialogue option {number} has no response {response}")
+            if option.get('action'):
+                errors += [f"npc {npc_id}: dialogue option {number}: {error}"
+                           for error in action_errors(option['action'])]
+
+    return errors
+
+
+def build_indexes(rooms, items, npcs):
+    """
+    Precompute the secondary indexes over validated content.
+
+    Returns:
+        dict: Index name -> {key: [ids]} (exits_to holds (room_id, exit) pairs)
+    """
+    indexes = {
+        "rooms_by_floor": {},
+        "rooms_by_type": {},
+        "exits_to": {},
+        "items_by_type": {},
+        "items_by_room": {},
+        "npcs_by_room": {},
+        "npcs_by_type": {},
+        "merchants": [],
+    }
+
+    for room_id, room in rooms.items():
+        indexes["rooms_by_floor"].setdefault(room.get('floor'), []).append(room_id)
+        indexes["rooms_by_type"].setdefault(room.get('room_type', 'normal'), []).append(room_id)
+        indexes["items_by_room"][room_id] = list(room.get('items', []))
+        for exit_name, destination in room.get('exits', {}).items():
+            if destination in rooms:
+                indexes["exits_to"].setdefault(destination, []).append((room_id, exit_name))
+
+    for item_id, item in items.items():
+        indexes["items_by_type"].setdefault(item.get('item_type'), []).append(item_id)
+
+    for npc_id, npc in npcs.items():
+        indexes["npcs_by_room"].setdefault(npc.get('room'), []).append(npc_id)
+        indexes["npcs_by_type"].setdefault(npc.get('npc_type', 'friendly'), []).append(npc_id)
+        if npc.get('merchant'):
+            indexes["merchants"].append(npc_id)
+
+    return indexes
+
+
+def source_version():
+    """
+    Hash the content module sources.
+
+    Returns:
+        str: Hex digest identifying this version of the content
+    """
+    digest = hashlib.sha1(str(SNAPSHOT_FORMAT).encode())
+    for path in SOURCE_FILES:
+        with open(path, "rb") as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def compile_snapshot(path=SNAPSHOT_PATH):
+    """
+    Validate all content and write the snapshot.
+
+    Args:
+        path (str): Where to write the snapshot, or None to skip writing
+
+    Returns:
+        dict: The snapshot
+
+    Raises:
+        SnapshotError: If any content reference is broken
+    """
+    from world.world_data import ALL_ROOMS
+    from world.items import ITEMS
+    from world.npcs import NPCS
+
+    errors = validate(ALL_ROOMS, ITEMS, NPCS)
+    if errors:
+        raise SnapshotError(errors)
+
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "version": source_version(),
+        "rooms": ALL_ROOMS,
+        "items": ITEMS,
+        "npcs": NPCS,
+        "indexes": build_indexes(ALL_ROOMS, ITEMS, NPCS),
+    }
+    if path:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as outfile:
+            pickle.dump(snapshot, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    return snapshot
+
+
+def is_stale(path=SNAPSHOT_PATH):
+    """True if the snapshot is missing or older than any content module"""
+    try:
+        built = os.path.getmtime(path)
+    except OSError:
+        return True
+    return any(os.path.getmtime(source) > built for source in SOURCE_FILES)
+
+
+def load_snapshot(path=SNAPSHOT_PATH):
+    """
+    Load the snapshot, compiling it first if it is missing or stale.
+
+    Returns:
+        dict: The snapshot
+    """
+    if not is_stale(path):
+        try:
+            with open(path, "rb") as infile:
+                snapshot = pickle.load(infile)
+            if snapshot.get("format") == SNAPSHOT_FORMAT:
+                return snapshot
+        except (OSError, pickle.UnpicklingError, EOFError):
+            pass
+    try:
+        return compile_snapshot(path)
+    except OSError:
+        # Read-only install: keep the compiled snapshot in memory only
+        return compile_snapshot(None)
+
+
+if __name__ == "__main__":
+    try:
+        result = compile_snapshot()
+    except SnapshotError as err:
+        print(err)
+        sys.exit(1)
+    print(f"Wrote {SNAPSHOT_PATH} (version {result['version'][:12]}, "
+          f"{len(result['rooms'])} rooms, {len(result['items'])} items, {len(result['npcs'])} npcs)")
@@ -510,9 +510,11 @@ def get_room(room_id):
 # Helper function to get all rooms on a floor
 def get_floor_rooms(floor_number):
     """Get all rooms on a specific floor"""
-    return {k: v for k, v in ALL_ROOMS.items() if v.get('floor') == floor_number}
+    from world.content_index import get_content_index
+    return {k: ALL_ROOMS[k] for k in get_content_index().rooms_on_floor(floor_number)}
 
 # Helper function to get all safe rooms
 def get_safe_rooms():
     """Get all safe room locations"""
-    return {k: v for k, v in ALL_ROOMS.items() if v.get('room_type') == 'safe'}
+    from world.content_index import get_content_index
+    return {k: ALL_ROOMS[k] for k in get_content_index().safe_rooms()}
@@ -0,0 +1,211 @@
+"""
+Journey Through Scripture - World Graph
+Compiled exit graph with precomputed shortest-path routing
+
+The exit graph in world_data is compiled once into compact adjacency
+arrays, then a BFS from every room fills a next-hop table. Routing
+queries just follow next hops, so they cost O(path length) with no
+searching at request time. Rebuild with rebuild_world_graph() after
+the world changes.
+"""
+
+from array import array
+from collections import deque
+
+
+
+UNREACHABLE = -1
+
+
+class WorldGraph:
+    """
+    Immutable routing tables for a set of room definitions.
+
+    Rooms are numbered 0..n-1. Edges are stored CSR-style: the exits of
+    room i are edge_targets[edge_offsets[i]:edge_offsets[i + 1]], with
+    the matching exit names in edge_names. next_hop[src][dst] holds the
+    edge to take first from src towards dst, or UNREACHABLE.
+    """
+
+    def __init__(self, rooms):
+        """
+        Compile the graph.
+
+        Args:
+            rooms (dict): Room definitions keyed by room ID (ALL_ROOMS)
+        """
+        self.room_ids = tuple(rooms)
+        self.index = {room_id: i for i, room_id in enumerate(self.room_ids)}
+        self.names = {room_data.get('key', room_id).lower(): room_id
+                      for room_id, room_data in rooms.items()}
+
+        self.edge_offsets = array('i', [0])
+        self.edge_targets = array('i')
+        self.edge_names = []
+        for room_id in self.room_ids:
+            for exit_name, destination_id in rooms[room_id].get('exits', {}).items():
+                if destination_id in self.index:
+                    self.edge_targets.append(self.index[destination_id])
+                    self.edge_names.append(exit_name)
+            self.edge_offsets.append(len(self.edge_targets))
+
+        safe = {self.index[room_id] for room_id, room_data in rooms.items()
+                if room_data.get('room_type') == 'safe'}
+
+        self.next_hop = []
+        self.nearest_safe = array('i')
+        for source in range(len(self.room_ids)):
+            hops, nearest = self._bfs(source, safe)
+            self.next_hop.append(hops)
+            self.nearest_safe.append(nearest)
+
+    def _bfs(self, source, safe):
+        """
+        Breadth-first search from one room.
+
+        Returns:
+            tuple: (next-hop edge per destination, nearest safe room or UNREACHABLE)
+        """
+        hops = array('i', [UNREACHABLE]) * len(self.room_ids)
+        seen = {source}
+        nearest = source if source in safe else UNREACHABLE
+        queue = deque()
+
+        for edge in range(self.edge_offsets[source], self.edge_offsets[source + 1]):
+            target = self.edge_targets[edge]
+            if target not in seen:
+                seen.add(target)
+                hops[target] = edge
+                queue.append(target)
+
+        while queue:
+            room = queue.popleft()
+            if nearest == UNREACHABLE and room in safe:
+                nearest = room
+            for edge in range(self.edge_offsets[room], self.edge_offsets[room + 1]):
+                target = self.edge_targets[edge]
+                if target not in seen:
+                    seen.add(target)
+                    hops[target] = hops[room]
+                    queue.append(target)
+
+        return hops, nearest
+
+    def find_room(self, query):
+        """
+        Resolve a room ID or room name (case-insensitive, unique prefix ok).
+
+        Returns:
+            str: Room ID or None
+        """
+        query = query.strip().lower()
+        if query in self.index:
+            return query
+        if query in self.names:
+            return self.names[query]
+        matches = [room_id for name, room_id in self.names.items() if name.startswith(query)]
+        return matches[0] if len(matches) == 1 else None
+
+    def neighbours(self, room_id):
+        """
+        Get the exits out of a room.
+
+        Returns:
+            list: (exit_name, room_id) tuples
+        """
+        room = self.index.get(room_id)
+        if room is None:
+            return []
+        return [(self.edge_names[edge], self.room_ids[self.edge_targets[edge]])
+                for edge in range(self.edge_offsets[room], self.edge_offsets[room + 1])]
+
+    def next_step(self, source_id, target_id):
+        """
+        Get the first step from one room towards another.
+
+        Returns:
+            tuple: (exit_name, room_id), or None if unreachable or already there
+        """
+        source = self.index.get(source_id)
+        target = self.index.get(target_id)
+        if source is None or target is None:
+            return None
+        edge = self.next_hop[source][target]
+        if edge == UNREACHABLE:
+            return None
+        return self.edge_names[edge], self.room_ids[self.edge_targets[edge]]
+
+    def path(self, source_id, target_id):
+        """
+        Get the shortest route between two rooms.
+
+        Returns:
+            list: (exit_name, room_id) steps, [] if already there,
+                or None if there is no route
+        """
+        if source_id == target_id:
+            return [] if source_id in self.index else None
+        steps = []
+        current = source_id
+        while current != target_id:
+            step = self.next_step(current, target_id)
+            if step is None:
+                return None
+            steps.append(step)
+            current = step[1]
+        return steps
+
+    def nearest_safe_room(self, source_id):
+        """
+        Get the closest sanctuary reachable from a room.
+
+        Returns:
+            str: Room ID of the nearest SafeRoom, or None
+        """
+        source = self.index.get(source_id)
+        if source is None or self.nearest_safe[source] == UNREACHABLE:
+            return None
+        return self.room_ids[self.nearest_safe[source]]
+
+
+# Compiled graph, built on first use
+_world_graph = None
+
+
+def get_world_graph():
+    """Get the compiled world graph, building it on first use"""
+    global _world_graph
+    if _world_graph is None:
+        return rebuild_world_graph()
+    return _world_graph
+
+
+def rebuild_world_graph():
+    """Recompile the world graph after the world definitions change"""
+    global _world_graph
+    from world.content_index import get_content_index
+
+    _world_graph = WorldGraph(get_content_index().rooms)
+    return _world_graph
+
+
+def get_room_id(room):
+    """
+    Get the world_data room ID of a live room object.
+
+    Args:
+        room: A room built by world.build_world
+
+    Returns:
+        str: Room ID or None
+    """
+    if not room:
+        return None
+    room_id = room.db.room_id
+    if room_id:
+        return room_id
+    graph = get_world_graph()
+    for alias in room.aliases.all():
+        if alias in graph.index:
+            return alias
+    return None
@@ -0,0 +1,231 @@
+"""
+Incremental World Sync for Journey Through Scripture
+
+Brings the live world in line with world_data, items and npcs without
+tearing it down. Every built object carries a world tag and the content
+hash of the spec it was made from (see world.build_world). A sync
+rebuilds the specs, compares hashes, and only creates, updates or
+deletes what actually changed. A typo fix in one room description
+rewrites that one Attribute.
+
+Call this from in-game with: @py world.world_sync.sync_world()
+"""
+
+from django.db import transaction
+from evennia.objects.models import ObjectDB
+from evennia.server.models import ServerConfig
+from evennia.utils import logger
+
+from world.build_world import (
+    ROOM_CATEGORY, EXIT_CATEGORY, ITEM_CATEGORY, NPC_CATEGORY, BUILD_CATEGORY,
+    CONDITIONAL_ATTRIBUTES, UNDO_KEY,
+    room_specs, exit_specs, item_specs, npc_specs, spawn, next_generation, capture_state
+)
+from world.world_graph import rebuild_world_graph
+
+
+def live_objects(category):
+    """
+    Get the built objects of one kind, keyed by world ID.
+
+    Args:
+        category (str): World tag category
+
+    Returns:
+        dict: World ID -> object
+    """
+    rows = ObjectDB.objects.filter(
+        db_tags__db_category=category
+    ).values_list('id', 'db_tags__db_key')
+    ids = dict(rows)
+    objects = ObjectDB.objects.in_bulk(list(ids))
+    return {ids[pk]: obj for pk, obj in objects.items()}
+
+
+def update_object(obj, spec, room_objects):
+    """
+    Write only the parts of a spec that differ from the live object.
+
+    Args:
+        obj: Live object
+        spec (dict): Object spec it should match
+        room_objects (dict): Mapping of room IDs to room objects
+
+    Returns:
+        int: Number of fields written
+    """
+    written = 0
+
+    if obj.typeclass_path != spec['typeclass']:
+        obj.swap_typeclass(spec['typeclass'], clean_attributes=False, run_start_hooks=None)
+        written += 1
+    if obj.key != spec['key']:
+        obj.key = spec['key']
+        written += 1
+
+    if spec['destination']:
+        destination = room_objects.get(spec['destination'])
+        if destination and obj.destination != destination:
+            obj.destination = destination
+            written += 1
+        obj.locks.add(spec['locks'] or "traverse:all()")
+
+    # NPCs go back to their post; items stay wherever players left them
+    if spec['category'] == NPC_CATEGORY:
+        location = room_objects.get(spec['location'])
+        if location and obj.location != location:
+            obj.move_to(location, quiet=True, move_type="teleport")
+            written += 1
+
+    changed = [(key, value) for key, value in spec['attributes']
+               if obj.attributes.get(key) != value]
+    keys = [key for key, _ in spec['attributes']]
+
+    # Remove what the definition no longer sets (an exit that was
+    # unlocked, a room that stopped being a boss room)
+    previous = obj.attributes.get("spec_keys") or CONDITIONAL_ATTRIBUTES.get(spec['category'], ())
+    for key in previous:
+        if key not in keys and obj.attributes.has(key):
+            obj.attributes.remove(key)
+            written += 1
+
+    obj.attributes.batch_add(*changed, ("content_hash", spec['hash']), ("spec_keys", keys))
+    if hasattr(obj, 'invalidate_state'):
+        obj.invalidate_state()
+
+    # Drop per-field copies left on items built before they became
+    # flyweights, where they still match the shared definition
+    if spec['category'] == ITEM_CATEGORY and hasattr(obj, 'field_defaults'):
+        definition = obj.get_definition()
+        for name in obj.field_defaults:
+            if name in definition and obj.attributes.get(name) == definition[name]:
+                obj.attributes.remove(name)
+                written += 1
+
+    # NPCs now share compiled dialogue trees by dialogue_id; drop the
+    # per-instance copy older builds stored
+    if spec['category'] == NPC_CATEGORY and obj.attributes.has("dialogue"):
+        obj.attributes.remove("dialogue")
+        written += 1
+
+    return written + len(changed)
+
+
+def remove_object(obj, category):
+    """
+    Remove an object whose definition is gone.
+
+    Items a player has picked up are not deleted, just released from
+    world management, including their build generation, so teardown and
+    rollback leave them alone.
+
+    Returns:
+        bool: True if the object was deleted
+    """
+    if category == ITEM_CATEGORY:
+        spawn_room = obj.tags.get(category=ITEM_CATEGORY).split(":", 1)[0]
+        if obj.location is None or obj.location.db.room_id != spawn_room:
+            obj.tags.remove(category=ITEM_CATEGORY)
+            obj.tags.remove(category=BUILD_CATEGORY)
+            obj.attributes.remove("content_hash")
+            return False
+    obj.delete()
+    return True
+
+
+def sync_category(category, specs, room_objects, generation=None, dry_run=False, undo=None):
+    """
+    Sync one kind of world object.
+
+    Args:
+        category (str): World tag category
+        specs (iterable): Specs from the matching *_specs() generator
+        room_objects (dict): Mapping of room IDs to room objects; new
+            rooms are added to it as they are created
+        generation (int): Build generation for created objects
+        dry_run (bool): Only count what would change
+        undo (list): Collects the state of each object before it is
+            updated or removed, for rollback
+
+    Returns:
+        dict: created/updated/deleted/fields counts
+    """
+    live = live_objects(category)
+    report = {"created": 0, "updated": 0, "deleted": 0, "fields": 0}
+
+    for spec in specs:
+        obj = live.pop(spec['tag'], None)
+        if obj is None:
+            if spec['location'] and spec['location'] not in room_objects and not dry_run:
+                continue
+            report["created"] += 1
+            if not dry_run:
+                obj = spawn(spec, room_objects, generation)
+                if category == ROOM_CATEGORY:
+                    room_objects[spec['tag']] = obj
+        elif obj.attributes.get("content_hash") != spec['hash']:
+            report["updated"] += 1
+            if not dry_run:
+                if undo is not None:
+                    undo.append(capture_state(obj))
+                report["fields"] += update_object(obj, spec, room_objects)
+
+    for obj in live.values():
+        report["deleted"] += 1
+        if not dry_run:
+            if undo is not None:
+                undo.append(capture_state(obj))
+            remove_object(obj, category)
+
+    return report
+
+
+def sync_world(dry_run=False):
+    """
+    Apply the minimal set of changes that makes the live world match
+    the world definitions.
+
+    Args:
+        dry_run (bool): Report what would change without touching anything
+
+    Returns:
+        dict: Per-kind reports from sync_category
+    """
+    logger.log_info(f"=== SYNCING WORLD{' (DRY RUN)' if dry_run else ''} ===")
+    reports = {}
+
+    # Worlds built before world tags would be rebuilt alongside themselves
+    rooms = live_objects(ROOM_CATEGORY)
+    if not rooms:
+        logger.log_err("  No tagged rooms found; refusing to sync. Build the world with "
+                       "build_world.build_all() (after reset_world() for an untagged world).")
+        return reports
+
+    with transaction.atomic():
+        # Objects created by this sync can be rolled back as one generation,
+        # and the ones it changed or removed are put back from its undo record
+        generation = None if dry_run else next_generation()
+        undo = []
+        reports["rooms"] = sync_category(ROOM_CATEGORY, room_specs(), rooms,
+                                         generation, dry_run, undo)
+        rooms = live_objects(ROOM_CATEGORY) if not dry_run else rooms
+        reports["exits"] = sync_category(EXIT_CATEGORY, exit_specs(), rooms,
+                                         generation, dry_run, undo)
+        reports["items"] = sync_category(ITEM_CATEGORY, item_specs(), rooms,
+                                         generation, dry_run, undo)
+        reports["npcs"] = sync_category(NPC_CATEGORY, npc_specs(), rooms,
+                                        generation, dry_run, undo)
+        if undo:
+            ServerConfig.objects.conf(UNDO_KEY.format(generation), value=undo)
+
+    if not dry_run and (reports["rooms"]["created"] or reports["rooms"]["deleted"]
+                        or reports["exits"]["created"] or reports["exits"]["updated"]
+                        or reports["exits"]["deleted"]):
+        rebuild_world_graph()
+
+    for kind, report in reports.items():
+        logger.log_info(
+            f"  {kind}: {report['created']} created, {report['updated']} updated "
+            f"({report['fields']} fields), {report['deleted']} deleted"
+        )
+    return reports
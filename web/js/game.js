@@ -355,6 +355,8 @@ class Game {
             this.onCharacterUpdate(data.character);
         } else if (data.type === 'room_update') {
             this.onRoomUpdate(data.room);
+        } else if (data.type === 'room_delta') {
+            this.onRoomDelta(data);
         } else if (data.type === 'notification') {
             this.ui.showNotification(data.message, data.class || 'info');
         } else if (data.type === 'combat_event') {
@@ -387,6 +389,41 @@ class Game {
         if (inventoryPanel && inventoryPanel.classList.contains('active')) {
             this.ui.updateInventoryDisplay(character.inventory || []);
         }
+
+        if (character.health) {
+            this.startHealthPrediction(character.health);
+        }
+    }
+
+    startHealthPrediction(health) {
+        // HP regenerates server-side from timestamps; predict it locally
+        // from the regen rate instead of polling for character updates
+        clearInterval(this.regenTimer);
+        this.regenTimer = null;
+
+        const regen = health.regen || {};
+        const showHealth = (current) => {
+            this.ui.updateCharacterStats({ health: current, maxHealth: health.max });
+        };
+        showHealth(health.current);
+
+        if (!regen.per_second || !regen.full_in) {
+            return;
+        }
+
+        const startedAt = Date.now();
+        this.regenTimer = setInterval(() => {
+            const elapsed = (Date.now() - startedAt) / 1000;
+            const predicted = Math.min(
+                health.max,
+                Math.floor(health.current + elapsed * regen.per_second)
+            );
+            showHealth(predicted);
+            if (predicted >= health.max) {
+                clearInterval(this.regenTimer);
+                this.regenTimer = null;
+            }
+        }, 1000);
     }
 
     onRoomUpdate(room) {
@@ -407,6 +444,39 @@ class Game {
         }
     }
 
+    onRoomDelta(delta) {
+        const room = this.gameState.currentRoom;
+        if (!room || room.id !== delta.room) {
+            return;
+        }
+
+        // A skipped version means we missed a delta; resync the full state
+        if (room.version !== undefined && delta.version !== room.version + 1) {
+            this.websocket.send({ type: 'get_room_state' });
+            return;
+        }
+        room.version = delta.version;
+
+        const entry = delta.object;
+        const listName = delta.event.startsWith('item_') ? 'objects' : 'characters';
+        const list = (room[listName] || []).filter(obj => obj.id !== entry.id);
+
+        if (delta.event === 'arrive' || delta.event === 'item_added' ||
+                delta.event === 'updated' || delta.event === 'item_updated') {
+            list.push(entry);
+            if (delta.event === 'arrive') {
+                this.ui.addTextOutput(`${entry.name} arrives.`, 'system');
+            }
+        } else if (delta.event === 'depart') {
+            this.ui.addTextOutput(`${entry.name} leaves.`, 'system');
+        }
+        room[listName] = list;
+
+        if (this.renderer) {
+            this.renderer.setCurrentRoom(room);
+        }
+    }
+
     onCombatEvent(event) {
         console.log('Combat event:', event);
 